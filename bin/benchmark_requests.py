@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Measure the latency of listing and creating zaken on a running instance.
+
+Run it against the same instance with different database connection settings
+(``DB_CONN_MAX_AGE``, ``DB_CONN_HEALTH_CHECKS``, ``DB_POOL_SIZE``) to compare
+them, see ``INSTALL.rst``. The client must be authorized for all zaaktypen,
+and ``--zaaktype`` must be retrievable by the instance.
+
+    $ python bin/benchmark_requests.py http://localhost:8000 \\
+        --client-id demo --secret demo \\
+        --zaaktype https://ztc.example.com/api/v1/zaaktypen/<uuid>
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import requests
+from zds_client import ClientAuth
+
+
+def measure(session: requests.Session, method: str, url: str, **kwargs) -> float:
+    start = time.perf_counter()
+    response = session.request(method, url, **kwargs)
+    duration = time.perf_counter() - start
+    response.raise_for_status()
+    return duration
+
+
+def run(func, count: int, concurrency: int) -> list:
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda _: func(), range(count)))
+
+
+def report(name: str, durations: list) -> None:
+    durations = sorted(duration * 1000 for duration in durations)
+    p95 = durations[int(len(durations) * 0.95) - 1]
+    print(
+        f"{name:<12} n={len(durations):<5} "
+        f"mean={statistics.mean(durations):7.1f}ms "
+        f"p50={statistics.median(durations):7.1f}ms "
+        f"p95={p95:7.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "base_url", help="root of the instance (with its SUBPATH, if any)"
+    )
+    parser.add_argument("--client-id", required=True)
+    parser.add_argument("--secret", required=True)
+    parser.add_argument(
+        "--zaaktype", required=True, help="zaaktype of the created zaken"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="requests per path")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    endpoint = f"{args.base_url.rstrip('/')}/api/v1/zaken"
+    session = requests.Session()
+    session.headers.update(ClientAuth(args.client_id, args.secret).credentials())
+    session.headers.update({"Accept-Crs": "EPSG:4326", "Content-Crs": "EPSG:4326"})
+    zaak = {
+        "zaaktype": args.zaaktype,
+        "bronorganisatie": "517439943",
+        "verantwoordelijkeOrganisatie": "517439943",
+        "startdatum": date.today().isoformat(),
+    }
+
+    # warm up the workers, so opening their first connections isn't measured
+    run(lambda: measure(session, "GET", endpoint), args.concurrency, args.concurrency)
+
+    report(
+        "GET /zaken",
+        run(
+            lambda: measure(session, "GET", endpoint),
+            args.requests,
+            args.concurrency,
+        ),
+    )
+    report(
+        "POST /zaken",
+        run(
+            lambda: measure(session, "POST", endpoint, json=zaak),
+            args.requests,
+            args.concurrency,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
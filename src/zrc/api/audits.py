@@ -1,3 +1,335 @@
+"""
+Audit trails of the changes made through the API.
+
+The mixins extend those of :mod:`vng_api_common.audittrails.viewsets`:
+
+* With ``AUDITTRAIL_DEFERRED``, the audit trails of a request are written with
+  a single ``bulk_create`` when the transaction is committed, instead of in
+  the middle of the change.
+* With ``AUDITTRAIL_STORE_DIFFS``, an update stores only the attributes that
+  changed, instead of the full resource before and after the change. The full
+  versions are restored from the earlier audit trails of the resource when the
+  audit trail is read, see :func:`restore_versions`.
+* The version of a resource after a change is cached with its new ETag, for
+  ``AUDITTRAIL_VERSION_CACHE_TIMEOUT`` seconds. An update of a resource with
+  the same ETag uses the cached version, instead of serializing the resource
+  before the change.
+"""
+import hashlib
+from contextvars import ContextVar
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
 from vng_api_common.audittrails.audits import Audit
+from vng_api_common.audittrails.models import AuditTrail
+from vng_api_common.audittrails.viewsets import (
+    AuditTrailCreateMixin as _AuditTrailCreateMixin,
+    AuditTrailDestroyMixin as _AuditTrailDestroyMixin,
+    AuditTrailMixin as _AuditTrailMixin,
+)
+from vng_api_common.caching.signals import is_etag_model
+from vng_api_common.constants import CommonResourceAction
+from vng_api_common.utils import get_uuid_from_path
+
+from zrc.datamodel.models import ArchivedAuditTrail
 
 AUDIT_ZRC = Audit("ZRC", "zaak")
+
+# key of the changed attributes in ``oud`` and ``nieuw`` of an audit trail
+# that stores a diff
+DIFF_KEY = "_diff"
+
+_missing = object()
+
+
+def get_diff(before: dict, after: dict) -> Tuple[dict, dict]:
+    """
+    Return the changed attributes before and after the change.
+    """
+    changed = [
+        key
+        for key in {**before, **after}
+        if before.get(key, _missing) != after.get(key, _missing)
+    ]
+    return (
+        {DIFF_KEY: {key: before[key] for key in changed if key in before}},
+        {DIFF_KEY: {key: after[key] for key in changed if key in after}},
+    )
+
+
+def is_diff(version: Optional[dict]) -> bool:
+    return isinstance(version, dict) and DIFF_KEY in version
+
+
+def apply_diff(before: dict, oud: dict, nieuw: dict) -> dict:
+    after = {**before, **nieuw[DIFF_KEY]}
+    for removed in oud[DIFF_KEY].keys() - nieuw[DIFF_KEY].keys():
+        del after[removed]
+    return after
+
+
+def _replay(
+    versions: Dict[str, Optional[dict]], resource_url: str, oud, nieuw
+) -> Tuple[Optional[dict], Optional[dict]]:
+    if is_diff(nieuw):
+        # without an earlier version, only the changed attributes are known
+        before = versions.get(resource_url, oud[DIFF_KEY])
+        after = apply_diff(before, oud, nieuw)
+    else:
+        before, after = oud, nieuw
+    versions[resource_url] = after
+    return before, after
+
+
+def restore_versions(trails: List[AuditTrail]) -> None:
+    """
+    Replace the diffs in ``trails`` with the full versions of the resources.
+
+    The versions are restored by applying the diffs, in order, to the last
+    full version of each resource, which may have been archived.
+    """
+    diffs = [trail for trail in trails if is_diff(trail.nieuw)]
+    if not diffs:
+        return
+
+    hoofd_objects = {trail.hoofd_object for trail in diffs}
+    resource_urls = {trail.resource_url for trail in diffs}
+
+    versions = {}
+    archived = (
+        ArchivedAuditTrail.objects.filter(
+            hoofd_object__in=hoofd_objects, resource_url__in=resource_urls
+        )
+        .order_by("pk")
+        .values_list("data", flat=True)
+    )
+    for data in archived:
+        _replay(versions, data["resource_url"], data["oud"], data["nieuw"])
+
+    history = (
+        AuditTrail.objects.filter(
+            hoofd_object__in=hoofd_objects,
+            resource_url__in=resource_urls,
+            pk__lte=max(trail.pk for trail in diffs),
+        )
+        .order_by("pk")
+        .only("pk", "resource_url", "oud", "nieuw")
+    )
+    restored = {
+        record.pk: _replay(versions, record.resource_url, record.oud, record.nieuw)
+        for record in history
+    }
+
+    for trail in diffs:
+        trail.oud, trail.nieuw = restored[trail.pk]
+
+
+def _get_version_key(url: str) -> str:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return f"zrc:audit:version:{digest}"
+
+
+def get_cached_version(url: str, etag: str) -> Optional[dict]:
+    """
+    Return the cached version of the resource at ``url``, if it has ``etag``.
+    """
+    if not etag or not settings.AUDITTRAIL_VERSION_CACHE_TIMEOUT:
+        return None
+
+    entry = cache.get(_get_version_key(url))
+    if entry is None or entry["etag"] != etag:
+        return None
+    return entry["data"]
+
+
+def cache_version(model, url: str, data: dict) -> None:
+    """
+    Cache ``data`` with the ETag of the resource after the commit.
+    """
+    if not settings.AUDITTRAIL_VERSION_CACHE_TIMEOUT or not is_etag_model(model):
+        return
+
+    def _cache_version():
+        # the ETag is recalculated on commit, before this callback
+        etag = (
+            model.objects.filter(uuid=get_uuid_from_path(url))
+            .values_list("_etag", flat=True)
+            .first()
+        )
+        if etag:
+            cache.set(
+                _get_version_key(url),
+                {"etag": etag, "data": data},
+                timeout=settings.AUDITTRAIL_VERSION_CACHE_TIMEOUT,
+            )
+
+    transaction.on_commit(_cache_version)
+
+
+def _write_pending_audittrails(request) -> None:
+    trails, request._pending_audittrails = request._pending_audittrails, None
+    AuditTrail.objects.bulk_create(trails)
+
+
+# the audittrails saved by the base class are collected here instead, while set
+_collected_audittrails = ContextVar("collected_audittrails", default=None)
+
+
+class _AuditTrailCollected(Exception):
+    pass
+
+
+@receiver(pre_save, sender=AuditTrail)
+def collect_audittrail(sender, instance, raw, **kwargs):
+    """
+    Collect the audittrail instead of saving it, while collecting.
+
+    Raising aborts the save before anything is written to the database.
+    """
+    collected = _collected_audittrails.get()
+    if collected is None or raw:
+        return
+
+    collected.append(instance)
+    raise _AuditTrailCollected
+
+
+class AuditTrailMixin(_AuditTrailMixin):
+    def create_audittrail(
+        self,
+        status_code,
+        action,
+        version_before_edit,
+        version_after_edit,
+        unique_representation,
+    ):
+        trail = self.build_audittrail(
+            status_code,
+            action,
+            version_before_edit,
+            version_after_edit,
+            unique_representation,
+        )
+
+        if (
+            settings.AUDITTRAIL_STORE_DIFFS
+            and version_before_edit
+            and version_after_edit
+            and self._has_audittrail(trail)
+        ):
+            trail.oud, trail.nieuw = get_diff(version_before_edit, version_after_edit)
+
+        if version_after_edit:
+            cache_version(
+                self.get_queryset().model, trail.resource_url, version_after_edit
+            )
+
+        self.save_audittrail(trail)
+
+    def build_audittrail(
+        self,
+        status_code,
+        action,
+        version_before_edit,
+        version_after_edit,
+        unique_representation,
+    ) -> AuditTrail:
+        """
+        Build the audittrail for the action that has been carried out.
+
+        The audittrail is built by ``create_audittrail`` of the base class, the
+        save at its end is intercepted by :func:`collect_audittrail`.
+        """
+        collected = []
+        token = _collected_audittrails.set(collected)
+        try:
+            super().create_audittrail(
+                status_code,
+                action,
+                version_before_edit,
+                version_after_edit,
+                unique_representation,
+            )
+        except _AuditTrailCollected:
+            pass
+        finally:
+            _collected_audittrails.reset(token)
+
+        (trail,) = collected
+        return trail
+
+    def _has_audittrail(self, trail: AuditTrail) -> bool:
+        pending = getattr(self.request, "_pending_audittrails", None) or []
+        if any(other.resource_url == trail.resource_url for other in pending):
+            return True
+
+        return AuditTrail.objects.filter(
+            hoofd_object=trail.hoofd_object, resource_url=trail.resource_url
+        ).exists()
+
+    def save_audittrail(self, trail: AuditTrail) -> None:
+        if not settings.AUDITTRAIL_DEFERRED:
+            trail.save()
+            return
+
+        pending = getattr(self.request, "_pending_audittrails", None)
+        if pending is not None:
+            pending.append(trail)
+            return
+
+        # outside of a transaction the callback runs immediately
+        self.request._pending_audittrails = [trail]
+        transaction.on_commit(partial(_write_pending_audittrails, self.request))
+
+
+class AuditTrailCreateMixin(AuditTrailMixin, _AuditTrailCreateMixin):
+    pass
+
+
+class AuditTrailUpdateMixin(AuditTrailMixin):
+    def get_version_before_edit(self, instance) -> Dict:
+        url = self.request.build_absolute_uri(self.request.path)
+        version = get_cached_version(url, getattr(instance, "_etag", ""))
+        if version is not None:
+            return version
+
+        serializer = self.get_serializer(instance)
+        return serializer.data
+
+    def update(self, request, *args, **kwargs):
+        instance = self.get_object()
+        version_before_edit = self.get_version_before_edit(instance)
+
+        action = (
+            CommonResourceAction.partial_update
+            if kwargs.get("partial", False)
+            else CommonResourceAction.update
+        )
+
+        response = super().update(request, *args, **kwargs)
+        self.create_audittrail(
+            response.status_code,
+            action,
+            version_before_edit=version_before_edit,
+            version_after_edit=response.data,
+            unique_representation=instance.unique_representation(),
+        )
+        return response
+
+
+class AuditTrailDestroyMixin(AuditTrailMixin, _AuditTrailDestroyMixin):
+    def _destroy_related_audittrails(self, main_object_url):
+        super()._destroy_related_audittrails(main_object_url)
+        ArchivedAuditTrail.objects.filter(hoofd_object=main_object_url).delete()
+
+
+class AuditTrailViewsetMixin(
+    AuditTrailCreateMixin, AuditTrailUpdateMixin, AuditTrailDestroyMixin
+):
+    pass
@@ -1,13 +1,13 @@
 import logging
 
-from vng_api_common.models import APICredential
+from zrc.utils.clients import get_auth as get_client_auth
 
 logger = logging.getLogger(__name__)
 
 
 def get_auth(url: str) -> dict:
     logger.info("Authenticating for %s", url)
-    auth = APICredential.get_auth(url)
+    auth = get_client_auth(url)
     if auth is None:
         logger.warning("Could not authenticate for %s", url)
         return {}
@@ -1,3 +1,71 @@
+from functools import partial
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from vng_api_common.authorizations.models import Applicatie, Autorisatie
+from vng_api_common.scopes import Scope
+
+from zrc.datamodel.query import compile_authorizations
+
+
+def _get_cache_key(applicatie_id: int) -> str:
+    return f"zrc:authorizations:{applicatie_id}"
+
+
+def get_max_orders(
+    applicaties: List[Applicatie], scope: Scope, authorizations: models.QuerySet
+) -> Dict[str, int]:
+    """
+    Return the maximum confidentiality order per zaaktype for ``applicaties``.
+
+    The authorizations are compiled per application and scope, and cached until
+    the authorizations of the application change.
+    """
+    if not settings.AUTHORIZATIONS_CACHE_TIMEOUT:
+        return compile_authorizations(scope, authorizations)
+
+    keys = {app.pk: _get_cache_key(app.pk) for app in applicaties}
+    cached = cache.get_many(keys.values())
+
+    max_orders = {}
+    for app in applicaties:
+        compiled = cached.get(keys[app.pk], {})
+        if str(scope) not in compiled:
+            compiled[str(scope)] = compile_authorizations(
+                scope, authorizations.filter(applicatie=app)
+            )
+            cache.set(
+                keys[app.pk], compiled, timeout=settings.AUTHORIZATIONS_CACHE_TIMEOUT
+            )
+
+        for zaaktype, order in compiled[str(scope)].items():
+            max_orders[zaaktype] = max(order, max_orders.get(zaaktype, order))
+
+    return max_orders
+
+
+def _invalidate(applicatie_id: int) -> None:
+    # deleted after the commit, so a concurrent request can't cache the
+    # authorizations that are about to be replaced again
+    transaction.on_commit(partial(cache.delete, _get_cache_key(applicatie_id)))
+
+
+@receiver([post_save, post_delete], sender=Applicatie)
+def invalidate_applicatie(sender, instance: Applicatie, **kwargs):
+    _invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Autorisatie)
+def invalidate_autorisatie(sender, instance: Autorisatie, **kwargs):
+    # the notifications of the Autorisaties API replace the authorizations
+    _invalidate(instance.applicatie_id)
+
+
 class ListFilterByAuthorizationsMixin:
     """
     Filter list-action data by the authorizations configured.
@@ -7,10 +75,12 @@ class ListFilterByAuthorizationsMixin:
     implementation facilitates it in a conventional way.
 
     For this to be effective, the underlying model must have a queryset
-    method ``filter_for_authorizations``, which is provided by
+    method ``filter_for_max_orders``, which is provided by
     :class:`zrc.datamodel.query.AuthorizationsFilterMixin`
     """
 
+    authorizations_filter_actions = ("list",)
+
     def get_queryset(self):
         base = super().get_queryset()
 
@@ -22,7 +92,7 @@ class ListFilterByAuthorizationsMixin:
         # because the resource _does exist_, you just don't have permission
         # to do those operations. A 403 is semantically more correct than a
         # 404, which would be the result if the queryset is always filtered.
-        if not self.action == "list":
+        if self.action not in self.authorizations_filter_actions:
             return base
 
         # get the auth apps that are relevant for this particular request
@@ -35,5 +105,6 @@ class ListFilterByAuthorizationsMixin:
 
         scope_needed = self.required_scopes[self.action]
         authorizations = self.request.jwt_auth.autorisaties
+        max_orders = get_max_orders(apps, scope_needed, authorizations)
 
-        return base.filter_for_authorizations(scope_needed, authorizations)
+        return base.filter_for_max_orders(max_orders)
@@ -0,0 +1,110 @@
+"""
+Cache of the resources retrieved for ``?expand=``, shared by all processes.
+
+Local resources are cached with their ETag, so a changed resource is never
+served from the cache. Resources of other APIs are cached for
+``EXPAND_CACHE_TTL`` seconds, after which they are revalidated with their ETag.
+A ``EXPAND_CACHE_TTL`` of 0 disables the cache.
+
+Entries are scoped to the authorization context of the caller: the
+applications of the client and their authorizations for this component.
+Clients with different autorisaties never share entries.
+
+Every entry expires, so the size of the ``expansions`` cache is bounded by the
+resources expanded within the time-to-live. Configure the cache with an
+evicting policy (e.g. ``allkeys-lru`` for Redis) to bound it further.
+"""
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+CACHE_ALIAS = "expansions"
+
+# expired entries of external resources are kept around this long, so they
+# can be revalidated
+STALE_TIMEOUT = 60 * 60 * 24
+
+
+def is_enabled() -> bool:
+    return bool(settings.EXPAND_CACHE_TTL)
+
+
+def get_authorization_context(jwt_auth) -> str:
+    """
+    Return a fingerprint of the authorizations of the caller.
+    """
+    applicaties = sorted(
+        (str(app.uuid), app.heeft_alle_autorisaties) for app in jwt_auth.applicaties
+    )
+    autorisaties = sorted(
+        jwt_auth.autorisaties.values_list(
+            "applicatie__uuid", "scopes", "zaaktype", "max_vertrouwelijkheidaanduiding"
+        ),
+        key=str,
+    )
+    fingerprint = json.dumps([applicaties, autorisaties], default=str)
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def _get_key(context: str, *parts: str) -> str:
+    digest = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+    return f"zrc:expand:{context}:{digest}"
+
+
+def get_local(context: str, base_url: str, etags: Dict[str, str]) -> Dict[str, dict]:
+    """
+    Return the cached data of the local resources with the given ETags.
+
+    :param base_url: the absolute url of the API root the data was serialized for.
+    :param etags: a mapping of url to the current ETag of the resource.
+    """
+    keys = {
+        _get_key(context, base_url, url, etag): url
+        for url, etag in etags.items()
+        if etag
+    }
+    cached = caches[CACHE_ALIAS].get_many(keys)
+    return {keys[key]: data for key, data in cached.items()}
+
+
+def set_local(
+    context: str, base_url: str, etags: Dict[str, str], data: Dict[str, dict]
+) -> None:
+    entries = {
+        _get_key(context, base_url, url, etags[url]): data[url]
+        for url in data
+        if etags.get(url)
+    }
+    caches[CACHE_ALIAS].set_many(entries, timeout=settings.EXPAND_CACHE_TTL)
+
+
+def make_entry(data: dict, etag: Optional[str]) -> dict:
+    return {
+        "data": data,
+        "etag": etag,
+        "expires": time.time() + settings.EXPAND_CACHE_TTL,
+    }
+
+
+def is_fresh(entry: dict) -> bool:
+    return entry["expires"] > time.time()
+
+
+def get_external(context: str, urls: Iterable[str]) -> Dict[str, dict]:
+    """
+    Return the cached entries of external resources, fresh or stale.
+    """
+    keys = {_get_key(context, url): url for url in urls}
+    cached = caches[CACHE_ALIAS].get_many(keys)
+    return {keys[key]: entry for key, entry in cached.items()}
+
+
+def set_external(context: str, entries: Dict[str, dict]) -> None:
+    caches[CACHE_ALIAS].set_many(
+        {_get_key(context, url): entry for url, entry in entries.items()},
+        timeout=settings.EXPAND_CACHE_TTL + STALE_TIMEOUT,
+    )
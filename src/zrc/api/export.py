@@ -0,0 +1,77 @@
+"""
+Stream large result sets as NDJSON or CSV.
+
+The rows are read through a server-side cursor in chunks, and the
+``prefetch_related`` lookups of the queryset are performed per chunk, so the
+memory usage doesn't depend on the size of the result set.
+"""
+import csv
+import json
+from itertools import islice
+from typing import Iterator, List
+
+from django.db import models
+from django.db.models import prefetch_related_objects
+
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from djangorestframework_camel_case.util import camelize
+from rest_framework.utils.encoders import JSONEncoder
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+
+CONTENT_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv; charset=utf-8",
+}
+
+
+def iter_chunks(queryset: models.QuerySet, chunk_size: int) -> Iterator[List]:
+    """
+    Iterate over ``queryset`` in chunks, prefetching the related objects per chunk.
+    """
+    lookups = queryset._prefetch_related_lookups
+    # ``iterator`` ignores prefetch_related (until Django 4.1)
+    rows = queryset.prefetch_related(None).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        prefetch_related_objects(chunk, *lookups)
+        yield chunk
+
+
+def iter_ndjson(chunks: Iterator[List], serialize) -> Iterator[bytes]:
+    renderer = CamelCaseJSONRenderer()
+    for chunk in chunks:
+        yield b"".join(renderer.render(item) + b"\n" for item in serialize(chunk))
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    # the same notation as the NDJSON export, e.g. ``true`` instead of ``True``
+    if isinstance(value, (bool, dict, list)):
+        return json.dumps(value, cls=JSONEncoder)
+    return value
+
+
+def iter_csv(
+    chunks: Iterator[List], serialize, field_names: List[str]
+) -> Iterator[str]:
+    """
+    Stream CSV with a column per serializer field. Nested values are JSON.
+    """
+    columns = list(camelize({name: None for name in field_names}))
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for chunk in chunks:
+        yield "".join(
+            writer.writerow([_csv_value(item.get(column)) for column in columns])
+            for item in camelize(serialize(chunk))
+        )
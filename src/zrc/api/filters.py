@@ -3,6 +3,7 @@ from django.utils.translation import ugettext_lazy as _
 from django_filters import filters
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
+from vng_api_common.audittrails.models import AuditTrail
 from vng_api_common.constants import VertrouwelijkheidsAanduiding
 from vng_api_common.filtersets import FilterSet
 from vng_api_common.utils import get_field_attribute, get_help_text
@@ -21,7 +22,7 @@ from zrc.datamodel.models import (
 
 
 def get_most_recent_status(queryset, name, value):
-    return queryset.order_by("-datum_status_gezet")[:1]
+    return queryset.laatst_gezet()
 
 
 def expand_filter(queryset, name, value):
@@ -35,17 +36,12 @@ class MaximaleVertrouwelijkheidaanduidingFilter(filters.ChoiceFilter):
         kwargs.setdefault("lookup_expr", "lte")
         super().__init__(*args, **kwargs)
 
-        # rewrite the field_name correctly
-        self._field_name = self.field_name
-        self.field_name = f"_{self._field_name}_order"
+        # filter on the stored numeric order of the field
+        self.field_name = f"{self.field_name}_order"
 
     def filter(self, qs, value):
         if value in filters.EMPTY_VALUES:
             return qs
-        order_expression = VertrouwelijkheidsAanduiding.get_order_expression(
-            self._field_name
-        )
-        qs = qs.annotate(**{self.field_name: order_expression})
         numeric_value = VertrouwelijkheidsAanduiding.get_choice(value).order
         return super().filter(qs, numeric_value)
 
@@ -277,3 +273,9 @@ class ZaakVerzoekFilter(FilterSet):
     class Meta:
         model = ZaakVerzoek
         fields = ("zaak", "verzoek")
+
+
+class AuditTrailFilter(FilterSet):
+    class Meta:
+        model = AuditTrail
+        fields = {"aanmaakdatum": ["gte", "lt"]}
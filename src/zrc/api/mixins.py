@@ -1,13 +1,30 @@
-from typing import Optional
+from typing import Dict, List, Optional, Union
 
+from django.conf import settings
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
+from notifications_api_common.settings import get_setting
+from notifications_api_common.viewsets import (
+    NotificationCreateMixin as _NotificationCreateMixin,
+    NotificationDestroyMixin as _NotificationDestroyMixin,
+    NotificationMixin,
+    NotificationUpdateMixin as _NotificationUpdateMixin,
+)
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.settings import api_settings
+from vng_api_common.filters import Backend
+from vng_api_common.utils import underscore_to_camel
+from vng_api_common.viewsets import CheckQueryParamsMixin as _CheckQueryParamsMixin
 
 from zrc.api.scopes import SCOPE_ZAKEN_GEFORCEERD_BIJWERKEN
 from zrc.datamodel.models import Zaak
+from zrc.sync.notifications import queue_notification
 
 from .exceptions import ZaakClosed
+from .pagination import KeysetPagination
 
 
 class ClosedZaakMixin:
@@ -65,3 +82,80 @@ class ClosedZaakMixin:
         zaak = instance.zaak
         self._check_zaak_closed(zaak)
         super().perform_destroy(instance)
+
+
+class CheckQueryParamsMixin(_CheckQueryParamsMixin):
+    """
+    Validate that the query params are known, including the ``cursor`` of the
+    keyset pagination.
+    """
+
+    def _check_query_params(self, request) -> None:
+        if not isinstance(self.paginator, KeysetPagination):
+            return super()._check_query_params(request)
+
+        # nothing to check if there are no query parameters
+        if not request.query_params:
+            return
+
+        known_params = {
+            self.paginator.page_query_param,
+            self.paginator.cursor_query_param,
+        }
+        if self.paginator.page_size_query_param:
+            known_params.add(self.paginator.page_size_query_param)
+
+        filterset_class = Backend().get_filterset_class(self, self.get_queryset())
+        if filterset_class:
+            filters = filterset_class().get_filters().keys()
+            known_params |= {underscore_to_camel(param) for param in filters}
+
+        unknown_params = set(request.query_params.keys()) - known_params
+        for backend in self.filter_backends:
+            if issubclass(backend, OrderingFilter):
+                unknown_params.discard(backend.ordering_param)
+
+        if unknown_params:
+            msg = _("Onbekende query parameters: %s" % ", ".join(unknown_params))
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: msg}, code="unknown-parameters"
+            )
+
+
+class QueuedNotificationMixin(NotificationMixin):
+    """
+    Queue the notifications instead of sending them during the request, with
+    ``NOTIFICATIONS_QUEUE_ENABLED``. See :mod:`zrc.sync.notifications`.
+    """
+
+    def notify(
+        self, status_code: int, data: Union[List, Dict], instance: models.Model = None
+    ) -> None:
+        if not settings.NOTIFICATIONS_QUEUE_ENABLED:
+            return super().notify(status_code, data, instance=instance)
+
+        if get_setting("NOTIFICATIONS_DISABLED"):
+            return
+
+        if not 200 <= status_code < 300:
+            return
+
+        queue_notification(self.construct_message(data, instance=instance))
+
+
+class NotificationCreateMixin(QueuedNotificationMixin, _NotificationCreateMixin):
+    pass
+
+
+class NotificationUpdateMixin(QueuedNotificationMixin, _NotificationUpdateMixin):
+    pass
+
+
+class NotificationDestroyMixin(QueuedNotificationMixin, _NotificationDestroyMixin):
+    pass
+
+
+class NotificationViewSetMixin(
+    NotificationCreateMixin, NotificationUpdateMixin, NotificationDestroyMixin
+):
+    pass
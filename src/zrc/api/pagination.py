@@ -0,0 +1,314 @@
+"""
+Pagination for the list endpoints.
+
+Page number pagination needs an ``OFFSET`` and a ``COUNT(*)`` on every request,
+which both get slower the deeper the page and the larger the table. Keyset
+pagination instead seeks to the position after the last item of the previous
+page, using the ordering of the queryset with the primary key as tie-breaker,
+so every page costs the same as the first one.
+
+Keyset pagination is opt-in: it is used when the ``cursor`` query parameter is
+present (empty for the first page), or by default with
+``PAGINATION_CURSOR_DEFAULT``, in which case ``page`` still selects page
+number pagination. ``PAGINATION_CURSOR_COUNT`` controls the ``count`` of the
+response: ``exact``, ``estimate`` (the estimate of the query planner) or
+``none``.
+"""
+import base64
+import binascii
+import datetime
+import json
+import operator
+from functools import reduce
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.db.models import F, Q
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+
+# (field name, descending)
+Ordering = List[Tuple[str, bool]]
+
+
+def get_ordering(queryset: models.QuerySet) -> Optional[Ordering]:
+    """
+    Return the ordering of ``queryset``, ending with the primary key.
+
+    Returns ``None`` if the ordering can't be used for keyset pagination.
+    """
+    ordering = []
+    for field in queryset.query.order_by or queryset.model._meta.ordering:
+        if not isinstance(field, str) or field == "?":
+            return None
+        descending = field.startswith("-")
+        name = field.lstrip("-")
+        ordering.append(("pk" if name == "id" else name, descending))
+        if ordering[-1][0] == "pk":
+            return ordering
+
+    return ordering + [("pk", False)]
+
+
+def _equal(field: str, value) -> Q:
+    if value is None:
+        return Q(**{f"{field}__isnull": True})
+    return Q(**{field: value})
+
+
+def _after(field: str, value, descending: bool) -> Optional[Q]:
+    # NULL values are ordered last ascending and first descending, as in Postgres
+    if descending:
+        if value is None:
+            return Q(**{f"{field}__isnull": False})
+        return Q(**{f"{field}__lt": value})
+
+    if value is None:
+        return None
+    if field == "pk":
+        return Q(pk__gt=value)
+    return Q(**{f"{field}__gt": value}) | Q(**{f"{field}__isnull": True})
+
+
+def seek(queryset: models.QuerySet, ordering: Ordering, position: list):
+    """
+    Filter ``queryset`` on the items after ``position`` in ``ordering``.
+    """
+    conditions = []
+    equal = Q()
+    for (field, descending), value in zip(ordering, position):
+        after = _after(field, value, descending)
+        if after is not None:
+            conditions.append(equal & after)
+        equal &= _equal(field, value)
+
+    if not conditions:
+        return queryset.none()
+    return queryset.filter(reduce(operator.or_, conditions))
+
+
+def order(queryset: models.QuerySet, ordering: Ordering) -> models.QuerySet:
+    return queryset.order_by(
+        *[
+            F(field).desc(nulls_first=True)
+            if descending
+            else F(field).asc(nulls_last=True)
+            for field, descending in ordering
+        ]
+    )
+
+
+def get_position(obj: models.Model, ordering: Ordering) -> list:
+    position = []
+    for field, _descending in ordering:
+        value = obj
+        for attr in field.split("__"):
+            value = getattr(value, attr) if value is not None else None
+        position.append(value)
+    return position
+
+
+def estimate_count(queryset: models.QuerySet) -> int:
+    """
+    Return the number of rows the query planner expects ``queryset`` to return.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    Encode datetimes and times with their microseconds.
+
+    :class:`DjangoJSONEncoder` truncates them to milliseconds, which would seek
+    past or before the items within the same millisecond.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page number pagination, with opt-in keyset pagination.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = _(
+        "Een cursor uit de `next` of `previous` link van een vorige pagina. "
+        "Laat de waarde leeg voor de eerste pagina."
+    )
+    invalid_cursor_message = _("Ongeldige cursor.")
+
+    def use_cursor(self, request) -> bool:
+        if self.cursor_query_param in request.query_params:
+            return True
+        return (
+            settings.PAGINATION_CURSOR_DEFAULT
+            and self.page_query_param not in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = False
+        if not self.use_cursor(request):
+            return super().paginate_queryset(queryset, request, view=view)
+
+        ordering = get_ordering(queryset)
+        if ordering is None:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.cursor_mode = True
+        self.request = request
+        self.ordering = ordering
+        self.count = self.get_count(queryset, request)
+
+        position, reverse = self.decode_cursor(request)
+        seek_ordering = [(field, desc != reverse) for field, desc in ordering]
+        if position is not None:
+            queryset = seek(queryset, seek_ordering, position)
+
+        # one extra item tells if there is another page
+        results = list(order(queryset, seek_ordering)[: page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            first, last = results[0], results[-1]
+            if has_more or reverse:
+                self.next_position = get_position(last, ordering)
+            if position is not None and (has_more or not reverse):
+                self.previous_position = get_position(first, ordering)
+
+        return results
+
+    def get_count(self, queryset, request) -> Optional[int]:
+        mode = settings.PAGINATION_CURSOR_COUNT
+        if mode == COUNT_NONE:
+            return None
+        if mode == COUNT_ESTIMATE:
+            return estimate_count(queryset)
+        return queryset.count()
+
+    def decode_cursor(self, request) -> Tuple[Optional[list], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = cursor["p"], cursor.get("r", False)
+        except (AttributeError, TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        cursor = {"p": position}
+        if reverse:
+            cursor["r"] = True
+        data = json.dumps(cursor, cls=CursorEncoder).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii")
+
+    def _get_cursor_link(self, position: Optional[list], reverse: bool):
+        if position is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        return self._get_cursor_link(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        return self._get_cursor_link(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_cursor_schema_parameter(self) -> dict:
+        return {
+            "name": self.cursor_query_param,
+            "required": False,
+            "in": "query",
+            "description": str(self.cursor_query_description),
+            "schema": {"type": "string"},
+        }
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(self.get_cursor_schema_parameter())
+        return parameters
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count"]["nullable"] = True
+        return response_schema
+
+
+class CursorPagination(KeysetPagination):
+    """
+    Keyset pagination of a list endpoint that isn't paginated by default.
+
+    Without the ``cursor`` query parameter the full list is returned.
+    """
+
+    def use_cursor(self, request) -> bool:
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_cursor(request):
+            self.cursor_mode = False
+            return None
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_schema_operation_parameters(self, view):
+        return [self.get_cursor_schema_parameter()]
+
+    def get_paginated_response_schema(self, schema):
+        return {"oneOf": [schema, super().get_paginated_response_schema(schema)]}
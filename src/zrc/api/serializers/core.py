@@ -3,7 +3,6 @@ import logging
 from django.conf import settings
 from django.db import transaction
 from django.utils.encoding import force_text
-from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 
 import requests
@@ -23,7 +22,6 @@ from vng_api_common.constants import (
     ZaakobjectTypes,
 )
 from vng_api_common.fields import RSINField
-from vng_api_common.models import APICredential
 from vng_api_common.polymorphism import Discriminator, PolymorphicSerializer
 from vng_api_common.serializers import (
     GegevensGroepSerializer,
@@ -62,6 +60,7 @@ from zrc.datamodel.models.core import ZaakVerzoek
 from zrc.datamodel.utils import BrondatumCalculator
 from zrc.sync.signals import SyncError
 from zrc.utils.exceptions import DetermineProcessEndDateException
+from zrc.utils.resources import check_resources, fetch_resource
 
 from ..auth import get_auth
 from ..validators import (
@@ -86,6 +85,7 @@ from .betrokkene import (
     RolOrganisatorischeEenheidSerializer,
     RolVestigingSerializer,
 )
+from .polymorphism import PolymorphicListSerializer
 from .zaakobjecten import (
     ObjectBuurtSerializer,
     ObjectGemeentelijkeOpenbareRuimteSerializer,
@@ -392,35 +392,39 @@ class ZaakSerializer(
 
     def _get_zaaktype(self, zaaktype_url: str) -> dict:
         if not hasattr(self, "_zaaktype"):
-            # dynamic so that it can be mocked in tests easily
-            Client = import_string(settings.ZDS_CLIENT_CLASS)
-            client = Client.from_url(zaaktype_url)
-            client.auth = APICredential.get_auth(
-                zaaktype_url, scopes=["zds.scopes.zaaktypes.lezen"]
+            self._zaaktype = fetch_resource(
+                "zaaktype", zaaktype_url, scopes=["zds.scopes.zaaktypes.lezen"]
             )
-            self._zaaktype = client.request(zaaktype_url, "zaaktype")
         return self._zaaktype
 
-    def _get_information_objects(self) -> list:
-        if not hasattr(self, "_information_objects"):
-            self._information_objects = []
-
-            if self.instance:
-                Client = import_string(settings.ZDS_CLIENT_CLASS)
+    def _check_information_objects_archived(self) -> None:
+        if not self.instance:
+            return
 
-                zios = self.instance.zaakinformatieobject_set.all()
-                for zio in zios:
-                    io_url = zio.informatieobject
-                    client = Client.from_url(io_url)
-                    client.auth = APICredential.get_auth(
-                        io_url, scopes=["scopes.documenten.lezen"]
-                    )
-                    informatieobject = client.request(
-                        io_url, "enkelvoudiginformatieobject"
-                    )
-                    self._information_objects.append(informatieobject)
+        def check_archived(informatieobject: dict):
+            if informatieobject["status"] != "gearchiveerd":
+                raise serializers.ValidationError(
+                    {
+                        "archiefstatus",
+                        _(
+                            "Er zijn gerelateerde informatieobjecten waarvan de `status` nog niet gelijk is aan "
+                            "`gearchiveerd`. Dit is een voorwaarde voor het zetten van de `archiefstatus` op een andere "
+                            "waarde dan `nog_te_archiveren`."
+                        ),
+                    },
+                    code="documents-not-archived",
+                )
 
-        return self._information_objects
+        zios = self.instance.zaakinformatieobject_set.all()
+        check_resources(
+            "enkelvoudiginformatieobject",
+            [zio.informatieobject for zio in zios],
+            check_archived,
+            scopes=["scopes.documenten.lezen"],
+            retrieve=lambda client, url: client.request(
+                url, "enkelvoudiginformatieobject"
+            ),
+        )
 
     def validate(self, attrs):
         super().validate(attrs)
@@ -472,20 +476,7 @@ class ZaakSerializer(
             != Archiefstatus.nog_te_archiveren
         )
         if archiefstatus:
-            ios = self._get_information_objects()
-            for io in ios:
-                if io["status"] != "gearchiveerd":
-                    raise serializers.ValidationError(
-                        {
-                            "archiefstatus",
-                            _(
-                                "Er zijn gerelateerde informatieobjecten waarvan de `status` nog niet gelijk is aan "
-                                "`gearchiveerd`. Dit is een voorwaarde voor het zetten van de `archiefstatus` op een andere "
-                                "waarde dan `nog_te_archiveren`."
-                            ),
-                        },
-                        code="documents-not-archived",
-                    )
+            self._check_information_objects_archived()
 
             for attr in ["archiefnominatie", "archiefactiedatum"]:
                 if not attrs.get(
@@ -909,21 +900,19 @@ class StatusSerializer(serializers.HyperlinkedModelSerializer):
         }
 
     def get_indicatie_laatst_gezette_status(self, obj) -> bool:
-        return obj == Status.objects.order_by("-datum_status_gezet")[0]
+        # annotated by ``StatusQuerySet.with_indicatie_laatst_gezette_status``
+        if hasattr(obj, "_indicatie_laatst_gezette_status"):
+            return obj._indicatie_laatst_gezette_status
+        return obj.uuid == obj.zaak.current_status_uuid
 
     def validate(self, attrs):
         validated_attrs = super().validate(attrs)
         statustype_url = validated_attrs["statustype"]
 
-        # dynamic so that it can be mocked in tests easily
-        Client = import_string(settings.ZDS_CLIENT_CLASS)
-        client = Client.from_url(statustype_url)
-        client.auth = APICredential.get_auth(
-            statustype_url, scopes=["zds.scopes.zaaktypes.lezen"]
-        )
-
         try:
-            statustype = client.retrieve("statustype", url=statustype_url)
+            statustype = fetch_resource(
+                "statustype", statustype_url, scopes=["zds.scopes.zaaktypes.lezen"]
+            )
             validated_attrs["__is_eindstatus"] = statustype["isEindstatus"]
         except requests.HTTPError as exc:
             raise serializers.ValidationError(
@@ -938,16 +927,8 @@ class StatusSerializer(serializers.HyperlinkedModelSerializer):
         # and are unlocked
         if validated_attrs["__is_eindstatus"]:
             zaak = validated_attrs["zaak"]
-            zios = zaak.zaakinformatieobject_set.all()
-            for zio in zios:
-                io_url = zio.informatieobject
-                client = Client.from_url(io_url)
-                client.auth = APICredential.get_auth(
-                    io_url, scopes=["zds.scopes.zaaktypes.lezen"]
-                )
-                informatieobject = client.retrieve(
-                    "enkelvoudiginformatieobject", url=io_url
-                )
+
+            def check_closable(informatieobject: dict):
                 if informatieobject["locked"]:
                     raise serializers.ValidationError(
                         "Er zijn gerelateerde informatieobjecten die nog gelocked zijn."
@@ -961,6 +942,14 @@ class StatusSerializer(serializers.HyperlinkedModelSerializer):
                         code="indicatiegebruiksrecht-unset",
                     )
 
+            zios = zaak.zaakinformatieobject_set.all()
+            check_resources(
+                "enkelvoudiginformatieobject",
+                [zio.informatieobject for zio in zios],
+                check_closable,
+                scopes=["zds.scopes.zaaktypes.lezen"],
+            )
+
             brondatum_calculator = BrondatumCalculator(
                 zaak, validated_attrs["datum_status_gezet"]
             )
@@ -1136,6 +1125,7 @@ class ZaakObjectSerializer(PolymorphicSerializer):
 
     class Meta:
         model = ZaakObject
+        list_serializer_class = PolymorphicListSerializer
         fields = (
             "url",
             "uuid",
@@ -1353,12 +1343,9 @@ class ZaakEigenschapSerializer(NestedHyperlinkedModelSerializer):
         if not hasattr(self, "_eigenschap"):
             self._eigenschap = None
             if eigenschap_url:
-                Client = import_string(settings.ZDS_CLIENT_CLASS)
-                client = Client.from_url(eigenschap_url)
-                client.auth = APICredential.get_auth(
-                    eigenschap_url, scopes=["zds.scopes.zaaktypes.lezen"]
+                self._eigenschap = fetch_resource(
+                    "eigenschap", eigenschap_url, scopes=["zds.scopes.zaaktypes.lezen"]
                 )
-                self._eigenschap = client.request(eigenschap_url, "eigenschap")
         return self._eigenschap
 
     def validate(self, attrs):
@@ -1427,6 +1414,7 @@ class RolSerializer(PolymorphicSerializer):
 
     class Meta:
         model = Rol
+        list_serializer_class = PolymorphicListSerializer
         fields = (
             "url",
             "uuid",
@@ -0,0 +1,81 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+
+from rest_framework import serializers
+from vng_api_common.polymorphism import Discriminator
+
+
+def _get_nested_relations(
+    serializer: serializers.Serializer, model, prefix: str = ""
+) -> List[str]:
+    relations = []
+    for field in serializer.fields.values():
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if not isinstance(nested, serializers.BaseSerializer) or field.source == "*":
+            continue
+
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+
+        path = f"{prefix}{field.source}"
+        relations.append(path)
+        relations += _get_nested_relations(
+            nested, model_field.related_model, prefix=f"{path}__"
+        )
+    return relations
+
+
+def get_prefetch_plan(discriminator: Discriminator, model) -> Dict[str, List[str]]:
+    """
+    Return the relations to prefetch per discriminator value.
+
+    The relations follow the nested serializers of the mapping, e.g. the
+    ``natuurlijkpersoon`` of a rol and its ``verblijfsadres``.
+    """
+    return {
+        value: _get_nested_relations(serializer, model)
+        for value, serializer in discriminator.mapping.items()
+        if serializer is not None
+    }
+
+
+class PolymorphicListSerializer(serializers.ListSerializer):
+    """
+    Serialize a list of polymorphic resources with a fixed number of queries.
+
+    The instances are grouped on their discriminator value, and the relations
+    of each group are prefetched at once, instead of per instance.
+    """
+
+    _prefetch_plans = {}
+
+    def get_prefetch_plan(self) -> Dict[str, List[str]]:
+        serializer_class = type(self.child)
+        if serializer_class not in self._prefetch_plans:
+            self._prefetch_plans[serializer_class] = get_prefetch_plan(
+                serializer_class.discriminator, serializer_class.Meta.model
+            )
+        return self._prefetch_plans[serializer_class]
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, models.Manager) else data)
+
+        discriminator_field = self.child.discriminator.discriminator_field
+        groups = defaultdict(list)
+        for instance in instances:
+            groups[getattr(instance, discriminator_field)].append(instance)
+
+        plan = self.get_prefetch_plan()
+        for value, group in groups.items():
+            relations = plan.get(value)
+            if relations:
+                models.prefetch_related_objects(group, *relations)
+
+        return super().to_representation(instances)
@@ -1,10 +1,15 @@
 import uuid
 from copy import deepcopy
+from datetime import datetime
+from io import StringIO
 from unittest.mock import patch
 
+from django.core.management import call_command
 from django.test import override_settings
+from django.utils import timezone
 
 import requests_mock
+from django_capture_on_commit_callbacks import capture_on_commit_callbacks
 from rest_framework import status
 from rest_framework.test import APITestCase
 from vng_api_common.audittrails.models import AuditTrail
@@ -12,10 +17,18 @@ from vng_api_common.constants import VertrouwelijkheidsAanduiding
 from vng_api_common.tests import JWTAuthMixin, reverse
 from vng_api_common.utils import get_uuid_from_path
 
-from zrc.datamodel.models import Resultaat, Zaak, ZaakInformatieObject
+from zrc.api.audits import restore_versions
+from zrc.api.pagination import CursorPagination
+from zrc.api.viewsets import ZaakViewSet
+from zrc.datamodel.models import (
+    ArchivedAuditTrail,
+    Resultaat,
+    Zaak,
+    ZaakInformatieObject,
+)
 from zrc.tests.utils import ZAAK_WRITE_KWARGS, get_oas_spec
 
-from ...datamodel.tests.factories import RolFactory
+from ...datamodel.tests.factories import RolFactory, ZaakFactory
 from .mixins import ZaakInformatieObjectSyncMixin
 
 # ZTC
@@ -258,6 +271,22 @@ class AuditTrailTests(ZaakInformatieObjectSyncMixin, JWTAuthMixin, APITestCase):
         audittrails = AuditTrail.objects.filter(hoofd_object=zaak_data["url"])
         self.assertFalse(audittrails.exists())
 
+    def test_delete_zaak_cascade_archived_audittrails(self):
+        zaak_data = self._create_zaak()
+        AuditTrail.objects.update(
+            aanmaakdatum=datetime(2018, 12, 24, tzinfo=timezone.utc)
+        )
+        call_command("archive_audittrails", "--months=1", stdout=StringIO())
+        self.assertTrue(
+            ArchivedAuditTrail.objects.filter(hoofd_object=zaak_data["url"]).exists()
+        )
+
+        response = self.client.delete(zaak_data["url"], **ZAAK_WRITE_KWARGS)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        archived = ArchivedAuditTrail.objects.filter(hoofd_object=zaak_data["url"])
+        self.assertFalse(archived.exists())
+
     def test_audittrail_applicatie_information(self):
         zaak_response = self._create_zaak()
 
@@ -333,3 +362,242 @@ class AuditTrailTests(ZaakInformatieObjectSyncMixin, JWTAuthMixin, APITestCase):
         audittrail = AuditTrail.objects.get()
         self.assertEqual(audittrail.hoofd_object, f"http://testserver{zaak_url}")
         self.assertEqual(audittrail.resource_url, f"http://testserver{rol_url}")
+
+    def _partial_update_zaak(self, url, data):
+        with requests_mock.Mocker() as requests_mocker:
+            requests_mocker.get(
+                f"{ZTC_ROOT}/schema/openapi.yaml?v=3", content=get_oas_spec("ztc")
+            )
+            for mocked_url, mocked_response in self.responses.items():
+                requests_mocker.get(mocked_url, json=mocked_response)
+
+            response = self.client.patch(url, data, **ZAAK_WRITE_KWARGS)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response.data
+
+    @override_settings(AUDITTRAIL_STORE_DIFFS=True)
+    def test_partial_update_zaak_stores_diff(self):
+        zaak_data = self._create_zaak()
+
+        zaak_response = self._partial_update_zaak(
+            zaak_data["url"], {"toelichting": "aangepast"}
+        )
+
+        audittrails = AuditTrail.objects.filter(hoofd_object=zaak_data["url"]).order_by(
+            "pk"
+        )
+        self.assertEqual(audittrails[1].oud, {"_diff": {"toelichting": ""}})
+        self.assertEqual(audittrails[1].nieuw, {"_diff": {"toelichting": "aangepast"}})
+
+        # the full versions are returned
+        zaak = Zaak.objects.get()
+        response = self.client.get(
+            reverse("audittrail-list", kwargs={"zaak_uuid": zaak.uuid})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        wijzigingen = response.json()[1]["wijzigingen"]
+        self.assertEqual(wijzigingen["oud"]["toelichting"], "")
+        self.assertEqual(wijzigingen["nieuw"]["toelichting"], "aangepast")
+        self.assertEqual(wijzigingen["nieuw"]["zaaktype"], zaak_response["zaaktype"])
+
+        trail = audittrails[1]
+        restore_versions([trail])
+        self.assertEqual(trail.oud, zaak_data)
+        self.assertEqual(trail.nieuw, zaak_response)
+
+    @override_settings(AUDITTRAIL_DEFERRED=True)
+    def test_audittrails_written_on_commit(self):
+        with capture_on_commit_callbacks() as callbacks:
+            zaak_data = self._create_zaak()
+
+        self.assertFalse(AuditTrail.objects.exists())
+
+        for callback in callbacks:
+            callback()
+
+        audittrail = AuditTrail.objects.get()
+        self.assertEqual(audittrail.actie, "create")
+        self.assertEqual(audittrail.nieuw, zaak_data)
+
+    @override_settings(AUDITTRAIL_VERSION_CACHE_TIMEOUT=60)
+    def test_update_uses_cached_version(self):
+        with capture_on_commit_callbacks(execute=True):
+            zaak_data = self._create_zaak()
+
+        with patch.object(
+            ZaakViewSet,
+            "get_serializer",
+            autospec=True,
+            side_effect=ZaakViewSet.get_serializer,
+        ) as mock_get_serializer:
+            self._partial_update_zaak(zaak_data["url"], {"toelichting": "aangepast"})
+
+        # the zaak is only serialized for the update itself
+        self.assertEqual(mock_get_serializer.call_count, 1)
+        audittrail = AuditTrail.objects.get(actie="partial_update")
+        self.assertEqual(audittrail.oud, zaak_data)
+
+    @override_settings(AUDITTRAIL_STORE_DIFFS=True)
+    def test_restore_versions_from_archive(self):
+        zaak_data = self._create_zaak()
+        zaak_response = self._partial_update_zaak(
+            zaak_data["url"], {"toelichting": "aangepast"}
+        )
+        AuditTrail.objects.filter(actie="create").update(
+            aanmaakdatum=datetime(2018, 12, 24, tzinfo=timezone.utc)
+        )
+        call_command("archive_audittrails", "--months=1", stdout=StringIO())
+
+        trail = AuditTrail.objects.get()
+        restore_versions([trail])
+
+        self.assertEqual(trail.oud, zaak_data)
+        self.assertEqual(trail.nieuw, zaak_response)
+
+
+@patch.object(CursorPagination, "page_size", 2)
+class ZaakAuditTrailListTests(JWTAuthMixin, APITestCase):
+    heeft_alle_autorisaties = True
+
+    def setUp(self):
+        super().setUp()
+
+        self.zaak = ZaakFactory.create()
+        self.zaak_url = f"http://testserver{reverse(self.zaak)}"
+        self.list_url = reverse("audittrail-list", kwargs={"zaak_uuid": self.zaak.uuid})
+
+    def create_audittrail(self, aanmaakdatum: datetime, hoofd_object: str = ""):
+        trail = AuditTrail.objects.create(
+            bron="ZRC",
+            actie="update",
+            resultaat=200,
+            hoofd_object=hoofd_object or self.zaak_url,
+            resource="zaak",
+            resource_url=hoofd_object or self.zaak_url,
+            resource_weergave=self.zaak.identificatie,
+        )
+        # aanmaakdatum is set on every save
+        AuditTrail.objects.filter(pk=trail.pk).update(aanmaakdatum=aanmaakdatum)
+        return trail
+
+    def test_list_not_paginated_without_cursor(self):
+        later = self.create_audittrail(datetime(2020, 2, 1, tzinfo=timezone.utc))
+        earlier = self.create_audittrail(datetime(2020, 1, 1, tzinfo=timezone.utc))
+        self.create_audittrail(
+            datetime(2020, 1, 1, tzinfo=timezone.utc),
+            hoofd_object=f"http://testserver{reverse(ZaakFactory.create())}",
+        )
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [trail["uuid"] for trail in response.json()],
+            [str(earlier.uuid), str(later.uuid)],
+        )
+
+    def test_list_cursor_pages(self):
+        for day in [5, 1, 3, 2, 4]:
+            self.create_audittrail(datetime(2020, 1, day, tzinfo=timezone.utc))
+
+        response = self.client.get(self.list_url, {"cursor": ""})
+        pages = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.json())
+            if not pages[-1]["next"]:
+                break
+            response = self.client.get(pages[-1]["next"])
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0]["count"], 5)
+        uuids = [trail["uuid"] for page in pages for trail in page["results"]]
+        expected = AuditTrail.objects.order_by("aanmaakdatum")
+        self.assertEqual(uuids, [str(trail.uuid) for trail in expected])
+
+    def test_list_cursor_pages_within_a_millisecond(self):
+        # the cursor keeps the microseconds, which JSON encoding truncates
+        for microsecond in [123456, 123001, 123999, 123500, 123000]:
+            self.create_audittrail(
+                datetime(2020, 1, 1, 12, 0, 0, microsecond, tzinfo=timezone.utc)
+            )
+        expected = [
+            str(trail.uuid) for trail in AuditTrail.objects.order_by("aanmaakdatum")
+        ]
+
+        response = self.client.get(self.list_url, {"cursor": ""})
+        pages = [response.json()]
+        while pages[-1]["next"]:
+            pages.append(self.client.get(pages[-1]["next"]).json())
+
+        uuids = [trail["uuid"] for page in pages for trail in page["results"]]
+        self.assertEqual(uuids, expected)
+
+        previous_pages = [pages[-1]]
+        while previous_pages[-1]["previous"]:
+            previous_pages.append(
+                self.client.get(previous_pages[-1]["previous"]).json()
+            )
+
+        self.assertEqual(
+            [page["results"] for page in previous_pages],
+            [page["results"] for page in reversed(pages)],
+        )
+
+    def test_list_filter_aanmaakdatum(self):
+        self.create_audittrail(datetime(2020, 1, 31, 23, 59, tzinfo=timezone.utc))
+        february = self.create_audittrail(datetime(2020, 2, 1, tzinfo=timezone.utc))
+        self.create_audittrail(datetime(2020, 3, 1, tzinfo=timezone.utc))
+
+        response = self.client.get(
+            self.list_url,
+            {
+                "aanmaakdatum__gte": "2020-02-01T00:00:00Z",
+                "aanmaakdatum__lt": "2020-03-01T00:00:00Z",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [trail["uuid"] for trail in response.json()], [str(february.uuid)]
+        )
+
+    @override_settings(AUDITTRAIL_HOST_ALIASES=["https://zrc.example.com"])
+    def test_list_audittrails_created_through_host_alias(self):
+        trail = self.create_audittrail(
+            datetime(2020, 1, 1, tzinfo=timezone.utc),
+            hoofd_object=f"https://zrc.example.com{reverse(self.zaak)}",
+        )
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(response.json()[0]["uuid"], str(trail.uuid))
+
+    def test_list_audittrails_created_through_other_host(self):
+        self.create_audittrail(
+            datetime(2020, 1, 1, tzinfo=timezone.utc),
+            hoofd_object=f"https://zrc.example.com{reverse(self.zaak)}",
+        )
+
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
+
+    def test_list_unknown_zaak(self):
+        response = self.client.get(
+            reverse("audittrail-list", kwargs={"zaak_uuid": uuid.uuid4()})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_zaak_without_audittrails(self):
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
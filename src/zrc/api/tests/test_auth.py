@@ -1,14 +1,24 @@
 """
 Guarantee that the proper authorization machinery is in place.
 """
+import json
 import uuid
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
+from django_capture_on_commit_callbacks import capture_on_commit_callbacks
 from rest_framework import status
 from rest_framework.test import APITestCase
 from vng_api_common.constants import VertrouwelijkheidsAanduiding
-from vng_api_common.tests import AuthCheckMixin, JWTAuthMixin, reverse
+from vng_api_common.tests import (
+    AuthCheckMixin,
+    JWTAuthMixin,
+    get_operation_url,
+    reverse,
+)
 
 from zrc.datamodel.models import ZaakInformatieObject
 from zrc.datamodel.tests.factories import (
@@ -99,6 +109,28 @@ class ZaakReadCorrectScopeTests(JWTAuthMixin, APITestCase):
             VertrouwelijkheidsAanduiding.openbaar,
         )
 
+    def test_zaak_export(self):
+        ZaakFactory.create(
+            zaaktype="https://zaaktype.nl/ok",
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.openbaar,
+        )
+        ZaakFactory.create(
+            zaaktype="https://zaaktype.nl/not_ok",
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.openbaar,
+        )
+        ZaakFactory.create(
+            zaaktype="https://zaaktype.nl/ok",
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.zeer_geheim,
+        )
+        url = get_operation_url("zaak__export")
+
+        response = self.client.get(url, **ZAAK_READ_KWARGS)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["zaaktype"], "https://zaaktype.nl/ok")
+
     def test_zaak_retreive(self):
         """
         Assert you can only read ZAAKen of the zaaktypes and vertrouwelijkheidaanduiding
@@ -155,6 +187,71 @@ class ZaakReadCorrectScopeTests(JWTAuthMixin, APITestCase):
         self.assertEqual(len(results), 4)
 
 
+@override_settings(AUTHORIZATIONS_CACHE_TIMEOUT=60)
+class ZaakListAuthorizationsCacheTests(JWTAuthMixin, APITestCase):
+    scopes = [SCOPE_ZAKEN_ALLES_LEZEN]
+    zaaktype = "https://zaaktype.nl/ok"
+    max_vertrouwelijkheidaanduiding = VertrouwelijkheidsAanduiding.openbaar
+
+    def setUp(self):
+        super().setUp()
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_compiled_authorizations_cached(self):
+        ZaakFactory.create(
+            zaaktype="https://zaaktype.nl/ok",
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.openbaar,
+        )
+        url = reverse("zaak-list")
+        self.client.get(url, **ZAAK_READ_KWARGS)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **ZAAK_READ_KWARGS)
+
+        self.assertEqual(response.data["count"], 1)
+        self.assertFalse(
+            any("authorizations_autorisatie" in query["sql"] for query in queries)
+        )
+
+    def test_changed_authorizations_invalidate_cache(self):
+        ZaakFactory.create(
+            zaaktype="https://zaaktype.nl/ok",
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.geheim,
+        )
+        url = reverse("zaak-list")
+
+        response = self.client.get(url, **ZAAK_READ_KWARGS)
+
+        self.assertEqual(response.data["count"], 0)
+
+        self.autorisatie.max_vertrouwelijkheidaanduiding = (
+            VertrouwelijkheidsAanduiding.zeer_geheim
+        )
+        with capture_on_commit_callbacks(execute=True):
+            self.autorisatie.save()
+
+        response = self.client.get(url, **ZAAK_READ_KWARGS)
+
+        self.assertEqual(response.data["count"], 1)
+
+    def test_cache_invalidated_on_commit(self):
+        url = reverse("zaak-list")
+        self.client.get(url, **ZAAK_READ_KWARGS)
+        key = f"zrc:authorizations:{self.applicatie.pk}"
+
+        with capture_on_commit_callbacks() as callbacks:
+            self.autorisatie.save()
+
+        self.assertIsNotNone(cache.get(key))
+
+        for callback in callbacks:
+            callback()
+
+        self.assertIsNone(cache.get(key))
+
+
 class StatusReadTests(JWTAuthMixin, APITestCase):
     scopes = [SCOPE_ZAKEN_ALLES_LEZEN]
     zaaktype = "https://zaaktype.nl/ok"
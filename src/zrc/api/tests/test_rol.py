@@ -1,6 +1,8 @@
 from unittest.mock import patch
 from uuid import uuid4
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.translation import gettext as _
 
 import requests_mock
@@ -19,8 +21,10 @@ from zds_client.tests.mocks import mock_client
 from zrc.datamodel.constants import IndicatieMachtiging
 from zrc.datamodel.models import (
     Adres,
+    Medewerker,
     NatuurlijkPersoon,
     NietNatuurlijkPersoon,
+    OrganisatorischeEenheid,
     Rol,
     SubVerblijfBuitenland,
     Vestiging,
@@ -498,3 +502,65 @@ class RolTestCase(JWTAuthMixin, TypeCheckMixin, APITestCase):
 
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]["betrokkeneIdentificatie"]["inpBsn"], "183068142")
+
+
+class RolListQueriesTests(JWTAuthMixin, APITestCase):
+    heeft_alle_autorisaties = True
+
+    def create_rol(self, betrokkene_type: str) -> Rol:
+        rol = RolFactory.create(betrokkene_type=betrokkene_type, betrokkene="")
+        rol.statussen.add(StatusFactory.create(zaak=rol.zaak))
+
+        if betrokkene_type == RolTypes.natuurlijk_persoon:
+            persoon = NatuurlijkPersoon.objects.create(rol=rol, inp_bsn="183068142")
+            Adres.objects.create(
+                natuurlijkpersoon=persoon, identificatie="123", huisnummer=1
+            )
+            SubVerblijfBuitenland.objects.create(
+                natuurlijkpersoon=persoon, lnd_landcode="UK"
+            )
+        elif betrokkene_type == RolTypes.niet_natuurlijk_persoon:
+            persoon = NietNatuurlijkPersoon.objects.create(
+                rol=rol, ann_identificatie="123456"
+            )
+            SubVerblijfBuitenland.objects.create(
+                nietnatuurlijkpersoon=persoon, lnd_landcode="UK"
+            )
+        elif betrokkene_type == RolTypes.vestiging:
+            vestiging = Vestiging.objects.create(rol=rol, vestigings_nummer="123456")
+            Adres.objects.create(vestiging=vestiging, identificatie="123", huisnummer=1)
+            SubVerblijfBuitenland.objects.create(vestiging=vestiging, lnd_landcode="UK")
+        elif betrokkene_type == RolTypes.organisatorische_eenheid:
+            OrganisatorischeEenheid.objects.create(rol=rol, identificatie="123")
+        elif betrokkene_type == RolTypes.medewerker:
+            Medewerker.objects.create(rol=rol, identificatie="123")
+        return rol
+
+    def count_list_queries(self) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(get_operation_url("rol_list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_list_queries_independent_of_rows(self):
+        for betrokkene_type in RolTypes.values:
+            with self.subTest(betrokkene_type=betrokkene_type):
+                Rol.objects.all().delete()
+                self.create_rol(betrokkene_type)
+                num_queries = self.count_list_queries()
+
+                for _i in range(2):
+                    self.create_rol(betrokkene_type)
+
+                self.assertEqual(self.count_list_queries(), num_queries)
+
+    def test_list_mixed_types_queries_independent_of_rows(self):
+        for betrokkene_type in RolTypes.values:
+            self.create_rol(betrokkene_type)
+        num_queries = self.count_list_queries()
+
+        for betrokkene_type in RolTypes.values:
+            self.create_rol(betrokkene_type)
+
+        self.assertEqual(self.count_list_queries(), num_queries)
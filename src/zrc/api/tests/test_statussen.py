@@ -47,8 +47,8 @@ class StatusTests(JWTAuthMixin, APITestCase):
         ZDS_CLIENT_CLASS="vng_api_common.mocks.MockClient",
     )
     def test_filter_statussen_op_indicatie_laatst_gezette_status(self):
-        status1, status2 = StatusFactory.create_batch(2)
-        assert status1.zaak != status2.zaak
+        status1 = StatusFactory.create()
+        status2 = StatusFactory.create(zaak=status1.zaak)
         status1.datum_status_gezet = dt_to_api(
             datetime.datetime(1900, 11, 15, 20, 20, 58, tzinfo=timezone.utc)
         )
@@ -79,6 +79,30 @@ class StatusTests(JWTAuthMixin, APITestCase):
             response_data[0]["url"], f"http://testserver.com{status1_url}"
         )
 
+    @override_settings(
+        LINK_FETCHER="vng_api_common.mocks.link_fetcher_200",
+        ZDS_CLIENT_CLASS="vng_api_common.mocks.MockClient",
+    )
+    def test_filter_statussen_op_indicatie_laatst_gezette_status_per_zaak(self):
+        status1, status2 = StatusFactory.create_batch(2)
+        assert status1.zaak != status2.zaak
+        StatusFactory.create(
+            zaak=status1.zaak,
+            datum_status_gezet=datetime.datetime(1900, 1, 1, tzinfo=timezone.utc),
+        )
+
+        response = self.client.get(
+            reverse("status-list"),
+            {"indicatieLaatstGezetteStatus": True},
+            HTTP_HOST="testserver.com",
+        )
+
+        self.assertEqual(response.status_code, rest_framework_status.HTTP_200_OK)
+        self.assertEqual(
+            {status["uuid"] for status in response.json()["results"]},
+            {str(status1.uuid), str(status2.uuid)},
+        )
+
     @override_settings(
         LINK_FETCHER="vng_api_common.mocks.link_fetcher_200",
         ZDS_CLIENT_CLASS="vng_api_common.mocks.MockClient",
@@ -110,9 +134,10 @@ class StatusTests(JWTAuthMixin, APITestCase):
     def test_status_indicatie_laatst_gezette_status(self):
         status_latest = StatusFactory()
         status_old = StatusFactory(
+            zaak=status_latest.zaak,
             datum_status_gezet=dt_to_api(
                 datetime.datetime(1900, 11, 15, 20, 20, 58, tzinfo=timezone.utc)
-            )
+            ),
         )
         url_latest = reverse("status-detail", kwargs={"uuid": status_latest.uuid})
         url_old = reverse("status-detail", kwargs={"uuid": status_old.uuid})
@@ -122,6 +147,11 @@ class StatusTests(JWTAuthMixin, APITestCase):
         )
         zaak_url_old = reverse("zaak-detail", kwargs={"uuid": status_old.zaak.uuid})
 
+        # the most recent status of another zaak doesn't matter
+        StatusFactory(
+            datum_status_gezet=datetime.datetime(2100, 1, 1, tzinfo=timezone.utc)
+        )
+
         response_latest = self.client.get(url_latest, HTTP_HOST="testserver.com")
         response_old = self.client.get(url_old, HTTP_HOST="testserver.com")
 
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import override_settings, tag
+from django.test.utils import CaptureQueriesContext
 
 import requests_mock
 from rest_framework import status
@@ -1622,3 +1624,82 @@ class ZaakObjectObjectTypeOverigeDefinitie(JWTAuthMixin, APITestCase):
         self.assertEqual(
             response.status_code, status.HTTP_400_BAD_REQUEST, response.json()
         )
+
+
+class ZaakObjectListQueriesTests(JWTAuthMixin, APITestCase):
+    heeft_alle_autorisaties = True
+
+    def create_adres(self, **kwargs) -> Adres:
+        return Adres.objects.create(identificatie="a", huisnummer=1, **kwargs)
+
+    def create_zaakobject(self, object_type: str) -> ZaakObject:
+        zaakobject = ZaakObjectFactory.create(object="", object_type=object_type)
+
+        if object_type == ZaakobjectTypes.adres:
+            self.create_adres(zaakobject=zaakobject)
+        elif object_type == ZaakobjectTypes.huishouden:
+            huishouden = Huishouden.objects.create(zaakobject=zaakobject, nummer="1")
+            terreingebouwdobject = TerreinGebouwdObject.objects.create(
+                huishouden=huishouden, identificatie="1"
+            )
+            self.create_adres(terreingebouwdobject=terreingebouwdobject)
+        elif object_type == ZaakobjectTypes.medewerker:
+            Medewerker.objects.create(zaakobject=zaakobject, identificatie="1")
+        elif object_type == ZaakobjectTypes.natuurlijk_persoon:
+            NatuurlijkPersoon.objects.create(zaakobject=zaakobject, inp_bsn="1")
+        elif object_type == ZaakobjectTypes.terrein_gebouwd_object:
+            terreingebouwdobject = TerreinGebouwdObject.objects.create(
+                zaakobject=zaakobject, identificatie="1"
+            )
+            self.create_adres(terreingebouwdobject=terreingebouwdobject)
+        elif object_type == ZaakobjectTypes.woz_object:
+            wozobject = WozObject.objects.create(
+                zaakobject=zaakobject, woz_object_nummer="1"
+            )
+            self.create_adres(wozobject=wozobject)
+        elif object_type == ZaakobjectTypes.woz_deelobject:
+            woz_deelobject = WozDeelobject.objects.create(
+                zaakobject=zaakobject, nummer_woz_deel_object="1"
+            )
+            wozobject = WozObject.objects.create(
+                woz_deelobject=woz_deelobject, woz_object_nummer="1"
+            )
+            self.create_adres(wozobject=wozobject)
+        elif object_type == ZaakobjectTypes.woz_waarde:
+            woz_warde = WozWaarde.objects.create(
+                zaakobject=zaakobject, waardepeildatum="2019"
+            )
+            wozobject = WozObject.objects.create(
+                woz_warde=woz_warde, woz_object_nummer="1"
+            )
+            self.create_adres(wozobject=wozobject)
+        return zaakobject
+
+    def count_list_queries(self) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(get_operation_url("zaakobject_list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_list_queries_independent_of_rows(self):
+        object_types = [
+            ZaakobjectTypes.adres,
+            ZaakobjectTypes.huishouden,
+            ZaakobjectTypes.medewerker,
+            ZaakobjectTypes.natuurlijk_persoon,
+            ZaakobjectTypes.terrein_gebouwd_object,
+            ZaakobjectTypes.woz_object,
+            ZaakobjectTypes.woz_deelobject,
+            ZaakobjectTypes.woz_waarde,
+        ]
+        for object_type in object_types:
+            with self.subTest(object_type=object_type):
+                ZaakObject.objects.all().delete()
+                self.create_zaakobject(object_type)
+                num_queries = self.count_list_queries()
+
+                for _i in range(2):
+                    self.create_zaakobject(object_type)
+
+                self.assertEqual(self.count_list_queries(), num_queries)
@@ -1,15 +1,25 @@
+import csv
+import io
+import json
 import unittest
 import uuid
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from unittest.mock import patch
 
 from django.contrib.gis.geos import Point
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import F
 from django.test import override_settings, tag
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
+import requests_mock
 from dateutil.relativedelta import relativedelta
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from vng_api_common.authorizations.models import AuthorizationsConfig, Autorisatie
 from vng_api_common.constants import (
     Archiefnominatie,
     BrondatumArchiefprocedureAfleidingswijze,
@@ -26,6 +36,10 @@ from vng_api_common.tests import (
 )
 from zds_client.tests.mocks import mock_client
 
+from zrc.api import expansion_cache
+from zrc.api.export import iter_csv
+from zrc.api.filters import ZaakFilter
+from zrc.api.pagination import KeysetPagination
 from zrc.api.tests.mixins import ZaakInformatieObjectSyncMixin
 from zrc.datamodel.constants import BetalingsIndicatie
 from zrc.datamodel.models import (
@@ -34,10 +48,13 @@ from zrc.datamodel.models import (
     NietNatuurlijkPersoon,
     OrganisatorischeEenheid,
     RelevanteZaakRelatie,
+    Status,
     Vestiging,
     Zaak,
 )
 from zrc.datamodel.tests.factories import (
+    RelevanteZaakRelatieFactory,
+    ResultaatFactory,
     RolFactory,
     StatusFactory,
     ZaakBesluitFactory,
@@ -748,6 +765,261 @@ class ZakenTests(ZaakInformatieObjectSyncMixin, JWTAuthMixin, APITestCase):
         )
 
 
+class ZakenQueryCountTests(ZaakInformatieObjectSyncMixin, JWTAuthMixin, APITestCase):
+    heeft_alle_autorisaties = True
+
+    def _create_zaak(self):
+        zaak = ZaakFactory.create(hoofdzaak=ZaakFactory.create())
+        StatusFactory.create(zaak=zaak)
+        ResultaatFactory.create(zaak=zaak)
+        ZaakEigenschapFactory.create(zaak=zaak)
+        RelevanteZaakRelatieFactory.create(zaak=zaak)
+        RolFactory.create(zaak=zaak)
+        ZaakObjectFactory.create(zaak=zaak)
+        ZaakInformatieObjectFactory.create(zaak=zaak)
+
+    def test_list_query_count_independent_of_number_of_zaken(self):
+        url = reverse(Zaak)
+        self._create_zaak()
+        self.client.get(url, **ZAAK_READ_KWARGS)
+
+        with CaptureQueriesContext(connection) as few_zaken:
+            response = self.client.get(url, **ZAAK_READ_KWARGS)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for _ in range(4):
+            self._create_zaak()
+
+        with CaptureQueriesContext(connection) as many_zaken:
+            response = self.client.get(url, **ZAAK_READ_KWARGS)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 10)
+
+        self.assertEqual(len(many_zaken), len(few_zaken))
+
+    def test_status_from_annotation(self):
+        zaak = ZaakFactory.create()
+        StatusFactory.create(zaak=zaak, datum_status_gezet=utcdatetime(2019, 1, 1))
+        status2 = StatusFactory.create(
+            zaak=zaak, datum_status_gezet=utcdatetime(2019, 2, 1)
+        )
+
+        response = self.client.get(reverse(zaak), **ZAAK_READ_KWARGS)
+
+        self.assertEqual(
+            response.json()["status"], f"http://testserver{reverse(status2)}"
+        )
+
+
+class ZakenExportTests(JWTAuthMixin, APITestCase):
+    heeft_alle_autorisaties = True
+
+    @override_settings(ZAAK_EXPORT_CHUNK_SIZE=2)
+    def test_export_ndjson(self):
+        for _ in range(3):
+            RolFactory.create(zaak=ZaakFactory.create(zaaktype=ZAAKTYPE))
+        list_response = self.client.get(reverse(Zaak), **ZAAK_READ_KWARGS)
+
+        response = self.client.get(
+            get_operation_url("zaak__export"), **ZAAK_READ_KWARGS
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines], list_response.json()["results"]
+        )
+
+    def test_export_filtered(self):
+        zaak = ZaakFactory.create(zaaktype=ZAAKTYPE, identificatie="export")
+        ZaakFactory.create(zaaktype=ZAAKTYPE)
+
+        response = self.client.get(
+            get_operation_url("zaak__export"),
+            {"identificatie": "export"},
+            **ZAAK_READ_KWARGS,
+        )
+
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["uuid"], str(zaak.uuid))
+
+    def test_export_csv(self):
+        zaak = ZaakFactory.create(zaaktype=ZAAKTYPE)
+
+        response = self.client.get(
+            get_operation_url("zaak__export"), {"formaat": "csv"}, **ZAAK_READ_KWARGS
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b"".join(response.streaming_content).decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["uuid"], str(zaak.uuid))
+        self.assertEqual(rows[0]["zaaktype"], ZAAKTYPE)
+        self.assertEqual(json.loads(rows[0]["kenmerken"]), [])
+        self.assertIn("verantwoordelijkeOrganisatie", rows[0])
+
+    def test_export_csv_json_notation(self):
+        chunks = [[{"indicatie": True, "reden": None, "extra": {"actief": False}}]]
+
+        content = "".join(
+            iter_csv(chunks, lambda chunk: chunk, ["indicatie", "reden", "extra"])
+        )
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            rows, [{"indicatie": "true", "reden": "", "extra": '{"actief": false}'}]
+        )
+
+    def test_export_invalid_format(self):
+        response = self.client.get(
+            get_operation_url("zaak__export"), {"formaat": "xml"}, **ZAAK_READ_KWARGS
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@patch.object(KeysetPagination, "page_size", 2)
+class ZakenKeysetPaginationTests(JWTAuthMixin, APITestCase):
+    heeft_alle_autorisaties = True
+
+    def _get_all_pages(self, params: dict) -> list:
+        response = self.client.get(reverse(Zaak), params, **ZAAK_READ_KWARGS)
+        pages = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.json())
+            if not pages[-1]["next"]:
+                return pages
+            response = self.client.get(pages[-1]["next"], **ZAAK_READ_KWARGS)
+
+    def test_cursor_pages(self):
+        zaken = ZaakFactory.create_batch(5)
+
+        pages = self._get_all_pages({"cursor": ""})
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0]["count"], 5)
+        self.assertIsNone(pages[0]["previous"])
+        uuids = [zaak["uuid"] for page in pages for zaak in page["results"]]
+        self.assertEqual(uuids, [str(zaak.uuid) for zaak in reversed(zaken)])
+
+        response = self.client.get(pages[2]["previous"], **ZAAK_READ_KWARGS)
+
+        self.assertEqual(response.json()["results"], pages[1]["results"])
+        self.assertEqual(response.json()["next"], pages[1]["next"])
+
+    def test_cursor_pages_every_ordering(self):
+        dates = [date(2020, 1, 2), None, date(2020, 1, 1), None, date(2020, 1, 2)]
+        for value in dates:
+            ZaakFactory.create(
+                startdatum=value or date(2020, 1, 3),
+                einddatum=value,
+                publicatiedatum=value,
+                archiefactiedatum=value,
+            )
+
+        for field in ZaakFilter.base_filters["ordering"].param_map:
+            for ordering in [field, f"-{field}"]:
+                with self.subTest(ordering=ordering):
+                    pages = self._get_all_pages({"cursor": "", "ordering": ordering})
+
+                    zaken = [zaak for page in pages for zaak in page["results"]]
+                    expected = Zaak.objects.order_by(
+                        F(field).desc(nulls_first=True)
+                        if ordering.startswith("-")
+                        else F(field).asc(nulls_last=True),
+                        "pk",
+                    )
+                    self.assertEqual(
+                        [zaak["uuid"] for zaak in zaken],
+                        [str(zaak.uuid) for zaak in expected],
+                    )
+
+    def test_cursor_pages_ordering_on_related_field(self):
+        for einddatum in [date(2020, 1, 2), None, date(2020, 1, 1), None]:
+            StatusFactory.create(zaak__einddatum=einddatum)
+
+        for ordering in ["zaak__einddatum", "-zaak__einddatum"]:
+            with self.subTest(ordering=ordering):
+                queryset = Status.objects.order_by(ordering)
+                paginator = KeysetPagination()
+                url = "/?cursor="
+                statussen = []
+                while url:
+                    request = Request(APIRequestFactory().get(url))
+                    statussen += paginator.paginate_queryset(queryset, request)
+                    url = paginator.get_next_link()
+
+                field = ordering.lstrip("-")
+                expected = Status.objects.order_by(
+                    F(field).desc(nulls_first=True)
+                    if ordering.startswith("-")
+                    else F(field).asc(nulls_last=True),
+                    "pk",
+                )
+                self.assertEqual(statussen, list(expected))
+
+    def test_cursor_pages_datetimes_within_a_millisecond(self):
+        for microsecond in [123456, 123001, 123999, 123500, 123000]:
+            StatusFactory.create(
+                datum_status_gezet=datetime(
+                    2020, 1, 1, 12, 0, 0, microsecond, tzinfo=timezone.utc
+                )
+            )
+        queryset = Status.objects.order_by("datum_status_gezet")
+        paginator = KeysetPagination()
+
+        def get_page(url):
+            request = Request(APIRequestFactory().get(url))
+            return paginator.paginate_queryset(queryset, request)
+
+        pages = [get_page("/?cursor=")]
+        while paginator.get_next_link():
+            pages.append(get_page(paginator.get_next_link()))
+        previous_pages = [pages[-1]]
+        while paginator.get_previous_link():
+            previous_pages.insert(0, get_page(paginator.get_previous_link()))
+
+        expected = list(Status.objects.order_by("datum_status_gezet", "pk"))
+        self.assertEqual([item for page in pages for item in page], expected)
+        self.assertEqual(previous_pages, pages)
+
+    def test_cursor_pages_seek_without_offset(self):
+        ZaakFactory.create_batch(5)
+        first_page = self.client.get(reverse(Zaak), {"cursor": ""}, **ZAAK_READ_KWARGS)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(first_page.json()["next"], **ZAAK_READ_KWARGS)
+
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertFalse(any("OFFSET" in query["sql"] for query in queries))
+
+    @override_settings(PAGINATION_CURSOR_DEFAULT=True, PAGINATION_CURSOR_COUNT="none")
+    def test_cursor_pagination_by_default_without_count(self):
+        ZaakFactory.create_batch(3)
+
+        response = self.client.get(reverse(Zaak), **ZAAK_READ_KWARGS)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.json()["count"])
+        self.assertIn("cursor=", response.json()["next"])
+
+        response = self.client.get(reverse(Zaak), {"page": 2}, **ZAAK_READ_KWARGS)
+
+        self.assertEqual(response.json()["count"], 3)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse(Zaak), {"cursor": "invalid"}, **ZAAK_READ_KWARGS
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 @override_settings(
     LINK_FETCHER="vng_api_common.mocks.link_fetcher_200",
     ZDS_CLIENT_CLASS="vng_api_common.mocks.MockClient",
@@ -1314,6 +1586,183 @@ class ZakenExpandTests(ZaakInformatieObjectSyncMixin, JWTAuthMixin, APITestCase)
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    @override_settings(ZDS_CLIENT_CLASS="vng_api_common.mocks.MockClient")
+    @patch("vng_api_common.validators.fetcher")
+    @patch("vng_api_common.validators.obj_has_shape", return_value=True)
+    def test_get_expand_shared_path(self, *mocks):
+        zaak = ZaakFactory.create()
+        status1 = StatusFactory.create(zaak=zaak)
+        rol, rol2 = RolFactory.create_batch(2, zaak=zaak)
+        rol.statussen.add(status1)
+        zaak_url = f"http://testserver{reverse(zaak)}"
+
+        response = self.client.get(
+            zaak_url,
+            {"expand": "rollen.statussen,rollen.zaak,status"},
+            **ZAAK_READ_KWARGS,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expand = response.json()["_expand"]
+        self.assertEqual(
+            expand["status"]["url"], f"http://testserver{reverse(status1)}"
+        )
+        rollen = {rol["url"]: rol for rol in expand["rollen"]}
+        self.assertEqual(
+            set(rollen),
+            {f"http://testserver{reverse(rol)}", f"http://testserver{reverse(rol2)}"},
+        )
+        expanded_rol = rollen[f"http://testserver{reverse(rol)}"]
+        self.assertEqual(set(expanded_rol["_expand"]), {"statussen", "zaak"})
+        self.assertEqual(
+            [item["url"] for item in expanded_rol["_expand"]["statussen"]],
+            [f"http://testserver{reverse(status1)}"],
+        )
+        self.assertEqual(expanded_rol["_expand"]["zaak"]["url"], zaak_url)
+        self.assertNotIn("_expand", expanded_rol["_expand"]["zaak"])
+        self.assertEqual(
+            rollen[f"http://testserver{reverse(rol2)}"]["_expand"]["statussen"], []
+        )
+        # no bookkeeping keys are left in the expanded data
+        for key in ["loop_id", "depth", "code", "parent_code"]:
+            self.assertNotIn(key, expanded_rol)
+            self.assertNotIn(key, expanded_rol["_expand"]["zaak"])
+
+    def test_list_expand_local_resources_loaded_per_type(self):
+        for zaak in ZaakFactory.create_batch(5):
+            RolFactory.create_batch(2, zaak=zaak)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("zaak-list"), {"expand": "rollen"}, **ZAAK_READ_KWARGS
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for zaak in response.json()["results"]:
+            self.assertEqual(
+                [rol["url"] for rol in zaak["_expand"]["rollen"]], zaak["rollen"]
+            )
+        # all rollen of the page are loaded with a single query
+        rol_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"datamodel_rol"."uuid" IN' in query["sql"]
+        ]
+        self.assertEqual(len(rol_queries), 1)
+
+    @requests_mock.Mocker()
+    def test_list_expand_external_resource_fetched_once(self, m):
+        m.get(self.ZAAKTYPE, json={"url": self.ZAAKTYPE, "omschrijving": "test"})
+        ZaakFactory.create_batch(3, zaaktype=self.ZAAKTYPE)
+
+        response = self.client.get(
+            reverse("zaak-list"), {"expand": "zaaktype"}, **ZAAK_READ_KWARGS
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(m.call_count, 1)
+        for zaak in response.json()["results"]:
+            self.assertEqual(zaak["_expand"]["zaaktype"]["omschrijving"], "test")
+
+
+@override_settings(EXPAND_CACHE_TTL=60)
+class ZakenExpandCacheTests(JWTAuthMixin, APITestCase):
+    heeft_alle_autorisaties = True
+    ZAAKTYPE = "https://example.com/ztc/api/v1/zaaktypen/1"
+
+    def setUp(self):
+        super().setUp()
+
+        caches[expansion_cache.CACHE_ALIAS].clear()
+        self.addCleanup(caches[expansion_cache.CACHE_ALIAS].clear)
+
+    def expand(self, expand: str) -> list:
+        response = self.client.get(
+            reverse("zaak-list"), {"expand": expand}, **ZAAK_READ_KWARGS
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["results"]
+
+    @requests_mock.Mocker()
+    def test_external_resource_cached_between_requests(self, m):
+        m.get(self.ZAAKTYPE, json={"url": self.ZAAKTYPE, "omschrijving": "test"})
+        ZaakFactory.create(zaaktype=self.ZAAKTYPE)
+
+        self.expand("zaaktype")
+        results = self.expand("zaaktype")
+
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(results[0]["_expand"]["zaaktype"]["omschrijving"], "test")
+
+    @requests_mock.Mocker()
+    def test_expired_external_resource_revalidated(self, m):
+        m.get(
+            self.ZAAKTYPE,
+            json={"url": self.ZAAKTYPE, "omschrijving": "test"},
+            headers={"ETag": '"v1"'},
+        )
+        ZaakFactory.create(zaaktype=self.ZAAKTYPE)
+
+        with patch("zrc.api.expansion_cache.time") as mock_time:
+            mock_time.time.return_value = 1000
+            self.expand("zaaktype")
+
+            m.get(self.ZAAKTYPE, status_code=304)
+            mock_time.time.return_value = 1000 + 5 * 60
+            results = self.expand("zaaktype")
+
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(m.last_request.headers["If-None-Match"], '"v1"')
+        self.assertEqual(results[0]["_expand"]["zaaktype"]["omschrijving"], "test")
+
+    @requests_mock.Mocker()
+    def test_external_resource_not_shared_between_authorizations(self, m):
+        m.get(self.ZAAKTYPE, json={"url": self.ZAAKTYPE, "omschrijving": "test"})
+        ZaakFactory.create(zaaktype=self.ZAAKTYPE)
+
+        self.expand("zaaktype")
+        Autorisatie.objects.create(
+            applicatie=self.applicatie,
+            component=AuthorizationsConfig.get_solo().component,
+            scopes=[str(SCOPE_ZAKEN_ALLES_LEZEN)],
+            max_vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.openbaar,
+        )
+        self.expand("zaaktype")
+
+        self.assertEqual(m.call_count, 2)
+
+    def test_local_resource_cached_on_etag(self):
+        rol = RolFactory.create()
+        rol.calculate_etag_value()
+
+        def rol_queries(queries):
+            return [
+                query["sql"]
+                for query in queries
+                if '"datamodel_rol"."uuid" IN' in query["sql"]
+            ]
+
+        self.expand("rollen")
+        with CaptureQueriesContext(connection) as context:
+            results = self.expand("rollen")
+
+        # only the ETags are looked up
+        self.assertEqual(len(rol_queries(context.captured_queries)), 1)
+        self.assertEqual(
+            results[0]["_expand"]["rollen"][0]["url"],
+            f"http://testserver{reverse(rol)}",
+        )
+
+        rol.roltoelichting = "changed"
+        rol.save()
+        rol.calculate_etag_value()
+
+        results = self.expand("rollen")
+
+        self.assertEqual(
+            results[0]["_expand"]["rollen"][0]["roltoelichting"], "changed"
+        )
+
 
 class ZakenWerkVoorraadTests(JWTAuthMixin, APITestCase):
     """
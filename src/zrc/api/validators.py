@@ -3,34 +3,28 @@ import logging
 from datetime import date
 from typing import Iterable, Optional
 
-from django.conf import settings
 from django.db import models
 from django.utils import timezone
-from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 
 import jq
 import jsonschema
 from rest_framework import serializers
 from vng_api_common.constants import Archiefstatus
-from vng_api_common.models import APICredential
 from vng_api_common.validators import (
     UniekeIdentificatieValidator as _UniekeIdentificatieValidator,
     URLValidator,
 )
 
 from ..datamodel.models.core import Zaak
+from ..utils.resources import fetch_resource
 from .auth import get_auth
 
 logger = logging.getLogger(__name__)
 
 
 def fetch_object(resource: str, url: str) -> dict:
-    Client = import_string(settings.ZDS_CLIENT_CLASS)
-    client = Client.from_url(url)
-    client.auth = APICredential.get_auth(url)
-    obj = client.retrieve(resource, url=url)
-    return obj
+    return fetch_resource(resource, url)
 
 
 class RolOccurenceValidator:
@@ -1,36 +1,28 @@
 import logging
+from urllib.parse import urlparse
 
-from django.core.cache import caches
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext as _
 
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from notifications_api_common.kanalen import Kanaal
-from notifications_api_common.viewsets import (
-    NotificationCreateMixin,
-    NotificationDestroyMixin,
-    NotificationViewSetMixin,
-)
 from rest_framework import mixins, serializers, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.reverse import reverse
 from rest_framework.serializers import ValidationError
 from rest_framework.settings import api_settings
-from vng_api_common.audittrails.viewsets import (
-    AuditTrailCreateMixin,
-    AuditTrailDestroyMixin,
-    AuditTrailViewSet,
-    AuditTrailViewsetMixin,
-)
+from vng_api_common.audittrails.viewsets import AuditTrailViewSet
 from vng_api_common.caching import conditional_retrieve
 from vng_api_common.filters import Backend
 from vng_api_common.geo import GeoMixin
 from vng_api_common.permissions import permission_class_factory
 from vng_api_common.search import SearchMixin
 from vng_api_common.utils import lookup_kwargs_to_filters
-from vng_api_common.viewsets import CheckQueryParamsMixin, NestedViewSetMixin
+from vng_api_common.viewsets import NestedViewSetMixin
 
 from zrc.datamodel.models import (
     KlantContact,
@@ -44,12 +36,32 @@ from zrc.datamodel.models import (
     ZaakInformatieObject,
     ZaakObject,
 )
+from zrc.sync.markers import (
+    zcms_marked_for_delete,
+    zios_marked_for_delete,
+    zvs_marked_for_delete,
+)
 from zrc.sync.signals import SyncError
 
-from .audits import AUDIT_ZRC
+from .audits import (
+    AUDIT_ZRC,
+    AuditTrailCreateMixin,
+    AuditTrailDestroyMixin,
+    AuditTrailViewsetMixin,
+    restore_versions,
+)
 from .data_filtering import ListFilterByAuthorizationsMixin
 from .expansions import ExpandFieldValidator, ExpansionMixin
+from .export import (
+    CONTENT_TYPES,
+    FORMAT_CSV,
+    FORMAT_NDJSON,
+    iter_chunks,
+    iter_csv,
+    iter_ndjson,
+)
 from .filters import (
+    AuditTrailFilter,
     KlantContactFilter,
     ResultaatFilter,
     RolFilter,
@@ -61,7 +73,14 @@ from .filters import (
     ZaakVerzoekFilter,
 )
 from .kanalen import KANAAL_ZAKEN
-from .mixins import ClosedZaakMixin
+from .mixins import (
+    CheckQueryParamsMixin,
+    ClosedZaakMixin,
+    NotificationCreateMixin,
+    NotificationDestroyMixin,
+    NotificationViewSetMixin,
+)
+from .pagination import CursorPagination, KeysetPagination
 from .permissions import (
     ZaakAuthScopesRequired,
     ZaakBaseAuthRequired,
@@ -190,6 +209,29 @@ from django.db import models
             " niet geschikt voor geo-zoekopdrachten."
         ),
     ),
+    _export=extend_schema(
+        summary=_("Exporteer alle ZAAKen."),
+        description=_(
+            "Alle ZAAKen die aan de filters voldoen, zonder paginering, als"
+            " NDJSON (een ZAAK per regel) of CSV. De velden zijn gelijk aan die"
+            " van de `list` operatie.\n\n"
+            "**Opmerkingen**\n"
+            "- er worden enkel zaken getoond van de zaaktypes waar u toe"
+            " geautoriseerd bent."
+        ),
+        parameters=[
+            OpenApiParameter(
+                "formaat",
+                OpenApiTypes.STR,
+                enum=[FORMAT_NDJSON, FORMAT_CSV],
+                description=_("Het formaat van de export."),
+            )
+        ],
+        responses={
+            (200, CONTENT_TYPES[FORMAT_NDJSON]): OpenApiTypes.STR,
+            (200, "text/csv"): OpenApiTypes.STR,
+        },
+    ),
 )
 @conditional_retrieve()
 class ZaakViewSet(
@@ -203,24 +245,33 @@ class ZaakViewSet(
     ListFilterByAuthorizationsMixin,
     viewsets.ModelViewSet,
 ):
-    queryset = Zaak.objects.prefetch_related(
-        "deelzaken",
-        "rol_set",
-        "zaakobject_set",
-        "zaakinformatieobject_set",
-    ).order_by("-pk")
+    queryset = (
+        Zaak.objects.with_current_status()
+        .select_related("hoofdzaak", "resultaat")
+        .prefetch_related(
+            "deelzaken",
+            "rol_set",
+            "zaakobject_set",
+            "zaakinformatieobject_set",
+            "zaakeigenschap_set",
+            "zaakkenmerk_set",
+            "relevante_andere_zaken",
+        )
+        .order_by("-pk")
+    )
     serializer_class = ZaakSerializer
     search_input_serializer_class = ZaakZoekSerializer
     filter_backends = (Backend,)
     filterset_class = ZaakFilter
     lookup_field = "uuid"
-    pagination_class = PageNumberPagination
+    pagination_class = KeysetPagination
 
     permission_classes = (ZaakAuthScopesRequired,)
     required_scopes = {
         "list": SCOPE_ZAKEN_ALLES_LEZEN,
         "retrieve": SCOPE_ZAKEN_ALLES_LEZEN,
         "_zoek": SCOPE_ZAKEN_ALLES_LEZEN,
+        "_export": SCOPE_ZAKEN_ALLES_LEZEN,
         "create": SCOPE_ZAKEN_CREATE,
         "update": SCOPE_ZAKEN_BIJWERKEN | SCOPE_ZAKEN_GEFORCEERD_BIJWERKEN,
         "partial_update": SCOPE_ZAKEN_BIJWERKEN | SCOPE_ZAKEN_GEFORCEERD_BIJWERKEN,
@@ -228,6 +279,7 @@ class ZaakViewSet(
     }
     notifications_kanaal = KANAAL_ZAKEN
     audit = AUDIT_ZRC
+    authorizations_filter_actions = ("list", "_export")
 
     global_description = _(
         "Een zaak mag (in principe) niet meer gewijzigd worden als de `archiefstatus`"
@@ -266,6 +318,41 @@ class ZaakViewSet(
         response = super().get_search_output(queryset)
         return self.inclusions(response)
 
+    @action(methods=("get",), detail=False)
+    def _export(self, request, *args, **kwargs):
+        """
+        Exporteer alle ZAAKen als NDJSON of CSV.
+
+        De ZAAKen worden gestreamd, zodat ook grote exports niet in het
+        geheugen gehouden worden.
+        """
+        export_format = request.query_params.get("formaat", FORMAT_NDJSON)
+        if export_format not in CONTENT_TYPES:
+            raise ValidationError(
+                {"formaat": _("Ongeldig formaat: %s") % export_format},
+                code="invalid-choice",
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        chunks = iter_chunks(queryset, settings.ZAAK_EXPORT_CHUNK_SIZE)
+
+        def serialize(chunk):
+            return self.get_serializer(chunk, many=True).data
+
+        if export_format == FORMAT_CSV:
+            field_names = list(self.get_serializer().fields)
+            content = iter_csv(chunks, serialize, field_names)
+        else:
+            content = iter_ndjson(chunks, serialize)
+
+        response = StreamingHttpResponse(
+            content, content_type=CONTENT_TYPES[export_format]
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="zaken.{export_format}"'
+        return response
+
     def perform_update(self, serializer):
         """
         Perform the update of the Case.
@@ -337,11 +424,16 @@ class StatusViewSet(
     mixins.CreateModelMixin,
     viewsets.ReadOnlyModelViewSet,
 ):
-    queryset = Status.objects.order_by("-pk")
+    queryset = (
+        Status.objects.with_indicatie_laatst_gezette_status()
+        .select_related("zaak")
+        .prefetch_related("zaakinformatieobjecten")
+        .order_by("-pk")
+    )
     serializer_class = StatusSerializer
     filterset_class = StatusFilter
     lookup_field = "uuid"
-    pagination_class = PageNumberPagination
+    pagination_class = KeysetPagination
 
     permission_classes = (ZaakRelatedAuthScopesRequired,)
     required_scopes = {
@@ -446,11 +538,11 @@ class ZaakObjectViewSet(
     ClosedZaakMixin,
     viewsets.ModelViewSet,
 ):
-    queryset = ZaakObject.objects.order_by("-pk")
+    queryset = ZaakObject.objects.select_related("zaak").order_by("-pk")
     serializer_class = ZaakObjectSerializer
     filterset_class = ZaakObjectFilter
     lookup_field = "uuid"
-    pagination_class = PageNumberPagination
+    pagination_class = KeysetPagination
 
     permission_classes = (ZaakRelatedAuthScopesRequired,)
     required_scopes = {
@@ -559,7 +651,9 @@ class ZaakInformatieObjectViewSet(
         # Once the response has been properly obtained (success), then the notification
         # gets scheduled, and because of the transaction being in autocommit mode at that
         # point, the notification sending will fire immediately.
-        if self.action in ["create", "destroy"]:
+        # With the sync outbox, the remote relation is synced after the commit, so
+        # the relation and its (queued) notification are committed together.
+        if self.action in ["create", "destroy"] and not settings.SYNC_OUTBOX_ENABLED:
             return False
         return super().notifications_wrap_in_atomic_block
 
@@ -567,8 +661,7 @@ class ZaakInformatieObjectViewSet(
         qs = super().get_queryset()
 
         # Do not display ZaakInformatieObjecten that are marked to be deleted
-        cache = caches["drc_sync"]
-        marked_zios = cache.get("zios_marked_for_delete")
+        marked_zios = zios_marked_for_delete.members()
         if marked_zios:
             return qs.exclude(uuid__in=marked_zios)
         return qs
@@ -708,7 +801,7 @@ class KlantContactViewSet(
     serializer_class = KlantContactSerializer
     filterset_class = KlantContactFilter
     lookup_field = "uuid"
-    pagination_class = PageNumberPagination
+    pagination_class = KeysetPagination
     permission_classes = (ZaakRelatedAuthScopesRequired,)
     required_scopes = {
         "list": SCOPE_ZAKEN_ALLES_LEZEN,
@@ -755,11 +848,13 @@ class RolViewSet(
     mixins.DestroyModelMixin,
     viewsets.ReadOnlyModelViewSet,
 ):
-    queryset = Rol.objects.order_by("-pk")
+    queryset = (
+        Rol.objects.select_related("zaak").prefetch_related("statussen").order_by("-pk")
+    )
     serializer_class = RolSerializer
     filterset_class = RolFilter
     lookup_field = "uuid"
-    pagination_class = PageNumberPagination
+    pagination_class = KeysetPagination
 
     permission_classes = (ZaakRelatedAuthScopesRequired,)
     required_scopes = {
@@ -823,7 +918,7 @@ class ResultaatViewSet(
     serializer_class = ResultaatSerializer
     filterset_class = ResultaatFilter
     lookup_field = "uuid"
-    pagination_class = PageNumberPagination
+    pagination_class = KeysetPagination
 
     permission_classes = (ZaakRelatedAuthScopesRequired,)
     required_scopes = {
@@ -860,8 +955,46 @@ class ResultaatViewSet(
     ),
 )
 class ZaakAuditTrailViewSet(AuditTrailViewSet):
+    filter_backends = (Backend,)
+    filterset_class = AuditTrailFilter
+    pagination_class = CursorPagination
     main_resource_lookup_field = "zaak_uuid"
 
+    def get_queryset(self):
+        zaak_uuid = self.kwargs.get(self.main_resource_lookup_field)
+        if not zaak_uuid:  # schema generation
+            return super().get_queryset()
+
+        # look up the audit trails by the URL of the zaak, which uses the index
+        # on (hoofd_object, aanmaakdatum) instead of a substring search. Audit
+        # trails created through another host name are found with the same path
+        # on the configured aliases.
+        zaak_url = reverse(
+            "zaak-detail", kwargs={"uuid": zaak_uuid}, request=self.request
+        )
+        path = urlparse(zaak_url).path
+        zaak_urls = [zaak_url] + [
+            f"{alias.rstrip('/')}{path}"
+            for alias in settings.AUDITTRAIL_HOST_ALIASES
+            if alias
+        ]
+        queryset = self.queryset.filter(hoofd_object__in=zaak_urls)
+        # instead of the existence check of the library, which would search the
+        # audit trails for the UUID a second time
+        if not queryset.exists() and not Zaak.objects.filter(uuid=zaak_uuid).exists():
+            raise Http404
+        return queryset.order_by("aanmaakdatum", "pk")
+
+    def get_serializer(self, instance=None, *args, **kwargs):
+        # audit trails may store the changes of an update only
+        if instance is not None:
+            many = kwargs.get("many", False)
+            trails = list(instance) if many else [instance]
+            restore_versions(trails)
+            if many:
+                instance = trails
+        return super().get_serializer(instance, *args, **kwargs)
+
     def initialize_request(self, request, *args, **kwargs):
         # workaround for drf-nested-viewset injecting the URL kwarg into request.data
         return super(viewsets.ReadOnlyModelViewSet, self).initialize_request(
@@ -1027,8 +1160,7 @@ class ZaakContactMomentViewSet(
         qs = super().get_queryset()
 
         # Do not display ZaakContactMomenten that are marked to be deleted
-        cache = caches["kcc_sync"]
-        marked_zcms = cache.get("zcms_marked_for_delete")
+        marked_zcms = zcms_marked_for_delete.members()
         if marked_zcms:
             return qs.exclude(uuid__in=marked_zcms)
         return qs
@@ -1090,8 +1222,7 @@ class ZaakVerzoekViewSet(
         qs = super().get_queryset()
 
         # Do not display ZaakVerzoeken that are marked to be deleted
-        cache = caches["kcc_sync"]
-        marked_zvs = cache.get("zvs_marked_for_delete")
+        marked_zvs = zvs_marked_for_delete.members()
         if marked_zvs:
             return qs.exclude(uuid__in=marked_zvs)
         return qs
@@ -23,6 +23,8 @@ CACHES = {
         "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
         "LOCATION": "/var/tmp/django_cache",
     },
+    "remote_resources": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "expansions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
 }
 
 LOGGING = None  # Quiet is nice
@@ -39,3 +41,18 @@ AXES_BEHIND_REVERSE_PROXY = False
 # ZRC specific settings
 #
 NOTIFICATIONS_DISABLED = True
+
+# the mocked remote resources differ between tests
+REMOTE_RESOURCE_CACHE_TTL = {}
+
+# the expanded resources differ between tests
+EXPAND_CACHE_TTL = 0
+
+# the authorizations are rolled back between tests, without invalidating the cache
+AUTHORIZATIONS_CACHE_TIMEOUT = 0
+
+# the API credentials are rolled back between tests, without invalidating the cache
+OUTBOUND_CREDENTIALS_CACHE_TIMEOUT = 0
+
+# the resources are rolled back between tests, without invalidating the cache
+AUDITTRAIL_VERSION_CACHE_TIMEOUT = 0
@@ -69,6 +69,7 @@ CACHES = {
     "axes": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
     "drc_sync": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
     "kcc_sync": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "remote_resources": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
 }
 
 REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] += (
@@ -4,6 +4,11 @@ os.environ.setdefault("DB_HOST", "db")
 os.environ.setdefault("DB_NAME", "postgres")
 os.environ.setdefault("DB_USER", "postgres")
 os.environ.setdefault("DB_PASSWORD", "")
+# keep the connections of the uwsgi workers open between requests, see
+# ``zrc.db.backends.postgis``. Set ``DB_POOL_SIZE`` (with ``DB_CONN_MAX_AGE=0``)
+# to share a pool of connections between the threads of a worker instead.
+os.environ.setdefault("DB_CONN_MAX_AGE", "60")
+os.environ.setdefault("DB_CONN_HEALTH_CHECKS", "True")
 
 from .production import *  # noqa isort:skip
 
@@ -48,14 +48,21 @@ USE_THOUSAND_SEPARATOR = True
 #
 # DATABASE and CACHING setup
 #
+# Connections are kept open for ``DB_CONN_MAX_AGE`` seconds, or taken from a
+# pool of ``DB_POOL_SIZE`` connections per process, see
+# ``zrc.db.backends.postgis``.
 DATABASES = {
     "default": {
-        "ENGINE": "django.contrib.gis.db.backends.postgis",
+        "ENGINE": "zrc.db.backends.postgis",
         "NAME": config("DB_NAME", "zrc"),
         "USER": config("DB_USER", "zrc"),
         "PASSWORD": config("DB_PASSWORD", "zrc"),
         "HOST": config("DB_HOST", "localhost"),
         "PORT": config("DB_PORT", 5432),
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", 0),
+        "CONN_HEALTH_CHECKS": config("DB_CONN_HEALTH_CHECKS", False),
+        "POOL_SIZE": config("DB_POOL_SIZE", 0),
+        "POOL_TIMEOUT": config("DB_POOL_TIMEOUT", 10),
     }
 }
 
@@ -84,6 +91,30 @@ CACHES = {
             "IGNORE_EXCEPTIONS": True,
         },
     },
+    "kcc_sync": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f"redis://{config('CACHE_DEFAULT', 'localhost:6379/0')}",
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "IGNORE_EXCEPTIONS": True,
+        },
+    },
+    "remote_resources": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f"redis://{config('CACHE_DEFAULT', 'localhost:6379/0')}",
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "IGNORE_EXCEPTIONS": True,
+        },
+    },
+    "expansions": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f"redis://{config('CACHE_DEFAULT', 'localhost:6379/0')}",
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "IGNORE_EXCEPTIONS": True,
+        },
+    },
 }
 
 # Application definition
@@ -127,6 +158,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "zrc.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -138,6 +170,7 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "vng_api_common.middleware.APIVersionHeaderMiddleware",
     "zrc.middleware.DeprecationMiddleware",
+    "zrc.middleware.RemoteResourceMemoMiddleware",
     "axes.middleware.AxesMiddleware",
 ]
 
@@ -268,6 +301,11 @@ LOGGING = {
     },
     "loggers": {
         "zrc": {"handlers": ["project"], "level": "INFO", "propagate": True},
+        "zrc.performance": {
+            "handlers": ["performance"],
+            "level": "INFO",
+            "propagate": False,
+        },
         "django.request": {"handlers": ["django"], "level": "ERROR", "propagate": True},
         "django.template": {
             "handlers": ["console"],
@@ -326,6 +364,90 @@ SHOW_ALERT = True
 
 TEST_SPEC_DIRS = (os.path.join(DJANGO_PROJECT_DIR, "tests", "schemas"),)
 
+# Concurrency used to retrieve external resources for ``?expand=``
+EXPAND_MAX_WORKERS = config("EXPAND_MAX_WORKERS", default=10)
+EXPAND_MAX_CONNECTIONS_PER_HOST = config("EXPAND_MAX_CONNECTIONS_PER_HOST", default=4)
+
+# Resources retrieved for ``?expand=`` are cached this long (seconds) for all
+# requests with the same authorizations, see ``zrc.api.expansion_cache``.
+# 0 disables the cache.
+EXPAND_CACHE_TTL = config("EXPAND_CACHE_TTL", default=5 * 60)
+
+# Concurrency used to retrieve several resources of other APIs at once, e.g. the
+# documents of a zaak when it is closed or the besluiten to derive its brondatum
+REMOTE_RESOURCE_MAX_WORKERS = config("REMOTE_RESOURCE_MAX_WORKERS", default=10)
+
+# Outbound calls to other APIs, see ``zrc.utils.clients``
+ZDS_CLIENT_CLASS = "zrc.utils.clients.Client"
+OUTBOUND_CONNECT_TIMEOUT = config("OUTBOUND_CONNECT_TIMEOUT", default=5)
+OUTBOUND_READ_TIMEOUT = config("OUTBOUND_READ_TIMEOUT", default=30)
+# maximum number of connections kept alive per host
+OUTBOUND_POOL_SIZE = config("OUTBOUND_POOL_SIZE", default=10)
+OUTBOUND_CREDENTIALS_CACHE_TIMEOUT = config(
+    "OUTBOUND_CREDENTIALS_CACHE_TIMEOUT", default=5 * 60
+)
+
+# Resources of other APIs that are cached, with their time-to-live in seconds.
+# See ``zrc.utils.resources``.
+REMOTE_RESOURCE_CACHE_TTL = {
+    "zaaktype": 60 * 60,
+    "statustype": 60 * 60,
+    "roltype": 60 * 60,
+    "resultaattype": 60 * 60,
+    "eigenschap": 60 * 60,
+}
+REMOTE_RESOURCE_CACHE_LRU_SIZE = 1000
+
+# Compiled authorizations per application are cached this long (seconds), or
+# until the Autorisaties API notifies about a change. 0 disables the cache.
+AUTHORIZATIONS_CACHE_TIMEOUT = config("AUTHORIZATIONS_CACHE_TIMEOUT", default=60 * 60)
+
+# Number of zaken read and serialized at a time by ``/zaken/_export``
+ZAAK_EXPORT_CHUNK_SIZE = config("ZAAK_EXPORT_CHUNK_SIZE", default=500)
+
+# Keyset pagination of the list endpoints, see ``zrc.api.pagination``.
+# PAGINATION_CURSOR_COUNT is one of "exact", "estimate" or "none".
+PAGINATION_CURSOR_DEFAULT = config("PAGINATION_CURSOR_DEFAULT", default=False)
+PAGINATION_CURSOR_COUNT = config("PAGINATION_CURSOR_COUNT", default="exact")
+
+# Log the performance metrics of API requests to ``performance.log``: every
+# request slower than the threshold (milliseconds), and the given fraction of
+# the other requests. See ``zrc.middleware.PerformanceMiddleware``.
+PERFORMANCE_LOG_SAMPLE_RATE = config("PERFORMANCE_LOG_SAMPLE_RATE", default=0.0)
+PERFORMANCE_LOG_SLOW_THRESHOLD = config("PERFORMANCE_LOG_SLOW_THRESHOLD", default=1000)
+
+# Synchronise the relations with other APIs through the ``SyncJob`` outbox
+# instead of during the request. Requires the ``process_sync_jobs`` worker.
+SYNC_OUTBOX_ENABLED = config("SYNC_OUTBOX_ENABLED", default=False)
+SYNC_MAX_ATTEMPTS = config("SYNC_MAX_ATTEMPTS", default=10)
+
+# Audit trails, see ``zrc.api.audits``: write the audit trails of a request when
+# its transaction is committed, store the changes of an update instead of the
+# full versions, and cache the version of a resource after a change this long
+# (seconds) to use it as the version before the next update. 0 disables the cache.
+AUDITTRAIL_DEFERRED = config("AUDITTRAIL_DEFERRED", default=False)
+AUDITTRAIL_STORE_DIFFS = config("AUDITTRAIL_STORE_DIFFS", default=False)
+AUDITTRAIL_VERSION_CACHE_TIMEOUT = config(
+    "AUDITTRAIL_VERSION_CACHE_TIMEOUT", default=60 * 60
+)
+
+# Base URLs (scheme and host name) through which the API was reachable before,
+# e.g. ``https://zrc.example.com``. The audit trail of a zaak includes the audit
+# trails that were created through these, matched on the exact URL of the zaak.
+AUDITTRAIL_HOST_ALIASES = config("AUDITTRAIL_HOST_ALIASES", default="", split=True)
+
+# Move the audit trails of the months before the last this many months out of the
+# audit trail table with the ``archive_audittrails`` command. 0 archives nothing.
+AUDITTRAIL_ARCHIVE_AFTER_MONTHS = config("AUDITTRAIL_ARCHIVE_AFTER_MONTHS", default=0)
+
+# Queue the notifications to the Notificaties API instead of sending them during
+# the request, see ``zrc.sync.notifications``. Requires the
+# ``process_notifications`` worker.
+NOTIFICATIONS_QUEUE_ENABLED = config("NOTIFICATIONS_QUEUE_ENABLED", default=False)
+NOTIFICATIONS_QUEUE_MAX_ATTEMPTS = config(
+    "NOTIFICATIONS_QUEUE_MAX_ATTEMPTS", default=10
+)
+
 #
 # Library settings
 #
@@ -0,0 +1,101 @@
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from vng_api_common.audittrails.models import AuditTrail
+
+from ...models import ArchivedAuditTrail
+
+
+def add_months(day: date, months: int) -> date:
+    """
+    Return the first day of the month ``months`` after the month of ``day``.
+    """
+    years, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + years, month + 1, 1)
+
+
+def start_of_month(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day.replace(day=1), time.min))
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the audit trails of the months before a cut-off to the archive, "
+        "one month at a time. Archived audit trails are no longer returned by "
+        "the API"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.AUDITTRAIL_ARCHIVE_AFTER_MONTHS,
+            help=(
+                "Archive the audit trails of the months before the last this many "
+                "months, 0 to archive nothing (default AUDITTRAIL_ARCHIVE_AFTER_MONTHS)"
+            ),
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, **options):
+        if options["months"] <= 0:
+            self.stdout.write("Archiving audit trails is disabled")
+            return
+
+        today = timezone.localdate()
+        cutoff = start_of_month(add_months(today, -options["months"]))
+
+        oldest = (
+            AuditTrail.objects.filter(aanmaakdatum__lt=cutoff)
+            .order_by("aanmaakdatum")
+            .values_list("aanmaakdatum", flat=True)
+            .first()
+        )
+        if oldest is None:
+            self.stdout.write("No audit trails to archive")
+            return
+
+        month = start_of_month(timezone.localtime(oldest).date())
+        while month < cutoff:
+            next_month = start_of_month(add_months(month.date(), 1))
+            archived = self.archive_month(month, next_month, options["batch_size"])
+            if archived:
+                self.stdout.write(f"Archived {archived} audit trails of {month:%Y-%m}")
+            month = next_month
+
+    def archive_month(self, start: datetime, end: datetime, batch_size: int) -> int:
+        archived = 0
+        while True:
+            with transaction.atomic():
+                trails = list(
+                    AuditTrail.objects.select_for_update(skip_locked=True)
+                    .filter(aanmaakdatum__gte=start, aanmaakdatum__lt=end)
+                    .order_by("pk")
+                    .values()[:batch_size]
+                )
+                if not trails:
+                    return archived
+
+                ArchivedAuditTrail.objects.bulk_create(
+                    [
+                        ArchivedAuditTrail(
+                            uuid=trail["uuid"],
+                            hoofd_object=trail["hoofd_object"],
+                            resource_url=trail["resource_url"],
+                            aanmaakdatum=trail["aanmaakdatum"],
+                            maand=start.date(),
+                            data=trail,
+                        )
+                        for trail in trails
+                    ],
+                    ignore_conflicts=True,
+                )
+                AuditTrail.objects.filter(
+                    pk__in=[trail["id"] for trail in trails]
+                ).delete()
+
+            archived += len(trails)
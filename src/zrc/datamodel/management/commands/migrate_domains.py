@@ -1,5 +1,14 @@
+import re
+from typing import Callable
+
 from django.apps import apps
+from django.contrib.postgres.fields import ArrayField
 from django.core.management import BaseCommand
+from django.db import connection, models
+from django.db.models import Max, Min, Value
+from django.db.models.functions import Concat, Substr
+
+from vng_api_common.caching.models import ETagMixin
 
 ZRC = ("https://ref.tst.vng.cloud/zrc/", "https://zaken-api.vng.cloud/")
 DRC = ("https://ref.tst.vng.cloud/drc/", "https://documenten-api.vng.cloud/")
@@ -43,17 +52,195 @@ MAPPING = BASE_MAPPING + (
     ("datamodel.ZaakBesluit", "besluit", *BRC),
 )
 
+# arrays and JSON documents may contain references to any of the APIs
+ALL_DOMAINS = (ZRC, DRC, ZTC, BRC, NRC, AC, VRL)
+
+MAPPING += tuple(
+    (model, field, *domains)
+    for model, field in (
+        ("datamodel.Zaak", "producten_of_diensten"),
+        ("datamodel.ZaakObject", "object_type_overige_definitie"),
+        ("datamodel.Overige", "overige_data"),
+    )
+    for domains in ALL_DOMAINS
+)
+
+
+def replace_prefix(value, old: str, new: str):
+    """
+    Replace the ``old`` prefix of the string(s) in ``value`` with ``new``.
+    """
+    if isinstance(value, str):
+        return new + value[len(old) :] if value.startswith(old) else value
+    if isinstance(value, list):
+        return [replace_prefix(item, old, new) for item in value]
+    if isinstance(value, dict):
+        return {key: replace_prefix(item, old, new) for key, item in value.items()}
+    return value
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def update_in_batches(
+    model, update: Callable[[int, int], int], batch_size: int, progress=None
+) -> int:
+    """
+    Call ``update`` for consecutive primary key ranges of ``model``.
+
+    Every batch is a separate statement, so the rows are not locked for the
+    duration of the whole migration.
+    """
+    bounds = model.objects.aggregate(start=Min("pk"), end=Max("pk"))
+    if bounds["start"] is None:
+        return 0
+
+    updated = 0
+    for start in range(bounds["start"], bounds["end"] + 1, batch_size):
+        updated += update(start, start + batch_size)
+        if progress:
+            progress(min(start + batch_size - 1, bounds["end"]), bounds["end"], updated)
+    return updated
+
+
+def migrate_field(
+    model, field: models.Field, old: str, new: str, batch_size: int, progress=None
+) -> int:
+    """
+    Rewrite the ``old`` URL prefix to ``new`` with set-based UPDATE statements.
+
+    Model signals are not sent.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(field.column)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+
+    if isinstance(field, ArrayField):
+        sql = (
+            f"UPDATE {table} SET {column} = ARRAY("
+            "SELECT CASE WHEN left(item, %(length)s) = %(old)s "
+            "THEN %(new)s || substr(item, %(length)s + 1) ELSE item END "
+            f"FROM unnest({column}) WITH ORDINALITY AS items(item, ordinal) "
+            "ORDER BY ordinal) "
+            f"WHERE {pk} >= %(start)s AND {pk} < %(end)s AND EXISTS ("
+            f"SELECT 1 FROM unnest({column}) AS item "
+            "WHERE left(item, %(length)s) = %(old)s)"
+        )
+        params = {"old": old, "new": new, "length": len(old)}
+
+    elif isinstance(field, models.JSONField):
+        # only replace string values starting with the prefix: a string starts
+        # with an unescaped quote, and a key is followed by a colon
+        sql = (
+            f"UPDATE {table} SET {column} = regexp_replace("
+            f"{column}::text, %(regex)s, %(replacement)s, 'g')::jsonb "
+            f"WHERE {pk} >= %(start)s AND {pk} < %(end)s "
+            f"AND {column}::text LIKE %(pattern)s"
+        )
+        # backslashes and ampersands are special in the replacement
+        replacement = new.replace("\\", "\\\\").replace("&", "\\&")
+        params = {
+            "regex": rf'(?<!\\)"{re.escape(old)}((?:[^"\\]|\\.)*)"(?!\s*:)',
+            "replacement": rf'"{replacement}\1"',
+            "pattern": f'%"{_escape_like(old)}%',
+        }
+
+    else:
+        replacement = Concat(
+            Value(new),
+            Substr(field.name, len(old) + 1),
+            output_field=models.CharField(),
+        )
+
+        def update(start: int, end: int) -> int:
+            return model.objects.filter(
+                pk__gte=start, pk__lt=end, **{f"{field.name}__startswith": old}
+            ).update(**{field.name: replacement})
+
+        return update_in_batches(model, update, batch_size, progress=progress)
+
+    def update(start: int, end: int) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {**params, "start": start, "end": end})
+            return cursor.rowcount
+
+    return update_in_batches(model, update, batch_size, progress=progress)
+
+
+def clear_etags(model, batch_size: int) -> int:
+    """
+    Clear the ETags of ``model``, so they are recalculated on the next request.
+    """
+
+    def update(start: int, end: int) -> int:
+        objects = model.objects.filter(pk__gte=start, pk__lt=end).exclude(_etag="")
+        return objects.update(_etag="")
+
+    return update_in_batches(model, update, batch_size)
+
 
 class Command(BaseCommand):
     help = "Update data references from old to new domains"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--set-based",
+            action="store_true",
+            help=(
+                "Rewrite the references with UPDATE statements instead of saving "
+                "every object. No model signals are sent and the ETags are cleared"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of primary keys per UPDATE statement with --set-based",
+        )
+
     def handle(self, **options):
+        self.verbosity = options["verbosity"]
+        if options["set_based"]:
+            self.migrate_set_based(options["batch_size"])
+            return
+
         for model, field, old, new in MAPPING:
             self.stdout.write(f"Migrating {model}.{field}")
             model = apps.get_model(model)
+            field_type = model._meta.get_field(field)
 
-            objects = model.objects.filter(**{f"{field}__startswith": old})
+            if isinstance(field_type, (ArrayField, models.JSONField)):
+                objects = model.objects.exclude(**{f"{field}__isnull": True})
+            else:
+                objects = model.objects.filter(**{f"{field}__startswith": old})
             self.stdout.write(f"  Updating {objects.count()} objects...\n\n")
             for obj in objects:
-                setattr(obj, field, getattr(obj, field).replace(old, new, 1))
-                obj.save()
+                value = replace_prefix(getattr(obj, field), old, new)
+                if value != getattr(obj, field):
+                    setattr(obj, field, value)
+                    obj.save()
+
+    def migrate_set_based(self, batch_size: int):
+        def progress(pk: int, last_pk: int, updated: int):
+            if self.verbosity > 1:
+                self.stdout.write(f"  {pk}/{last_pk}: {updated} updated")
+
+        for model, field, old, new in MAPPING:
+            self.stdout.write(f"Migrating {model}.{field} ({old} -> {new})")
+            model = apps.get_model(model)
+            updated = migrate_field(
+                model,
+                model._meta.get_field(field),
+                old,
+                new,
+                batch_size,
+                progress=progress,
+            )
+            self.stdout.write(f"  Updated {updated} objects")
+
+        # the resources embed their own URL and related URLs, which may have changed
+        for model in apps.get_app_config("datamodel").get_models():
+            if issubclass(model, ETagMixin):
+                self.stdout.write(f"Clearing ETags of {model._meta.label}")
+                clear_etags(model, batch_size)
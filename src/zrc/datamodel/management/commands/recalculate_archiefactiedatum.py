@@ -0,0 +1,239 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+from itertools import islice
+
+from django.core.management import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Q
+
+import requests
+from vng_api_common.constants import Archiefstatus
+from zds_client import ClientError
+
+from zrc.utils.clients import run_concurrently
+from zrc.utils.exceptions import DetermineProcessEndDateException
+from zrc.utils.resources import fetch_resource
+
+from ...models import Zaak
+from ...utils import BrondatumCalculator
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the archiefactiedatum of closed zaken that are not archived "
+        "yet, e.g. after their resultaattype or selectielijstklasse changed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--zaaktype",
+            action="append",
+            default=[],
+            help="Only recalculate the zaken of this zaaktype (repeatable)",
+        )
+        parser.add_argument(
+            "--resultaattype",
+            action="append",
+            default=[],
+            help="Only recalculate the zaken with this resultaattype (repeatable)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the changes without saving them",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "File to store the progress in. An interrupted run resumes from "
+                "it and retries the zaken that failed, and it is removed when the "
+                "run completes"
+            ),
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of zaken calculated at the same time",
+        )
+
+    def handle(self, **options):
+        self.dry_run = options["dry_run"]
+        self.workers = options["workers"]
+        self.verbosity = options["verbosity"]
+        checkpoint = options["checkpoint"]
+        batch_size = options["batch_size"]
+
+        zaken = Zaak.objects.filter(
+            einddatum__isnull=False,
+            resultaat__isnull=False,
+            archiefstatus=Archiefstatus.nog_te_archiveren,
+        )
+        if options["zaaktype"]:
+            zaken = zaken.filter(zaaktype__in=options["zaaktype"])
+        if options["resultaattype"]:
+            zaken = zaken.filter(resultaat__resultaattype__in=options["resultaattype"])
+
+        last_pk, failed = self.read_checkpoint(checkpoint)
+        if last_pk is not None:
+            self.stdout.write(
+                f"Resuming after zaak {last_pk}, retrying {len(failed)} failed zaken"
+            )
+            zaken = zaken.filter(Q(pk__gt=last_pk) | Q(pk__in=failed))
+
+        rows = (
+            zaken.select_related("resultaat")
+            .order_by("pk")
+            .iterator(chunk_size=batch_size)
+        )
+        self.resultaattypen = {}
+        # the zaken that failed are retried when the run is resumed
+        self.failed = []
+        totals = {"changed": 0, "unchanged": 0, "undetermined": 0, "errors": 0}
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+
+            changed = self.process(chunk, totals)
+            if not self.dry_run:
+                with transaction.atomic():
+                    Zaak.objects.bulk_update(changed, ["archiefactiedatum", "_etag"])
+                self.write_checkpoint(checkpoint, chunk[-1].pk, self.failed)
+
+        if checkpoint and not self.dry_run and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        prefix = "Would update" if self.dry_run else "Updated"
+        self.stdout.write(
+            f"{prefix} {totals['changed']} zaken, {totals['unchanged']} unchanged, "
+            f"{totals['undetermined']} without archiefactiedatum, "
+            f"{totals['errors']} errors"
+        )
+
+    def process(self, zaken, totals) -> list:
+        failed = self.fetch_resultaattypen(zaken)
+
+        calculable = []
+        for zaak in zaken:
+            error = failed.get(zaak.resultaat.resultaattype)
+            if error:
+                totals["errors"] += 1
+                self.failed.append(zaak.pk)
+                self.stderr.write(f"{zaak.identificatie}: {error}")
+            else:
+                calculable.append(zaak)
+
+        changed = []
+        for zaak, archiefactiedatum, error in self.calculate_all(calculable):
+            if error:
+                totals["errors"] += 1
+                self.failed.append(zaak.pk)
+                self.stderr.write(f"{zaak.identificatie}: {error}")
+            elif archiefactiedatum is None:
+                totals["undetermined"] += 1
+                if self.dry_run or self.verbosity > 1:
+                    self.stdout.write(
+                        f"{zaak.identificatie}: no archiefactiedatum, "
+                        f"{zaak.archiefactiedatum} is kept"
+                    )
+            elif archiefactiedatum == zaak.archiefactiedatum:
+                totals["unchanged"] += 1
+            else:
+                totals["changed"] += 1
+                if self.dry_run or self.verbosity > 1:
+                    self.stdout.write(
+                        f"{zaak.identificatie}: {zaak.archiefactiedatum} -> "
+                        f"{archiefactiedatum}"
+                    )
+                zaak.archiefactiedatum = archiefactiedatum
+                # the ETag is recalculated on the next request
+                zaak._etag = ""
+                changed.append(zaak)
+        return changed
+
+    def fetch_resultaattypen(self, zaken) -> dict:
+        """
+        Retrieve the resultaattypen of ``zaken`` that weren't retrieved yet.
+
+        Every resultaattype is retrieved once for the whole run. A resultaattype
+        that can't be retrieved is retried for the zaken of the next batches,
+        the zaken of this batch that have it are recorded as failed.
+
+        :return: a mapping of the url of every failed resultaattype to the error.
+        """
+        missing = list(
+            dict.fromkeys(
+                zaak.resultaat.resultaattype
+                for zaak in zaken
+                if zaak.resultaat.resultaattype not in self.resultaattypen
+            )
+        )
+
+        def fetch(url):
+            try:
+                resultaattype = fetch_resource(
+                    "resultaattype", url, scopes=["zds.scopes.zaaktypes.lezen"]
+                )
+            except (ClientError, requests.RequestException) as exc:
+                return None, f"resultaattype {url} could not be retrieved: {exc!r}"
+            return resultaattype, None
+
+        failed = {}
+        for url, (resultaattype, error) in zip(
+            missing, run_concurrently(fetch, missing)
+        ):
+            if error:
+                failed[url] = error
+            else:
+                self.resultaattypen[url] = resultaattype
+        return failed
+
+    def calculate_all(self, zaken) -> list:
+        if self.workers <= 1:
+            return [self.calculate(zaak) for zaak in zaken]
+
+        def calculate_slice(zaken):
+            try:
+                return [self.calculate(zaak) for zaak in zaken]
+            finally:
+                # the worker threads have their own database connections
+                connections.close_all()
+
+        slices = [zaken[i :: self.workers] for i in range(self.workers)]
+        results = [None] * len(zaken)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for i, slice_results in enumerate(executor.map(calculate_slice, slices)):
+                results[i :: self.workers] = slice_results
+        return results
+
+    def calculate(self, zaak: Zaak) -> tuple:
+        calculator = BrondatumCalculator(
+            zaak,
+            datetime.combine(zaak.einddatum, time.min),
+            resultaattype=self.resultaattypen[zaak.resultaat.resultaattype],
+        )
+        try:
+            archiefactiedatum = calculator.calculate(recalculate=True)
+        except DetermineProcessEndDateException as exc:
+            return zaak, None, exc.args[0]
+
+        if isinstance(archiefactiedatum, datetime):
+            archiefactiedatum = archiefactiedatum.date()
+        return zaak, archiefactiedatum, None
+
+    def read_checkpoint(self, path) -> tuple:
+        if not path or not os.path.exists(path):
+            return None, []
+        with open(path) as checkpoint:
+            data = json.load(checkpoint)
+        return data["last_pk"], data.get("failed", [])
+
+    def write_checkpoint(self, path, last_pk: int, failed: list) -> None:
+        if not path:
+            return
+        with open(path, "w") as checkpoint:
+            json.dump({"last_pk": last_pk, "failed": failed}, checkpoint)
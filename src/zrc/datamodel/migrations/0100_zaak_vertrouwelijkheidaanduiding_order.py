@@ -0,0 +1,64 @@
+# Generated by Django 3.2.14 on 2026-10-16 23:26
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Max, Min
+
+from vng_api_common.constants import VertrouwelijkheidsAanduiding
+
+BATCH_SIZE = 10000
+
+
+def fill_vertrouwelijkheidaanduiding_order(apps, schema_editor):
+    Zaak = apps.get_model("datamodel", "Zaak")
+    order = VertrouwelijkheidsAanduiding.get_order_expression(
+        "vertrouwelijkheidaanduiding"
+    )
+
+    # every batch of primary keys is a separate statement
+    bounds = Zaak.objects.aggregate(start=Min("pk"), end=Max("pk"))
+    if bounds["start"] is None:
+        return
+
+    for start in range(bounds["start"], bounds["end"] + 1, BATCH_SIZE):
+        Zaak.objects.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).update(
+            vertrouwelijkheidaanduiding_order=order
+        )
+
+
+class Migration(migrations.Migration):
+    """
+    Store the order of the vertrouwelijkheidaanduiding of a zaak.
+
+    The migration isn't atomic: the column is filled in batches of primary keys
+    that are committed separately, and the index is created concurrently, so
+    the zaak table isn't locked for the duration of the migration.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("datamodel", "0099_remove_zaak_resultaattoelichting"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="zaak",
+            name="vertrouwelijkheidaanduiding_order",
+            field=models.PositiveSmallIntegerField(
+                editable=False,
+                null=True,
+                verbose_name="vertrouwelijkheidaanduiding volgorde",
+            ),
+        ),
+        migrations.RunPython(
+            fill_vertrouwelijkheidaanduiding_order, migrations.RunPython.noop
+        ),
+        AddIndexConcurrently(
+            model_name="zaak",
+            index=models.Index(
+                fields=["zaaktype", "vertrouwelijkheidaanduiding_order"],
+                name="zaak_zaaktype_va_order_idx",
+            ),
+        ),
+    ]
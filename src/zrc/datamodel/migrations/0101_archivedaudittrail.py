@@ -0,0 +1,60 @@
+# Generated by Django 3.2.14 on 2026-10-16 23:58
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datamodel", "0100_zaak_vertrouwelijkheidaanduiding_order"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedAuditTrail",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("uuid", models.UUIDField(unique=True)),
+                ("hoofd_object", models.URLField(max_length=1000)),
+                ("resource_url", models.URLField(max_length=1000)),
+                ("aanmaakdatum", models.DateTimeField()),
+                (
+                    "maand",
+                    models.DateField(
+                        help_text="De eerste dag van de maand waarin de handeling is gedaan."
+                    ),
+                ),
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="Alle attributen van de audit trail.",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "gearchiveerde audit trail",
+                "verbose_name_plural": "gearchiveerde audit trails",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archivedaudittrail",
+            index=models.Index(
+                fields=["hoofd_object", "aanmaakdatum"],
+                name="archived_audittrail_hoofd_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedaudittrail",
+            index=models.Index(fields=["maand"], name="archived_audittrail_maand_idx"),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index the audit trails of the library by main object and creation date.
+
+    The audit trail of a zaak is listed and filtered on ``hoofd_object`` and
+    ordered by ``aanmaakdatum``, which the trigram index of the library doesn't
+    cover. The index is created concurrently, so the table isn't locked for
+    writes while it is built.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("audittrails", "0018_auto_20220927_1000"),
+        ("datamodel", "0101_archivedaudittrail"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS audittrail_hoofd_aanmaak_idx "
+                "ON audittrails_audittrail (hoofd_object, aanmaakdatum)"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS audittrail_hoofd_aanmaak_idx",
+        ),
+    ]
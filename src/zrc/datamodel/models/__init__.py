@@ -1,3 +1,4 @@
+from .audittrails import *  # noqa
 from .betrokkene import *  # noqa
 from .core import *  # noqa
 from .zaakobjecten import *  # noqa
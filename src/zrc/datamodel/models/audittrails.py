@@ -0,0 +1,41 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+__all__ = ["ArchivedAuditTrail"]
+
+
+class ArchivedAuditTrail(models.Model):
+    """
+    An audit trail that was moved out of the audit trail table.
+
+    The ``archive_audittrails`` management command moves the audit trails of
+    the months before a cut-off date here, so the audit trail table, and the
+    reads and inserts of the API, only involve the recent audit trails.
+    """
+
+    uuid = models.UUIDField(unique=True)
+    hoofd_object = models.URLField(max_length=1000)
+    resource_url = models.URLField(max_length=1000)
+    aanmaakdatum = models.DateTimeField()
+    maand = models.DateField(
+        help_text=_("De eerste dag van de maand waarin de handeling is gedaan.")
+    )
+    data = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        help_text=_("Alle attributen van de audit trail."),
+    )
+
+    class Meta:
+        verbose_name = _("gearchiveerde audit trail")
+        verbose_name_plural = _("gearchiveerde audit trails")
+        indexes = [
+            models.Index(
+                fields=["hoofd_object", "aanmaakdatum"],
+                name="archived_audittrail_hoofd_idx",
+            ),
+            models.Index(fields=["maand"], name="archived_audittrail_maand_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.hoofd_object} ({self.aanmaakdatum})"
@@ -2,13 +2,13 @@ import logging
 import uuid
 from datetime import date
 
-from django.conf import settings
 from django.contrib.gis.db.models import GeometryField
 from django.contrib.postgres.fields import ArrayField
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
 from django.utils.crypto import get_random_string
-from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 
 from vng_api_common.caching import ETagMixin
@@ -26,15 +26,22 @@ from vng_api_common.fields import (
     RSINField,
     VertrouwelijkheidsAanduidingField,
 )
-from vng_api_common.models import APICredential, APIMixin
+from vng_api_common.models import APIMixin
 from vng_api_common.utils import (
     generate_unique_identification,
     request_object_attribute,
 )
 from vng_api_common.validators import alphanumeric_excluding_diacritic
 
+from zrc.utils.resources import fetch_resource
+
 from ..constants import AardZaakRelatie, BetalingsIndicatie, IndicatieMachtiging
-from ..query import ZaakQuerySet, ZaakRelatedQuerySet
+from ..query import (
+    StatusQuerySet,
+    ZaakQuerySet,
+    ZaakRelatedQuerySet,
+    get_vertrouwelijkheidaanduiding_order,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -181,6 +188,13 @@ class Zaak(ETagMixin, APIMixin, models.Model):
             "Aanduiding van de mate waarin het zaakdossier van de ZAAK voor de openbaarheid bestemd is."
         ),
     )
+    # numeric order of the vertrouwelijkheidaanduiding, so confidentiality
+    # filters can use an index. Kept in sync by ``save``, by raw saves (e.g.
+    # ``loaddata``) and by the ``update``, ``bulk_update`` and ``bulk_create``
+    # of ``ZaakQuerySet``, but not by raw SQL.
+    vertrouwelijkheidaanduiding_order = models.PositiveSmallIntegerField(
+        _("vertrouwelijkheidaanduiding volgorde"), null=True, editable=False
+    )
 
     betalingsindicatie = models.CharField(
         _("betalingsindicatie"),
@@ -367,6 +381,12 @@ class Zaak(ETagMixin, APIMixin, models.Model):
         verbose_name = "zaak"
         verbose_name_plural = "zaken"
         unique_together = ("bronorganisatie", "identificatie")
+        indexes = [
+            models.Index(
+                fields=["zaaktype", "vertrouwelijkheidaanduiding_order"],
+                name="zaak_zaaktype_va_order_idx",
+            )
+        ]
 
     def __str__(self):
         return self.identificatie
@@ -383,10 +403,25 @@ class Zaak(ETagMixin, APIMixin, models.Model):
         ):
             self.laatste_betaaldatum = None
 
+        self.vertrouwelijkheidaanduiding_order = get_vertrouwelijkheidaanduiding_order(
+            self.vertrouwelijkheidaanduiding
+        )
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields and "vertrouwelijkheidaanduiding" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "vertrouwelijkheidaanduiding_order",
+            }
+
         super().save(*args, **kwargs)
 
     @property
     def current_status_uuid(self):
+        # annotated by ``ZaakQuerySet.with_current_status``
+        if hasattr(self, "_current_status_uuid"):
+            return self._current_status_uuid
+
         status = self.status_set.order_by("-datum_status_gezet").first()
         return status.uuid if status else None
 
@@ -398,6 +433,15 @@ class Zaak(ETagMixin, APIMixin, models.Model):
         return f"{self.bronorganisatie} - {self.identificatie}"
 
 
+@receiver(pre_save, sender=Zaak)
+def set_vertrouwelijkheidaanduiding_order(sender, instance: Zaak, raw: bool, **kwargs):
+    # fixtures are saved without calling ``Zaak.save``
+    if raw:
+        instance.vertrouwelijkheidaanduiding_order = (
+            get_vertrouwelijkheidaanduiding_order(instance.vertrouwelijkheidaanduiding)
+        )
+
+
 class RelevanteZaakRelatie(models.Model):
     """
     Registreer een ZAAK als relevant voor een andere ZAAK
@@ -458,7 +502,7 @@ class Status(ETagMixin, models.Model):
         "op de status van een zaak.",
     )
 
-    objects = ZaakRelatedQuerySet.as_manager()
+    objects = StatusQuerySet.as_manager()
 
     class Meta:
         verbose_name = "status"
@@ -664,10 +708,7 @@ class Rol(ETagMixin, models.Model):
         if self.omschrijving and self.omschrijving_generiek:
             return
 
-        Client = import_string(settings.ZDS_CLIENT_CLASS)
-        client = Client.from_url(self.roltype)
-        client.auth = APICredential.get_auth(self.roltype)
-        roltype = client.retrieve("roltype", url=self.roltype)
+        roltype = fetch_resource("roltype", self.roltype)
 
         self.omschrijving = roltype["omschrijving"]
         self.omschrijving_generiek = roltype["omschrijvingGeneriek"]
@@ -753,10 +794,7 @@ class ZaakObject(ETagMixin, models.Model):
             object_url = self.object
             self._object = None
             if object_url:
-                Client = import_string(settings.ZDS_CLIENT_CLASS)
-                client = Client.from_url(object_url)
-                client.auth = APICredential.get_auth(object_url)
-                self._object = client.retrieve(self.object_type.lower(), url=object_url)
+                self._object = fetch_resource(self.object_type.lower(), object_url)
         return self._object
 
     def unique_representation(self):
@@ -1,10 +1,89 @@
-from django.db import models
-from django.db.models import Case, IntegerField, Value, When
+from typing import Dict, Iterable, Optional
 
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+from django.db.models import (
+    BooleanField,
+    Expression,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+)
+
+from vng_api_common.authorizations.models import Autorisatie
 from vng_api_common.constants import VertrouwelijkheidsAanduiding
 from vng_api_common.scopes import Scope
 
 
+def compile_authorizations(
+    scope: Scope, authorizations: Iterable[Autorisatie]
+) -> Dict[str, int]:
+    """
+    Compile the authorizations to the maximum confidentiality order per zaaktype.
+
+    Only the authorizations that grant ``scope`` are taken into account. If
+    multiple authorizations apply to the same zaaktype, the most permissive one
+    wins.
+    """
+    max_orders = {}
+    for authorization in authorizations:
+        # test if this authorization has the scope that's needed
+        if not scope.is_contained_in(authorization.scopes):
+            continue
+
+        # extract the order and map it to the database value
+        order = VertrouwelijkheidsAanduiding.get_choice(
+            authorization.max_vertrouwelijkheidaanduiding
+        ).order
+        max_orders[authorization.zaaktype] = max(
+            order, max_orders.get(authorization.zaaktype, order)
+        )
+    return max_orders
+
+
+class AuthorizedZaaktype(Expression):
+    """
+    Test if the zaaktype and confidentiality order are allowed by ``max_orders``.
+
+    The allowed ``(zaaktype, max_order)`` pairs are joined as a ``VALUES`` list,
+    which keeps the SQL compact regardless of the number of authorizations.
+    """
+
+    conditional = True
+
+    def __init__(self, zaaktype, order, max_orders: Dict[str, int]):
+        super().__init__(output_field=BooleanField())
+        self.zaaktype = zaaktype
+        self.order = order
+        self.max_orders = max_orders
+
+    def get_source_expressions(self):
+        return [self.zaaktype, self.order]
+
+    def set_source_expressions(self, exprs):
+        self.zaaktype, self.order = exprs
+
+    def as_sql(self, compiler, connection):
+        if not self.max_orders:
+            raise EmptyResultSet
+
+        zaaktype_sql, zaaktype_params = compiler.compile(self.zaaktype)
+        order_sql, order_params = compiler.compile(self.order)
+
+        values = ", ".join(["(%s, %s)"] * len(self.max_orders))
+        values_params = [
+            param for item in sorted(self.max_orders.items()) for param in item
+        ]
+        sql = (
+            f"EXISTS (SELECT 1 FROM (VALUES {values}) AS authorized (zaaktype, max_order)"
+            f" WHERE authorized.zaaktype = {zaaktype_sql}"
+            f" AND {order_sql} <= authorized.max_order)"
+        )
+        return sql, (*values_params, *zaaktype_params, *order_params)
+
+
 class AuthorizationsFilterMixin:
     authorizations_lookup = None
 
@@ -35,61 +114,123 @@ class AuthorizationsFilterMixin:
         :return: a queryset of filtered results according to the
           authorizations provided
         """
-        # keep a list of allowed zaaktypen
-        zaaktypen = []
+        return self.filter_for_max_orders(compile_authorizations(scope, authorizations))
 
+    def filter_for_max_orders(self, max_orders: Dict[str, int]) -> models.QuerySet:
+        """
+        Filter objects on the authorizations compiled by :func:`compile_authorizations`.
+        """
         prefix = (
             "" if not self.authorizations_lookup else f"{self.authorizations_lookup}__"
         )
 
-        # annotate the queryset so we can map a string value to a logical number
-        order_case = VertrouwelijkheidsAanduiding.get_order_expression(
-            f"{prefix}vertrouwelijkheidaanduiding"
+        return self.filter(
+            AuthorizedZaaktype(
+                F(f"{prefix}zaaktype"),
+                F(f"{prefix}vertrouwelijkheidaanduiding_order"),
+                max_orders,
+            )
         )
 
-        # build the case/when to map the max_vertrouwelijkheidaanduiding based
-        # on the ``zaaktype``
-        vertrouwelijkheidaanduiding_whens = []
-        for authorization in authorizations:
-            # test if this authorization has the scope that's needed
-            if not scope.is_contained_in(authorization.scopes):
-                continue
 
-            # this zaaktype is allowed
-            zaaktypen.append(authorization.zaaktype)
+def get_vertrouwelijkheidaanduiding_order(value: str) -> Optional[int]:
+    if value not in VertrouwelijkheidsAanduiding.values:
+        return None
+    return VertrouwelijkheidsAanduiding.get_choice(value).order
 
-            # extract the order and map it to the database value
-            choice_item = VertrouwelijkheidsAanduiding.get_choice(
-                authorization.max_vertrouwelijkheidaanduiding
-            )
-            vertrouwelijkheidaanduiding_whens.append(
-                When(
-                    **{f"{prefix}zaaktype": authorization.zaaktype},
-                    then=Value(choice_item.order),
+
+class ZaakQuerySet(AuthorizationsFilterMixin, models.QuerySet):
+    def update(self, **kwargs) -> int:
+        """
+        Keep ``vertrouwelijkheidaanduiding_order`` in sync with the updated
+        ``vertrouwelijkheidaanduiding``.
+        """
+        if (
+            "vertrouwelijkheidaanduiding" in kwargs
+            and "vertrouwelijkheidaanduiding_order" not in kwargs
+        ):
+            value = kwargs["vertrouwelijkheidaanduiding"]
+            if hasattr(value, "resolve_expression"):
+                raise ValueError(
+                    "Update vertrouwelijkheidaanduiding_order together with an "
+                    "expression for vertrouwelijkheidaanduiding"
                 )
-            )
+            kwargs[
+                "vertrouwelijkheidaanduiding_order"
+            ] = get_vertrouwelijkheidaanduiding_order(value)
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None) -> None:
+        """
+        Keep ``vertrouwelijkheidaanduiding_order`` in sync with the updated
+        ``vertrouwelijkheidaanduiding``.
+        """
+        fields = list(fields)
+        if (
+            "vertrouwelijkheidaanduiding" in fields
+            and "vertrouwelijkheidaanduiding_order" not in fields
+        ):
+            objs = list(objs)
+            for obj in objs:
+                obj.vertrouwelijkheidaanduiding_order = (
+                    get_vertrouwelijkheidaanduiding_order(
+                        obj.vertrouwelijkheidaanduiding
+                    )
+                )
+            fields.append("vertrouwelijkheidaanduiding_order")
+        return super().bulk_update(objs, fields, batch_size=batch_size)
 
-        # apply the order annnotation so we can filter later
-        annotations = {f"{prefix}_va_order": order_case}
-        # filtering:
-        # * only allow the white-listed zaaktypen, explicitly
-        # * apply the filtering to limit cases within case-types to the maximal
-        #   confidentiality level
-        filters = {
-            f"{prefix}zaaktype__in": zaaktypen,
-            f"{prefix}_va_order__lte": Case(
-                *vertrouwelijkheidaanduiding_whens, output_field=IntegerField()
-            ),
-        }
+    def bulk_create(self, objs, *args, **kwargs) -> list:
+        """
+        Store the ``vertrouwelijkheidaanduiding_order`` of the created zaken.
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.vertrouwelijkheidaanduiding_order = (
+                get_vertrouwelijkheidaanduiding_order(obj.vertrouwelijkheidaanduiding)
+            )
+        return super().bulk_create(objs, *args, **kwargs)
 
-        # bring it all together now to build the resulting queryset
-        queryset = self.annotate(**annotations).filter(**filters)
-        return queryset
+    def with_current_status(self) -> models.QuerySet:
+        """
+        Annotate the UUID of the most recent status of each zaak.
 
+        :attr:`zrc.datamodel.models.Zaak.current_status_uuid` reads this
+        annotation instead of querying the statuses of every zaak.
+        """
+        from .models import Status  # circular import
 
-class ZaakQuerySet(AuthorizationsFilterMixin, models.QuerySet):
-    pass
+        statussen = Status.objects.filter(zaak=OuterRef("pk")).order_by(
+            "-datum_status_gezet"
+        )
+        return self.annotate(
+            _current_status_uuid=Subquery(statussen.values("uuid")[:1])
+        )
 
 
 class ZaakRelatedQuerySet(AuthorizationsFilterMixin, models.QuerySet):
     authorizations_lookup = "zaak"
+
+
+class StatusQuerySet(ZaakRelatedQuerySet):
+    def _most_recent_of_zaak(self) -> Subquery:
+        statussen = self.model.objects.filter(zaak=OuterRef("zaak")).order_by(
+            "-datum_status_gezet"
+        )
+        return Subquery(statussen.values("pk")[:1])
+
+    def with_indicatie_laatst_gezette_status(self) -> models.QuerySet:
+        """
+        Annotate whether each status is the most recent status of its zaak.
+        """
+        return self.annotate(
+            _indicatie_laatst_gezette_status=ExpressionWrapper(
+                Q(pk=self._most_recent_of_zaak()), output_field=BooleanField()
+            )
+        )
+
+    def laatst_gezet(self) -> models.QuerySet:
+        """
+        Limit the statussen to the most recent status of each zaak.
+        """
+        return self.filter(pk=self._most_recent_of_zaak())
@@ -0,0 +1,70 @@
+from datetime import date, datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from freezegun import freeze_time
+from vng_api_common.audittrails.models import AuditTrail
+
+from ..models import ArchivedAuditTrail
+
+ZAAK = "http://testserver/api/v1/zaken/1"
+
+
+@freeze_time("2020-04-15")
+class ArchiveAuditTrailsTests(TestCase):
+    def create_audittrail(self, aanmaakdatum: datetime) -> AuditTrail:
+        trail = AuditTrail.objects.create(
+            bron="ZRC",
+            actie="create",
+            resultaat=201,
+            hoofd_object=ZAAK,
+            resource="zaak",
+            resource_url=ZAAK,
+            resource_weergave="ZAAK-2020-0000000001",
+            nieuw={"url": ZAAK},
+        )
+        # aanmaakdatum is set on every save
+        AuditTrail.objects.filter(pk=trail.pk).update(aanmaakdatum=aanmaakdatum)
+        return trail
+
+    def call_command(self, *args):
+        stdout = StringIO()
+        call_command("archive_audittrails", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_audittrails_archived_by_month(self):
+        january = [
+            self.create_audittrail(datetime(2020, 1, day, tzinfo=timezone.utc))
+            for day in [1, 31]
+        ]
+        february = self.create_audittrail(datetime(2020, 2, 29, tzinfo=timezone.utc))
+        march = self.create_audittrail(datetime(2020, 3, 1, tzinfo=timezone.utc))
+
+        output = self.call_command("--months=1", "--batch-size=1")
+
+        self.assertEqual(list(AuditTrail.objects.all()), [march])
+        archived = list(ArchivedAuditTrail.objects.order_by("pk"))
+        self.assertEqual(
+            [trail.uuid for trail in archived],
+            [january[0].uuid, january[1].uuid, february.uuid],
+        )
+        self.assertEqual(
+            [trail.maand for trail in archived],
+            [date(2020, 1, 1), date(2020, 1, 1), date(2020, 2, 1)],
+        )
+        self.assertEqual(archived[2].hoofd_object, ZAAK)
+        self.assertEqual(archived[2].data["nieuw"], {"url": ZAAK})
+        self.assertIn("Archived 2 audit trails of 2020-01", output)
+        self.assertIn("Archived 1 audit trails of 2020-02", output)
+
+    def test_archiving_disabled_by_default(self):
+        self.create_audittrail(datetime(2019, 1, 1, tzinfo=timezone.utc))
+
+        output = self.call_command()
+
+        self.assertIn("disabled", output)
+        self.assertTrue(AuditTrail.objects.exists())
+        self.assertFalse(ArchivedAuditTrail.objects.exists())
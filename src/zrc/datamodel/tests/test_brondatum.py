@@ -0,0 +1,164 @@
+import threading
+from datetime import date, datetime
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from vng_api_common.constants import BrondatumArchiefprocedureAfleidingswijze
+
+from ..models import Zaak
+from ..utils import get_brondatum
+from .factories import (
+    RelevanteZaakRelatieFactory,
+    ZaakBesluitFactory,
+    ZaakEigenschapFactory,
+    ZaakFactory,
+    ZaakObjectFactory,
+)
+
+BRC_ROOT = "https://example.com/brc/api/v1"
+ZRC_ROOT = "https://example.com/zrc/api/v1"
+BAG_ROOT = "https://example.com/bag/api/v1"
+
+
+class RemoteResourcesMixin:
+    # the number of retrievals that must be in progress at the same time
+    concurrency = 3
+
+    def setUp(self):
+        super().setUp()
+
+        self.responses = {}
+        # every retrieval waits until ``concurrency`` of them are in progress
+        self.barrier = threading.Barrier(self.concurrency, timeout=5)
+
+        patcher = patch("zrc.utils.clients.get_client")
+        self.remote_client = patcher.start().return_value
+        self.remote_client.retrieve.side_effect = self.retrieve
+        self.addCleanup(patcher.stop)
+
+    def retrieve(self, resource, url):
+        self.barrier.wait()
+        return self.responses[url]
+
+    def create_besluiten(self, zaak, count):
+        for i in range(count):
+            url = f"{BRC_ROOT}/besluiten/{i}"
+            self.responses[url] = {
+                "url": url,
+                "ingangsdatum": f"2020-01-{i + 1:02d}",
+                "vervaldatum": f"2021-01-{i + 1:02d}",
+            }
+            ZaakBesluitFactory.create(zaak=zaak, besluit=url)
+
+    def create_relevante_zaken(self, zaak, count):
+        for i in range(count):
+            url = f"{ZRC_ROOT}/zaken/{i}"
+            self.responses[url] = {"url": url, "einddatum": f"2019-01-{i + 1:02d}"}
+            RelevanteZaakRelatieFactory.create(zaak=zaak, url=url)
+
+    def create_zaakobjecten(self, zaak, count):
+        for i in range(count):
+            url = f"{BAG_ROOT}/adressen/{i}"
+            self.responses[url] = {"url": url, "datum": f"2018-01-{i + 1:02d}"}
+            ZaakObjectFactory.create(zaak=zaak, object=url, object_type="adres")
+
+
+@override_settings(REMOTE_RESOURCE_MAX_WORKERS=3)
+class BrondatumTests(RemoteResourcesMixin, TestCase):
+    def test_ingangsdatum_besluit(self):
+        zaak = ZaakFactory.create()
+        self.create_besluiten(zaak, 3)
+
+        with self.assertNumQueries(1):
+            brondatum = get_brondatum(
+                zaak, BrondatumArchiefprocedureAfleidingswijze.ingangsdatum_besluit
+            )
+
+        self.assertEqual(brondatum, date(2020, 1, 3))
+
+    def test_vervaldatum_besluit(self):
+        zaak = ZaakFactory.create()
+        self.create_besluiten(zaak, 3)
+
+        with self.assertNumQueries(1):
+            brondatum = get_brondatum(
+                zaak, BrondatumArchiefprocedureAfleidingswijze.vervaldatum_besluit
+            )
+
+        self.assertEqual(brondatum, datetime(2021, 1, 3))
+
+    def test_gerelateerde_zaak(self):
+        zaak = ZaakFactory.create()
+        self.create_relevante_zaken(zaak, 3)
+
+        with self.assertNumQueries(1):
+            brondatum = get_brondatum(
+                zaak, BrondatumArchiefprocedureAfleidingswijze.gerelateerde_zaak
+            )
+
+        self.assertEqual(brondatum, date(2019, 1, 3))
+
+    def test_zaakobject(self):
+        zaak = ZaakFactory.create()
+        self.create_zaakobjecten(zaak, 3)
+
+        with self.assertNumQueries(1):
+            brondatum = get_brondatum(
+                zaak,
+                BrondatumArchiefprocedureAfleidingswijze.zaakobject,
+                datum_kenmerk="datum",
+                objecttype="adres",
+            )
+
+        self.assertEqual(brondatum, date(2018, 1, 3))
+
+
+@override_settings(REMOTE_RESOURCE_MAX_WORKERS=10)
+class BrondatumManyResourcesTests(RemoteResourcesMixin, TestCase):
+    """
+    Derive the brondatum of a zaak with many related resources, for every
+    afleidingswijze.
+
+    Every retrieval waits until all the resources of the zaak are being
+    retrieved, so a derivation only finishes if it retrieves them concurrently.
+    """
+
+    concurrency = 10
+    count = 10
+
+    def assertFast(self, zaak, afleidingswijze, queries, **kwargs):
+        with self.subTest(afleidingswijze=afleidingswijze):
+            with self.assertNumQueries(queries):
+                get_brondatum(zaak, afleidingswijze, **kwargs)
+
+            self.assertFalse(self.barrier.broken)
+
+    def test_brondatum(self):
+        Afleidingswijze = BrondatumArchiefprocedureAfleidingswijze
+
+        zaak = ZaakFactory.create(
+            einddatum=date(2020, 1, 1),
+            hoofdzaak=ZaakFactory.create(einddatum=date(2020, 1, 1)),
+        )
+        ZaakEigenschapFactory.create(zaak=zaak, _naam="datum", waarde="2020-01-01")
+        self.create_besluiten(zaak, self.count)
+        self.create_relevante_zaken(zaak, self.count)
+        self.create_zaakobjecten(zaak, self.count)
+        zaak = Zaak.objects.get(pk=zaak.pk)
+
+        self.assertFast(zaak, Afleidingswijze.afgehandeld, 0)
+        self.assertFast(zaak, Afleidingswijze.ander_datumkenmerk, 0)
+        self.assertFast(zaak, Afleidingswijze.termijn, 0, procestermijn="P5Y")
+        self.assertFast(zaak, Afleidingswijze.hoofdzaak, 1)
+        self.assertFast(zaak, Afleidingswijze.eigenschap, 1, datum_kenmerk="datum")
+        self.assertFast(zaak, Afleidingswijze.ingangsdatum_besluit, 1)
+        self.assertFast(zaak, Afleidingswijze.vervaldatum_besluit, 1)
+        self.assertFast(zaak, Afleidingswijze.gerelateerde_zaak, 1)
+        self.assertFast(
+            zaak,
+            Afleidingswijze.zaakobject,
+            1,
+            datum_kenmerk="datum",
+            objecttype="adres",
+        )
@@ -0,0 +1,113 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from vng_api_common.constants import ZaakobjectTypes
+
+from ..models import Zaak, ZaakInformatieObject, ZaakObject
+from .factories import ZaakFactory, ZaakInformatieObjectFactory, ZaakObjectFactory
+
+OLD_ZTC = "https://ref.tst.vng.cloud/ztc/"
+NEW_ZTC = "https://catalogi-api.vng.cloud/"
+OLD_DRC = "https://ref.tst.vng.cloud/drc/"
+NEW_DRC = "https://documenten-api.vng.cloud/"
+
+
+class MigrateDomainsSetBasedTests(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.sync.signals.sync_create_zio")
+        self.mocked_sync_create = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def call_command(self):
+        call_command(
+            "migrate_domains", "--set-based", "--batch-size=2", stdout=StringIO()
+        )
+
+    def test_url_prefixes_rewritten(self):
+        zaken = ZaakFactory.create_batch(
+            3, zaaktype=f"{OLD_ZTC}api/v1/zaaktypen/1", _etag="stale"
+        )
+        other = ZaakFactory.create(zaaktype="https://example.com/zaaktypen/1")
+        zio = ZaakInformatieObjectFactory.create(
+            informatieobject=f"{OLD_DRC}api/v1/enkelvoudiginformatieobjecten/1"
+        )
+        self.mocked_sync_create.reset_mock()
+
+        self.call_command()
+
+        for zaak in Zaak.objects.filter(pk__in=[zaak.pk for zaak in zaken]):
+            self.assertEqual(zaak.zaaktype, f"{NEW_ZTC}api/v1/zaaktypen/1")
+            self.assertEqual(zaak._etag, "")
+        other.refresh_from_db()
+        self.assertEqual(other.zaaktype, "https://example.com/zaaktypen/1")
+        zio = ZaakInformatieObject.objects.get(pk=zio.pk)
+        self.assertEqual(
+            zio.informatieobject, f"{NEW_DRC}api/v1/enkelvoudiginformatieobjecten/1"
+        )
+        # the sync signals are not sent
+        self.mocked_sync_create.assert_not_called()
+
+    def test_producten_of_diensten_rewritten(self):
+        zaak = ZaakFactory.create(
+            producten_of_diensten=[
+                "https://example.com/producten/1",
+                f"{OLD_ZTC}producten/2",
+            ]
+        )
+
+        self.call_command()
+
+        zaak.refresh_from_db()
+        self.assertEqual(
+            zaak.producten_of_diensten,
+            ["https://example.com/producten/1", f"{NEW_ZTC}producten/2"],
+        )
+
+    def test_json_rewritten(self):
+        zaakobject = ZaakObjectFactory.create(
+            object_type=ZaakobjectTypes.overige,
+            object_type_overige_definitie={
+                "url": f"{OLD_ZTC}objecttypen/1",
+                "schema": "properties",
+                "objectData": "record.data",
+            },
+        )
+
+        self.call_command()
+
+        zaakobject = ZaakObject.objects.get(pk=zaakobject.pk)
+        self.assertEqual(
+            zaakobject.object_type_overige_definitie,
+            {
+                "url": f"{NEW_ZTC}objecttypen/1",
+                "schema": "properties",
+                "objectData": "record.data",
+            },
+        )
+
+    def test_json_keys_not_rewritten(self):
+        zaakobject = ZaakObjectFactory.create(
+            object_type=ZaakobjectTypes.overige,
+            object_type_overige_definitie={
+                "url": f"{OLD_ZTC}objecttypen/1",
+                f"{OLD_ZTC}objecttypen/2": f'{OLD_ZTC}objecttypen/"3"',
+                "notes": [f"see {OLD_ZTC}objecttypen/4", f'"{OLD_ZTC}objecttypen/5'],
+            },
+        )
+
+        self.call_command()
+
+        zaakobject = ZaakObject.objects.get(pk=zaakobject.pk)
+        self.assertEqual(
+            zaakobject.object_type_overige_definitie,
+            {
+                "url": f"{NEW_ZTC}objecttypen/1",
+                f"{OLD_ZTC}objecttypen/2": f'{NEW_ZTC}objecttypen/"3"',
+                "notes": [f"see {OLD_ZTC}objecttypen/4", f'"{OLD_ZTC}objecttypen/5'],
+            },
+        )
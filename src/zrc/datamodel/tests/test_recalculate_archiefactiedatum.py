@@ -0,0 +1,181 @@
+import json
+import os
+import tempfile
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from vng_api_common.constants import (
+    Archiefnominatie,
+    Archiefstatus,
+    BrondatumArchiefprocedureAfleidingswijze,
+)
+from zds_client import ClientError
+
+from .factories import ResultaatFactory, ZaakFactory
+
+RESULTAATTYPE = "https://example.com/ztc/api/v1/resultaattypen/1"
+OTHER_RESULTAATTYPE = "https://example.com/ztc/api/v1/resultaattypen/2"
+RESULTAATTYPE_RESPONSE = {
+    "url": RESULTAATTYPE,
+    "archiefactietermijn": "P10Y",
+    "archiefnominatie": Archiefnominatie.vernietigen,
+    "brondatumArchiefprocedure": {
+        "afleidingswijze": BrondatumArchiefprocedureAfleidingswijze.afgehandeld,
+        "datumkenmerk": None,
+        "objecttype": None,
+        "procestermijn": None,
+    },
+}
+
+
+class RecalculateArchiefactiedatumTests(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.utils.clients.get_client")
+        self.remote_client = patcher.start().return_value
+        self.remote_client.retrieve.return_value = RESULTAATTYPE_RESPONSE
+        self.addCleanup(patcher.stop)
+
+    def create_zaak(self, **kwargs):
+        zaak = ZaakFactory.create(
+            einddatum=date(2020, 1, 1), archiefactiedatum=date(2025, 1, 1), **kwargs
+        )
+        ResultaatFactory.create(zaak=zaak, resultaattype=RESULTAATTYPE)
+        return zaak
+
+    def call_command(self, *args):
+        stdout = StringIO()
+        call_command(
+            "recalculate_archiefactiedatum", *args, stdout=stdout, stderr=StringIO()
+        )
+        return stdout.getvalue()
+
+    def test_archiefactiedatum_recalculated(self):
+        zaken = [self.create_zaak() for _ in range(3)]
+        archived = self.create_zaak(archiefstatus=Archiefstatus.gearchiveerd)
+        ZaakFactory.create()
+
+        output = self.call_command("--batch-size=2")
+
+        self.assertIn(
+            "Updated 3 zaken, 0 unchanged, 0 without archiefactiedatum, 0 errors",
+            output,
+        )
+        self.remote_client.retrieve.assert_called_once_with(
+            "resultaattype", url=RESULTAATTYPE
+        )
+        for zaak in zaken:
+            zaak.refresh_from_db()
+            self.assertEqual(zaak.archiefactiedatum, date(2030, 1, 1))
+            self.assertEqual(zaak._etag, "")
+
+        archived.refresh_from_db()
+        self.assertEqual(archived.archiefactiedatum, date(2025, 1, 1))
+
+    def test_dry_run(self):
+        zaak = self.create_zaak()
+
+        output = self.call_command("--dry-run")
+
+        self.assertIn(f"{zaak.identificatie}: 2025-01-01 -> 2030-01-01", output)
+        self.assertIn("Would update 1 zaken", output)
+        zaak.refresh_from_db()
+        self.assertEqual(zaak.archiefactiedatum, date(2025, 1, 1))
+
+    def test_resume_from_checkpoint(self):
+        done, todo = self.create_zaak(), self.create_zaak()
+        checkpoint = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+        with open(checkpoint, "w") as f:
+            json.dump({"last_pk": done.pk}, f)
+
+        self.call_command(f"--checkpoint={checkpoint}")
+
+        done.refresh_from_db()
+        todo.refresh_from_db()
+        self.assertEqual(done.archiefactiedatum, date(2025, 1, 1))
+        self.assertEqual(todo.archiefactiedatum, date(2030, 1, 1))
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_failed_zaken_retried_on_resume(self):
+        failed = self.create_zaak()
+        other = ZaakFactory.create(
+            einddatum=date(2020, 1, 1), archiefactiedatum=date(2025, 1, 1)
+        )
+        ResultaatFactory.create(zaak=other, resultaattype=OTHER_RESULTAATTYPE)
+        checkpoint = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+        with open(checkpoint, "w") as f:
+            json.dump({"last_pk": other.pk, "failed": [failed.pk]}, f)
+
+        self.call_command(f"--checkpoint={checkpoint}")
+
+        failed.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(failed.archiefactiedatum, date(2030, 1, 1))
+        self.assertEqual(other.archiefactiedatum, date(2025, 1, 1))
+
+    def test_failed_zaken_recorded_in_checkpoint(self):
+        zaak = self.create_zaak()
+        self.remote_client.retrieve.side_effect = ClientError({"status": 404})
+        checkpoint = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+
+        # the checkpoint is kept as if the run was interrupted
+        with patch("os.remove"):
+            self.call_command(f"--checkpoint={checkpoint}")
+
+        with open(checkpoint) as f:
+            self.assertEqual(json.load(f), {"last_pk": zaak.pk, "failed": [zaak.pk]})
+
+    def test_workers(self):
+        zaken = [self.create_zaak() for _ in range(3)]
+
+        self.call_command("--workers=2")
+
+        for zaak in zaken:
+            zaak.refresh_from_db()
+            self.assertEqual(zaak.archiefactiedatum, date(2030, 1, 1))
+
+    def test_resultaattype_not_retrieved(self):
+        zaak = self.create_zaak()
+        other = ZaakFactory.create(
+            einddatum=date(2020, 1, 1), archiefactiedatum=date(2025, 1, 1)
+        )
+        ResultaatFactory.create(zaak=other, resultaattype=OTHER_RESULTAATTYPE)
+
+        def retrieve(resource, url):
+            if url == OTHER_RESULTAATTYPE:
+                raise ClientError({"status": 404})
+            return RESULTAATTYPE_RESPONSE
+
+        self.remote_client.retrieve.side_effect = retrieve
+
+        output = self.call_command()
+
+        self.assertIn(
+            "Updated 1 zaken, 0 unchanged, 0 without archiefactiedatum, 1 errors",
+            output,
+        )
+        zaak.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(zaak.archiefactiedatum, date(2030, 1, 1))
+        self.assertEqual(other.archiefactiedatum, date(2025, 1, 1))
+
+    def test_no_archiefactiedatum(self):
+        zaak = self.create_zaak()
+        self.remote_client.retrieve.return_value = {
+            **RESULTAATTYPE_RESPONSE,
+            "archiefactietermijn": None,
+        }
+
+        output = self.call_command()
+
+        self.assertIn(
+            "Updated 0 zaken, 0 unchanged, 1 without archiefactiedatum, 0 errors",
+            output,
+        )
+        zaak.refresh_from_db()
+        self.assertEqual(zaak.archiefactiedatum, date(2025, 1, 1))
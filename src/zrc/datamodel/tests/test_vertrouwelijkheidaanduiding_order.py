@@ -0,0 +1,96 @@
+from django.db.models import F
+from django.test import TestCase
+
+from vng_api_common.constants import VertrouwelijkheidsAanduiding
+
+from ..models import Status, Zaak
+from .factories import StatusFactory, ZaakFactory
+
+
+class VertrouwelijkheidaanduidingOrderTests(TestCase):
+    def test_order_stored_on_save(self):
+        zaak = ZaakFactory.create(
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.intern
+        )
+        self.assertEqual(zaak.vertrouwelijkheidaanduiding_order, 3)
+
+        zaak.vertrouwelijkheidaanduiding = VertrouwelijkheidsAanduiding.geheim
+        zaak.save(update_fields=["vertrouwelijkheidaanduiding"])
+
+        zaak.refresh_from_db()
+        self.assertEqual(zaak.vertrouwelijkheidaanduiding_order, 7)
+
+    def test_filter_for_max_orders(self):
+        zaaktype = "https://example.com/zaaktypen/1"
+        zaak = ZaakFactory.create(
+            zaaktype=zaaktype,
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.openbaar,
+        )
+        ZaakFactory.create(
+            zaaktype=zaaktype,
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.geheim,
+        )
+        ZaakFactory.create(
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.openbaar
+        )
+        status = StatusFactory.create(zaak=zaak)
+        StatusFactory.create()
+
+        max_orders = {zaaktype: 2}
+
+        self.assertEqual(list(Zaak.objects.filter_for_max_orders(max_orders)), [zaak])
+        self.assertEqual(
+            list(Status.objects.filter_for_max_orders(max_orders)), [status]
+        )
+        self.assertFalse(Zaak.objects.filter_for_max_orders({}).exists())
+
+    def test_order_stored_on_update(self):
+        zaak = ZaakFactory.create(
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.intern
+        )
+
+        Zaak.objects.filter(pk=zaak.pk).update(
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.geheim
+        )
+
+        zaak.refresh_from_db()
+        self.assertEqual(zaak.vertrouwelijkheidaanduiding_order, 7)
+
+    def test_order_stored_on_bulk_update(self):
+        zaak = ZaakFactory.create(
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.intern
+        )
+        zaak.vertrouwelijkheidaanduiding = VertrouwelijkheidsAanduiding.openbaar
+
+        Zaak.objects.bulk_update([zaak], ["vertrouwelijkheidaanduiding"])
+
+        zaak.refresh_from_db()
+        self.assertEqual(zaak.vertrouwelijkheidaanduiding_order, 1)
+
+    def test_update_with_expression_rejected(self):
+        with self.assertRaises(ValueError):
+            Zaak.objects.update(vertrouwelijkheidaanduiding=F("zaaktype"))
+
+    def test_order_stored_on_bulk_create(self):
+        zaak = ZaakFactory.build(
+            identificatie="ZAAK-1",
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.geheim,
+        )
+
+        Zaak.objects.bulk_create([zaak])
+
+        zaak = Zaak.objects.get(identificatie="ZAAK-1")
+        self.assertEqual(zaak.vertrouwelijkheidaanduiding_order, 7)
+
+    def test_order_stored_on_raw_save(self):
+        zaak = ZaakFactory.create(
+            vertrouwelijkheidaanduiding=VertrouwelijkheidsAanduiding.geheim
+        )
+        Zaak.objects.filter(pk=zaak.pk).update(vertrouwelijkheidaanduiding_order=None)
+        zaak.refresh_from_db()
+
+        # as loaddata does
+        zaak.save_base(raw=True)
+
+        zaak.refresh_from_db()
+        self.assertEqual(zaak.vertrouwelijkheidaanduiding_order, 7)
@@ -1,28 +1,35 @@
 from datetime import date, datetime
-from typing import Union
+from typing import List, Optional, Union
 
-from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import Max
-from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 
 import isodate
 from vng_api_common.constants import BrondatumArchiefprocedureAfleidingswijze
-from vng_api_common.models import APICredential
 
 from zrc.utils import parse_isodatetime
 from zrc.utils.exceptions import DetermineProcessEndDateException
+from zrc.utils.resources import fetch_resource, fetch_resources
 
 from .models import Zaak
 
 
 class BrondatumCalculator:
-    def __init__(self, zaak: Zaak, datum_status_gezet: datetime):
+    def __init__(
+        self,
+        zaak: Zaak,
+        datum_status_gezet: datetime,
+        resultaattype: Optional[dict] = None,
+    ):
         self.zaak = zaak
         self.datum_status_gezet = datum_status_gezet
+        # the resultaattype may be retrieved up front, e.g. for many zaken at once
+        if resultaattype is not None:
+            self._resultaattype = resultaattype
 
-    def calculate(self) -> Union[None, date]:
-        if self.zaak.archiefactiedatum:
+    def calculate(self, recalculate: bool = False) -> Union[None, date]:
+        if self.zaak.archiefactiedatum and not recalculate:
             return
 
         resultaat = self._get_resultaat()
@@ -58,13 +65,10 @@ class BrondatumCalculator:
         if not hasattr(self, "_resultaattype"):
             self._resultaattype = None
             if resultaattype_url:
-                Client = import_string(settings.ZDS_CLIENT_CLASS)
-                client = Client.from_url(resultaattype_url)
-                client.auth = APICredential.get_auth(
-                    resultaattype_url, scopes=["zds.scopes.zaaktypes.lezen"]
-                )
-                self._resultaattype = client.retrieve(
-                    "resultaattype", url=resultaattype_url
+                self._resultaattype = fetch_resource(
+                    "resultaattype",
+                    resultaattype_url,
+                    scopes=["zds.scopes.zaaktypes.lezen"],
                 )
         return self._resultaattype
 
@@ -154,13 +158,24 @@ def get_brondatum(
                 )
             )
 
+        local_relation = objecttype.replace("_", "")
+        zaak_objecten = zaak.zaakobject_set.filter(object_type=objecttype)
+        if _is_relation(zaak_objecten.model, local_relation):
+            zaak_objecten = zaak_objecten.select_related(local_relation)
+        zaak_objecten = list(zaak_objecten)
+
+        remote_objects = fetch_resources(
+            objecttype.lower(),
+            [zaak_object.object for zaak_object in zaak_objecten if zaak_object.object],
+        )
+
         dates = []
-        for zaak_object in zaak.zaakobject_set.filter(object_type=objecttype):
+        for zaak_object in zaak_objecten:
             if zaak_object.object:
-                remote_object = zaak_object._get_object()
+                remote_object = remote_objects[zaak_object.object]
                 value = remote_object.get(datum_kenmerk)
             else:
-                local_object = getattr(zaak_object, objecttype.replace("_", ""))
+                local_object = getattr(zaak_object, local_relation)
                 value = getattr(local_object, datum_kenmerk, None)
 
             if value is None:
@@ -205,8 +220,8 @@ def get_brondatum(
             )
 
     elif afleidingswijze == BrondatumArchiefprocedureAfleidingswijze.gerelateerde_zaak:
-        relevante_zaken = zaak.relevante_andere_zaken
-        if relevante_zaken.count() == 0:
+        relevante_zaken = list(zaak.relevante_andere_zaken.all())
+        if not relevante_zaken:
             # Cannot use ingangsdatum_besluit if Zaak has no Besluiten
             raise DetermineProcessEndDateException(
                 _(
@@ -214,12 +229,12 @@ def get_brondatum(
                 )
             )
 
+        zaken = fetch_resources(
+            "zaak", [relevante_zaak.url for relevante_zaak in relevante_zaken]
+        )
+
         einddatum_max_external = None
-        for relevante_zaak in relevante_zaken.all():
-            Client = import_string(settings.ZDS_CLIENT_CLASS)
-            client = Client.from_url(relevante_zaak.url)
-            client.auth = APICredential.get_auth(relevante_zaak.url)
-            data = client.retrieve("zaak", url=relevante_zaak.url)
+        for data in zaken.values():
             if data["einddatum"] is None:
                 continue
 
@@ -238,20 +253,10 @@ def get_brondatum(
     elif (
         afleidingswijze == BrondatumArchiefprocedureAfleidingswijze.ingangsdatum_besluit
     ):
-        zaakbesluiten = zaak.zaakbesluit_set.all()
-        if not zaakbesluiten.exists():
-            # Cannot use ingangsdatum_besluit if Zaak has no Besluiten
-            raise DetermineProcessEndDateException(
-                _("Geen besluiten aan zaak gekoppeld om brondatum uit af te leiden.")
-            )
-
-        Client = import_string(settings.ZDS_CLIENT_CLASS)
-        client = Client.from_url(zaakbesluiten.first().besluit)
-        client.auth = APICredential.get_auth(zaakbesluiten.first().besluit)
+        besluiten = _fetch_besluiten(zaak)
 
         max_ingangsdatum = None
-        for zaakbesluit in zaakbesluiten:
-            related_besluit = client.retrieve("besluit", url=zaakbesluit.besluit)
+        for related_besluit in besluiten:
             ingangsdatum = datetime.strptime(
                 related_besluit["ingangsdatum"], "%Y-%m-%d"
             ).date()
@@ -262,20 +267,10 @@ def get_brondatum(
     elif (
         afleidingswijze == BrondatumArchiefprocedureAfleidingswijze.vervaldatum_besluit
     ):
-        zaakbesluiten = zaak.zaakbesluit_set.all()
-        if not zaakbesluiten.exists():
-            # Cannot use ingangsdatum_besluit if Zaak has no Besluiten
-            raise DetermineProcessEndDateException(
-                _("Geen besluiten aan zaak gekoppeld om brondatum uit af te leiden.")
-            )
-
-        Client = import_string(settings.ZDS_CLIENT_CLASS)
-        client = Client.from_url(zaakbesluiten.first().besluit)
-        client.auth = APICredential.get_auth(zaakbesluiten.first().besluit)
+        besluiten = _fetch_besluiten(zaak)
 
         max_vervaldatum = None
-        for zaakbesluit in zaakbesluiten:
-            related_besluit = client.retrieve("besluit", url=zaakbesluit.besluit)
+        for related_besluit in besluiten:
             if related_besluit["vervaldatum"] is None:
                 continue
 
@@ -293,5 +288,26 @@ def get_brondatum(
     raise ValueError(f'Onbekende "Afleidingswijze": {afleidingswijze}')
 
 
+def _is_relation(model, name: str) -> bool:
+    try:
+        return model._meta.get_field(name).is_relation
+    except FieldDoesNotExist:
+        return False
+
+
+def _fetch_besluiten(zaak: Zaak) -> List[dict]:
+    zaakbesluiten = list(zaak.zaakbesluit_set.all())
+    if not zaakbesluiten:
+        # Cannot use ingangsdatum_besluit if Zaak has no Besluiten
+        raise DetermineProcessEndDateException(
+            _("Geen besluiten aan zaak gekoppeld om brondatum uit af te leiden.")
+        )
+
+    besluiten = fetch_resources(
+        "besluit", [zaakbesluit.besluit for zaakbesluit in zaakbesluiten]
+    )
+    return list(besluiten.values())
+
+
 def max_with_none(*args):
     return max(filter(lambda x: x is not None, args)) if any(args) else None
@@ -0,0 +1,165 @@
+"""
+PostGIS database backend with connection health checks and an optional
+connection pool.
+
+``CONN_HEALTH_CHECKS``: a persistent connection (``CONN_MAX_AGE``) is checked
+the first time it is used by a request, and replaced when the database server
+(or a proxy in between) closed it in the meantime, instead of failing the
+request. This is the setting of Django 4.1 and later.
+
+``POOL_SIZE``: the threads of a process take their connection from a shared
+pool of at most ``POOL_SIZE`` connections, instead of every thread opening its
+own. Closing the connection at the end of a request returns it to the pool, so
+the pool is used with ``CONN_MAX_AGE = 0``. A thread waits at most
+``POOL_TIMEOUT`` seconds for a free connection.
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+from django.contrib.gis.db.backends.postgis.base import (
+    DatabaseWrapper as PostGISDatabaseWrapper,
+)
+
+import psycopg2.extras
+from psycopg2 import pool
+
+_pools: Dict[tuple, "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool(pool.ThreadedConnectionPool):
+    """
+    Thread-safe pool of connections, which waits for a free connection.
+
+    All connections are opened when the pool is created, and kept open until
+    they turn out to be broken.
+    """
+
+    def __init__(self, size: int, timeout: float, **conn_params):
+        self.timeout = timeout
+        self._available = threading.BoundedSemaphore(size)
+        super().__init__(size, size, **conn_params)
+
+    def getconn(self, key=None):
+        if not self._available.acquire(timeout=self.timeout):
+            raise pool.PoolError(
+                f"no free connection in the pool within {self.timeout} seconds"
+            )
+        try:
+            return super().getconn(key=key)
+        except Exception:
+            self._available.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super().putconn(conn, key=key, close=close)
+        finally:
+            self._available.release()
+
+
+def get_pool(alias: str, size: int, timeout: float, conn_params: dict):
+    # pools are not shared with forked worker processes
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(size, timeout, **conn_params)
+        return _pools[key]
+
+
+class DatabaseWrapper(PostGISDatabaseWrapper):
+    health_check_done = False
+
+    @property
+    def health_check_enabled(self) -> bool:
+        return self.settings_dict.get("CONN_HEALTH_CHECKS", False)
+
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        size = self.settings_dict.get("POOL_SIZE", 0)
+        if not size:
+            return None
+        return get_pool(
+            self.alias,
+            size,
+            self.settings_dict.get("POOL_TIMEOUT", 10),
+            self.get_connection_params(),
+        )
+
+    def get_new_connection(self, conn_params):
+        connection_pool = self.pool
+        if connection_pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = self._get_pooled_connection(connection_pool)
+
+        # the same initialization as a new connection, see
+        # ``django.db.backends.postgresql.base.DatabaseWrapper``
+        options = self.settings_dict["OPTIONS"]
+        self.isolation_level = options.get(
+            "isolation_level", connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _get_pooled_connection(self, connection_pool: ConnectionPool):
+        # every connection in the pool can be broken, after which a new one is
+        # opened
+        for _ in range(connection_pool.maxconn):
+            connection = connection_pool.getconn()
+            if not self.health_check_enabled or self._is_usable(connection):
+                return connection
+            connection_pool.putconn(connection, close=True)
+        return connection_pool.getconn()
+
+    def _close(self):
+        connection_pool = self.pool
+        if connection_pool is None or self.connection is None:
+            return super()._close()
+
+        with self.wrap_database_errors:
+            connection_pool.putconn(self.connection, close=self.errors_occurred)
+
+    @staticmethod
+    def _is_usable(connection) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not connection.autocommit:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    # Health checks, backported from Django 4.1
+
+    def connect(self):
+        super().connect()
+        # a new connection does not need to be checked
+        self.health_check_done = True
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+        ):
+            return
+
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # called at the start and the end of every request
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name=name)
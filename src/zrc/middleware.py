@@ -1,3 +1,16 @@
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+
+from zrc.utils.performance import collect_metrics, record_render
+from zrc.utils.resources import request_memo
+
+logger = logging.getLogger(__name__)
+performance_logger = logging.getLogger("zrc.performance")
+
 # See https://github.com/Geonovum/KP-APIs/blob/master/Werkgroep%20API%20strategie/extensies/ext-versionering.md
 
 WARNING_HEADER = "Warning"
@@ -51,3 +64,93 @@ class DeprecationMiddleware:
         )
 
         return None
+
+
+class RemoteResourceMemoMiddleware:
+    """
+    Retrieve every remote resource at most once per request.
+
+    The number of remote calls that were saved is logged, and with ``DEBUG``
+    also returned in the ``X-Remote-Resources`` header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_memo() as memo:
+            response = self.get_response(request)
+
+        if memo.resources:
+            logger.debug(
+                "%s %s: retrieved %d remote resources, saved %d remote calls",
+                request.method,
+                request.path,
+                memo.misses,
+                memo.hits,
+            )
+            if settings.DEBUG:
+                response[
+                    "X-Remote-Resources"
+                ] = f"retrieved={memo.misses}; saved={memo.hits}"
+
+        return response
+
+
+class PerformanceMiddleware:
+    """
+    Log the performance metrics of API requests to the ``performance`` handler.
+
+    Requests slower than ``PERFORMANCE_LOG_SLOW_THRESHOLD`` milliseconds are
+    always logged, other requests with a chance of
+    ``PERFORMANCE_LOG_SAMPLE_RATE``. ``render_ms`` is the rendering of the
+    response, the serializers run as part of the view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with collect_metrics() as metrics:
+            request._performance_metrics = metrics
+            response = self.get_response(request)
+        duration = (time.perf_counter() - start) * 1000
+
+        # not an API request
+        if not metrics.view:
+            return response
+
+        slow = duration >= settings.PERFORMANCE_LOG_SLOW_THRESHOLD
+        if slow or random.random() < settings.PERFORMANCE_LOG_SAMPLE_RATE:
+            line = {
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(duration, 1),
+                "slow": slow,
+                **metrics.as_dict(),
+            }
+            performance_logger.info(json.dumps(line))
+
+        return response
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # not a viewset
+        if not hasattr(callback, "cls"):
+            return None
+
+        metrics = request._performance_metrics
+        metrics.view = callback.cls.__name__
+        actions = getattr(callback, "actions", None) or {}
+        metrics.action = actions.get(request.method.lower(), request.method.lower())
+        return None
+
+    def process_template_response(self, request, response):
+        start = time.perf_counter()
+
+        def record(response):
+            record_render(time.perf_counter() - start)
+
+        response.add_post_render_callback(record)
+        return response
@@ -0,0 +1,34 @@
+from django.contrib import admin
+
+from .models import QueuedNotification, SyncJob
+
+
+@admin.register(SyncJob)
+class SyncJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "relation_type",
+        "relation_uuid",
+        "action",
+        "host",
+        "status",
+        "attempts",
+        "next_attempt",
+    )
+    list_filter = ("status", "action", "relation_type", "host")
+    search_fields = ("relation_uuid", "remote_url")
+    readonly_fields = ("created", "modified")
+
+
+@admin.register(QueuedNotification)
+class QueuedNotificationAdmin(admin.ModelAdmin):
+    list_display = (
+        "__str__",
+        "kanaal",
+        "status",
+        "attempts",
+        "next_attempt",
+        "created",
+    )
+    list_filter = ("status", "kanaal")
+    search_fields = ("hoofd_object",)
+    readonly_fields = ("created", "modified")
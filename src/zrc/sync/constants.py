@@ -0,0 +1,15 @@
+from django.utils.translation import ugettext_lazy as _
+
+from djchoices import ChoiceItem, DjangoChoices
+
+
+class SyncActions(DjangoChoices):
+    create = ChoiceItem("create", _("Create the remote relation"))
+    delete = ChoiceItem("delete", _("Delete the remote relation"))
+
+
+class SyncStatus(DjangoChoices):
+    pending = ChoiceItem("pending", _("Pending"))
+    in_progress = ChoiceItem("in_progress", _("In progress"))
+    succeeded = ChoiceItem("succeeded", _("Succeeded"))
+    failed = ChoiceItem("failed", _("Failed"))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management import BaseCommand
+
+from zrc.sync.notifications import process_notifications
+
+
+class Command(BaseCommand):
+    help = "Send the notifications that are queued for the Notificaties API"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the notifications that are due and exit",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when there are no notifications to send",
+        )
+
+    def handle(self, **options):
+        while True:
+            processed = process_notifications(batch_size=options["batch_size"])
+            if processed:
+                self.stdout.write(f"Processed {processed} notifications")
+
+            # a batch contains one notification per main object, so a smaller
+            # batch doesn't mean that all notifications that are due were sent
+            if options["once"]:
+                if not processed:
+                    break
+            elif not processed:
+                time.sleep(options["interval"])
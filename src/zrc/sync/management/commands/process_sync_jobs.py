@@ -0,0 +1,35 @@
+import time
+
+from django.core.management import BaseCommand
+
+from zrc.sync.outbox import process_sync_jobs
+
+
+class Command(BaseCommand):
+    help = "Synchronise the relations with other APIs that are queued in the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the jobs that are due and exit",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when there are no jobs to process",
+        )
+
+    def handle(self, **options):
+        while True:
+            processed = process_sync_jobs(batch_size=options["batch_size"])
+            if processed:
+                self.stdout.write(f"Processed {processed} sync jobs")
+
+            if options["once"]:
+                if processed < options["batch_size"]:
+                    break
+            elif not processed:
+                time.sleep(options["interval"])
@@ -0,0 +1,115 @@
+"""
+Keep track of the relations that are being deleted.
+
+While the remote side of a ZaakInformatieObject, ZaakContactMoment or
+ZaakVerzoek is deleted, the relation must not show up in the ZRC anymore,
+otherwise the validation in the remote API fails. The UUIDs of these relations
+are "marked for delete" for the duration of the remote call.
+
+With Redis, the markers are members of a sorted set, scored by the time at
+which they expire. Adding and removing a marker are single atomic commands, so
+concurrent deletes in different processes don't overwrite each other, and a
+marker of a process that died halfway simply expires. Other cache backends
+(used in development and CI) fall back to a dict in a single cache key.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import List
+from uuid import UUID
+
+from django.core.cache import caches
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# a remote delete that takes longer than this is considered dead
+MARKER_TIMEOUT = 5 * 60
+
+
+class MarkedForDelete:
+    def __init__(self, cache_alias: str, name: str):
+        self.cache_alias = cache_alias
+        self.name = name
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _get_redis(self):
+        try:
+            return get_redis_connection(self.cache_alias)
+        except NotImplementedError:
+            return None
+
+    def _get_key(self) -> str:
+        return self.cache.make_key(f"{self.name}:set")
+
+    def add(self, uuid: UUID) -> None:
+        now = time.time()
+        redis = self._get_redis()
+        if redis is None:
+            markers = self.cache.get(self.name) or {}
+            markers = {
+                member: expires for member, expires in markers.items() if expires > now
+            }
+            markers[str(uuid)] = now + MARKER_TIMEOUT
+            self.cache.set(self.name, markers, timeout=MARKER_TIMEOUT)
+            return
+
+        key = self._get_key()
+        try:
+            with redis.pipeline() as pipe:
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.zadd(key, {str(uuid): now + MARKER_TIMEOUT})
+                pipe.execute()
+        except RedisError:
+            logger.exception("Could not mark %s for delete", uuid)
+
+    def remove(self, uuid: UUID) -> None:
+        redis = self._get_redis()
+        if redis is None:
+            markers = self.cache.get(self.name) or {}
+            markers.pop(str(uuid), None)
+            self.cache.set(self.name, markers, timeout=MARKER_TIMEOUT)
+            return
+
+        try:
+            redis.zrem(self._get_key(), str(uuid))
+        except RedisError:
+            logger.exception("Could not remove the delete marker of %s", uuid)
+
+    def members(self) -> List[str]:
+        """
+        Return the UUIDs that are currently marked for delete.
+        """
+        now = time.time()
+        redis = self._get_redis()
+        if redis is None:
+            markers = self.cache.get(self.name) or {}
+            return [uuid for uuid, expires in markers.items() if expires > now]
+
+        try:
+            members = redis.zrangebyscore(self._get_key(), now, "+inf")
+        except RedisError:
+            logger.exception("Could not retrieve the delete markers")
+            return []
+        return [member.decode("utf-8") for member in members]
+
+    @contextmanager
+    def mark(self, uuid: UUID):
+        """
+        Mark ``uuid`` for delete for the duration of the block.
+        """
+        self.add(uuid)
+        try:
+            yield
+        finally:
+            self.remove(uuid)
+
+
+zios_marked_for_delete = MarkedForDelete("drc_sync", "zios_marked_for_delete")
+zcms_marked_for_delete = MarkedForDelete("kcc_sync", "zcms_marked_for_delete")
+zvs_marked_for_delete = MarkedForDelete("kcc_sync", "zvs_marked_for_delete")
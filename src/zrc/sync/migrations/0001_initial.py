@@ -0,0 +1,120 @@
+# Generated by Django 3.2.14 on 2026-10-16 23:19
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncJob",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "relation_type",
+                    models.CharField(
+                        help_text="Model name of the local relation, e.g. `zaakinformatieobject`.",
+                        max_length=50,
+                        verbose_name="relation type",
+                    ),
+                ),
+                ("relation_uuid", models.UUIDField(verbose_name="relation UUID")),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("create", "Create the remote relation"),
+                            ("delete", "Delete the remote relation"),
+                        ],
+                        max_length=10,
+                        verbose_name="action",
+                    ),
+                ),
+                (
+                    "resource",
+                    models.CharField(
+                        help_text="The remote resource, e.g. `objectinformatieobject`.",
+                        max_length=50,
+                        verbose_name="resource",
+                    ),
+                ),
+                (
+                    "remote_url",
+                    models.URLField(
+                        help_text="URL of the remote object the relation refers to.",
+                        max_length=1000,
+                        verbose_name="remote URL",
+                    ),
+                ),
+                (
+                    "host",
+                    models.CharField(
+                        db_index=True, max_length=255, verbose_name="host"
+                    ),
+                ),
+                ("payload", models.JSONField(default=dict, verbose_name="payload")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="attempts"),
+                ),
+                (
+                    "next_attempt",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="next attempt"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="last error")),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created"),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(auto_now=True, verbose_name="modified"),
+                ),
+            ],
+            options={
+                "verbose_name": "sync job",
+                "verbose_name_plural": "sync jobs",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="syncjob",
+            index=models.Index(
+                fields=["status", "next_attempt"], name="sync_syncjo_status_fb0d15_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="syncjob",
+            index=models.Index(
+                fields=["relation_type", "relation_uuid"],
+                name="sync_syncjo_relatio_3f2184_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 3.2.14 on 2026-10-16 23:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueuedNotification",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kanaal", models.CharField(max_length=50, verbose_name="kanaal")),
+                (
+                    "hoofd_object",
+                    models.URLField(
+                        help_text="URL of the main object of the notification, e.g. the zaak.",
+                        max_length=1000,
+                        verbose_name="hoofd object",
+                    ),
+                ),
+                ("message", models.JSONField(verbose_name="message")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="attempts"),
+                ),
+                (
+                    "next_attempt",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="next attempt"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="last error")),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created"),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(auto_now=True, verbose_name="modified"),
+                ),
+            ],
+            options={
+                "verbose_name": "queued notification",
+                "verbose_name_plural": "queued notifications",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="queuednotification",
+            index=models.Index(
+                fields=["status", "next_attempt"], name="sync_queued_status_62643a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="queuednotification",
+            index=models.Index(
+                fields=["hoofd_object", "status"], name="sync_queued_hoofd_o_470578_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,101 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from .constants import SyncActions, SyncStatus
+
+
+class SyncJob(models.Model):
+    """
+    A scheduled synchronisation of a relation with another API.
+
+    Jobs are created in the same transaction as the change of the relation and
+    are processed afterwards by the ``process_sync_jobs`` management command.
+    """
+
+    relation_type = models.CharField(
+        _("relation type"),
+        max_length=50,
+        help_text=_("Model name of the local relation, e.g. `zaakinformatieobject`."),
+    )
+    relation_uuid = models.UUIDField(_("relation UUID"))
+    action = models.CharField(_("action"), max_length=10, choices=SyncActions.choices)
+    resource = models.CharField(
+        _("resource"),
+        max_length=50,
+        help_text=_("The remote resource, e.g. `objectinformatieobject`."),
+    )
+    remote_url = models.URLField(
+        _("remote URL"),
+        max_length=1000,
+        help_text=_("URL of the remote object the relation refers to."),
+    )
+    host = models.CharField(_("host"), max_length=255, db_index=True)
+    payload = models.JSONField(_("payload"), default=dict)
+
+    status = models.CharField(
+        _("status"),
+        max_length=20,
+        choices=SyncStatus.choices,
+        default=SyncStatus.pending,
+    )
+    attempts = models.PositiveIntegerField(_("attempts"), default=0)
+    next_attempt = models.DateTimeField(_("next attempt"), default=timezone.now)
+    last_error = models.TextField(_("last error"), blank=True)
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+    modified = models.DateTimeField(_("modified"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("sync job")
+        verbose_name_plural = _("sync jobs")
+        indexes = [
+            models.Index(fields=["status", "next_attempt"]),
+            models.Index(fields=["relation_type", "relation_uuid"]),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.action} {self.resource} ({self.relation_type} {self.relation_uuid})"
+        )
+
+
+class QueuedNotification(models.Model):
+    """
+    A notification to send to the Notificaties API.
+
+    Notifications are queued in the same transaction as the change they
+    announce and are sent afterwards by the ``process_notifications``
+    management command, in order per main object. Sent notifications are
+    removed from the queue.
+    """
+
+    kanaal = models.CharField(_("kanaal"), max_length=50)
+    hoofd_object = models.URLField(
+        _("hoofd object"),
+        max_length=1000,
+        help_text=_("URL of the main object of the notification, e.g. the zaak."),
+    )
+    message = models.JSONField(_("message"))
+
+    status = models.CharField(
+        _("status"),
+        max_length=20,
+        choices=SyncStatus.choices,
+        default=SyncStatus.pending,
+    )
+    attempts = models.PositiveIntegerField(_("attempts"), default=0)
+    next_attempt = models.DateTimeField(_("next attempt"), default=timezone.now)
+    last_error = models.TextField(_("last error"), blank=True)
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+    modified = models.DateTimeField(_("modified"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("queued notification")
+        verbose_name_plural = _("queued notifications")
+        indexes = [
+            models.Index(fields=["status", "next_attempt"]),
+            models.Index(fields=["hoofd_object", "status"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.message.get('actie')} {self.message.get('resourceUrl')}"
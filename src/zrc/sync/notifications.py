@@ -0,0 +1,147 @@
+"""
+Queue of the notifications to the Notificaties API.
+
+With ``NOTIFICATIONS_QUEUE_ENABLED``, the API doesn't send notifications
+during the request. It stores a :class:`QueuedNotification` in the transaction
+of the change, so the notification is queued when the change is committed, and
+a Notificaties API that is slow or unavailable doesn't affect the request.
+:func:`process_notifications` sends the queued notifications afterwards,
+retrying failed notifications with an exponential backoff.
+
+The notifications of a main object (e.g. a zaak) are sent in the order they
+were queued: a notification is only sent when no earlier notification of the
+same main object is pending or being sent.
+
+Like the sync jobs of :mod:`zrc.sync.outbox`, the notifications are claimed
+in a short transaction, sent outside of any transaction, and the result of
+each notification is saved on its own.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from notifications_api_common.models import NotificationsConfig
+from zds_client import ClientError
+
+from .constants import SyncStatus
+from .models import QueuedNotification
+from .outbox import CLAIM_TIMEOUT, get_retry_delay
+
+logger = logging.getLogger(__name__)
+
+
+def queue_notification(message: dict) -> QueuedNotification:
+    return QueuedNotification.objects.create(
+        kanaal=message["kanaal"],
+        hoofd_object=message["hoofdObject"],
+        message=message,
+    )
+
+
+def _update(notification: QueuedNotification, **fields) -> None:
+    # the result of each notification is committed on its own
+    QueuedNotification.objects.filter(pk=notification.pk).update(
+        modified=timezone.now(), **fields
+    )
+
+
+def _claim_notifications(batch_size: int) -> list:
+    """
+    Claim the notifications that are due, in order per main object.
+
+    A notification is only claimed when no earlier notification of the same
+    main object is pending or in progress.
+    """
+    now = timezone.now()
+    unfinished = [SyncStatus.pending, SyncStatus.in_progress]
+    earlier_unfinished = QueuedNotification.objects.filter(
+        hoofd_object=OuterRef("hoofd_object"),
+        status__in=unfinished,
+        pk__lt=OuterRef("pk"),
+    )
+
+    with transaction.atomic():
+        notifications = list(
+            QueuedNotification.objects.select_for_update(skip_locked=True)
+            .filter(status__in=unfinished, next_attempt__lte=now)
+            .exclude(Exists(earlier_unfinished))
+            .order_by("pk")[:batch_size]
+        )
+        QueuedNotification.objects.filter(
+            pk__in=[notification.pk for notification in notifications]
+        ).update(
+            status=SyncStatus.in_progress,
+            attempts=F("attempts") + 1,
+            next_attempt=now + CLAIM_TIMEOUT,
+            modified=now,
+        )
+
+    for notification in notifications:
+        notification.status = SyncStatus.in_progress
+        notification.attempts += 1
+    return notifications
+
+
+def process_notifications(batch_size: int = 100) -> int:
+    """
+    Send the queued notifications that are due.
+
+    A batch contains at most one notification per main object. The
+    notifications are claimed in a short transaction before they are sent, so
+    multiple workers can send notifications concurrently and no locks are held
+    while the Notificaties API is called. An earlier notification that is
+    claimed by another worker is still unfinished, so the later notifications
+    of its main object wait for it.
+
+    :return: the number of notifications processed.
+    """
+    client = NotificationsConfig.get_client()
+    if client is None:
+        logger.error("Could not build a client for the Notificaties API")
+        return 0
+
+    notifications = _claim_notifications(batch_size)
+
+    for index, notification in enumerate(notifications):
+        try:
+            client.create("notificaties", notification.message)
+        except Exception as exc:
+            logger.warning(
+                "Could not deliver notification %s", notification, exc_info=True
+            )
+            status = (
+                SyncStatus.failed
+                if notification.attempts >= settings.NOTIFICATIONS_QUEUE_MAX_ATTEMPTS
+                else SyncStatus.pending
+            )
+            next_attempt = timezone.now() + get_retry_delay(notification.attempts)
+            _update(
+                notification,
+                status=status,
+                next_attempt=next_attempt,
+                last_error=str(exc),
+            )
+
+            # a rejected notification doesn't affect the others, otherwise
+            # the Notificaties API is most likely unavailable
+            if isinstance(exc, ClientError):
+                continue
+
+            # release the claim of the remaining notifications
+            QueuedNotification.objects.filter(
+                pk__in=[other.pk for other in notifications[index + 1 :]]
+            ).update(
+                status=SyncStatus.pending,
+                attempts=F("attempts") - 1,
+                next_attempt=next_attempt,
+                modified=timezone.now(),
+            )
+            break
+
+        else:
+            QueuedNotification.objects.filter(pk=notification.pk).delete()
+
+    return len(notifications)
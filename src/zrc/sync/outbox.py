@@ -0,0 +1,224 @@
+"""
+Transactional outbox for the synchronisation of relations with other APIs.
+
+With ``SYNC_OUTBOX_ENABLED``, the signal handlers don't call the remote API
+directly. They store a :class:`SyncJob` in the transaction that changes the
+relation, so the API can respond as soon as the local change is committed.
+:func:`process_sync_jobs` drains the jobs afterwards, retrying failed jobs with
+an exponential backoff.
+
+A worker claims a batch of jobs in a short transaction, by marking them
+``in_progress`` until ``CLAIM_TIMEOUT``. The remote calls are made outside of
+any transaction and the result of each job is saved on its own, so no locks
+are held during the remote calls, and the jobs that were processed before a
+worker died aren't processed again. The jobs of a worker that died are claimed
+again when their claim expires.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from zrc.utils.clients import Client, get_client
+
+from .constants import SyncActions, SyncStatus
+from .models import SyncJob
+
+logger = logging.getLogger(__name__)
+
+# field of the local relation that stores the url of the remote relation
+REMOTE_RELATION_FIELDS = {
+    "zaakcontactmoment": "_objectcontactmoment",
+    "zaakverzoek": "_objectverzoek",
+}
+
+RETRY_BASE_DELAY = 30  # seconds
+RETRY_MAX_DELAY = 60 * 60
+
+# a claimed job that isn't finished this long after it was claimed is claimed
+# again, in case the worker died
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def schedule_sync(
+    relation: models.Model, action: str, resource: str, remote_url: str, **payload
+) -> SyncJob:
+    return SyncJob.objects.create(
+        relation_type=relation._meta.model_name,
+        relation_uuid=relation.uuid,
+        action=action,
+        resource=resource,
+        remote_url=remote_url,
+        host=urlparse(remote_url).netloc,
+        payload=payload,
+    )
+
+
+def cancel_pending_create(relation: models.Model) -> bool:
+    """
+    Cancel the creation of a remote relation that hasn't been attempted yet.
+
+    A job that is in progress or failed may have created the remote relation
+    already, e.g. when the remote API timed out after creating it.
+
+    :return: whether a create job was cancelled, in which case there is no
+      remote relation to delete.
+    """
+    deleted, _ = SyncJob.objects.filter(
+        relation_type=relation._meta.model_name,
+        relation_uuid=relation.uuid,
+        action=SyncActions.create,
+        status=SyncStatus.pending,
+        attempts=0,
+    ).delete()
+    return bool(deleted)
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return timedelta(seconds=delay)
+
+
+def _get_relation_queryset(job: SyncJob) -> models.QuerySet:
+    model = apps.get_model("datamodel", job.relation_type)
+    return model.objects.filter(uuid=job.relation_uuid)
+
+
+def _create(client: Client, job: SyncJob) -> None:
+    relations = _get_relation_queryset(job)
+    if not relations.exists():
+        logger.info("Relation %s was deleted before it was synced", job)
+        return
+
+    response = client.create(job.resource, job.payload["data"])
+
+    field = REMOTE_RELATION_FIELDS.get(job.relation_type)
+    if field is None:
+        return
+
+    # the relation may have been deleted while the remote relation was created
+    if not relations.update(**{field: response["url"]}):
+        client.delete(job.resource, url=response["url"])
+
+
+def _delete(client: Client, job: SyncJob) -> None:
+    if "url" in job.payload:
+        relation_url = job.payload["url"]
+    else:
+        response = client.list(job.resource, query_params=job.payload["query_params"])
+        if not response:
+            logger.info("No remote relation found for %s", job)
+            return
+        relation_url = response[0]["url"]
+
+    client.delete(job.resource, url=relation_url)
+
+
+def _update(job: SyncJob, **fields) -> None:
+    # the result of each job is committed on its own
+    SyncJob.objects.filter(pk=job.pk).update(modified=timezone.now(), **fields)
+
+
+def _process_host(jobs: list) -> None:
+    """
+    Process the jobs of a single remote host, with one client per API.
+
+    When a job fails, the remaining jobs of the host are postponed as well,
+    since the host is most likely unavailable.
+    """
+    clients = {}
+    for index, job in enumerate(jobs):
+        key = (job.resource, job.host)
+        try:
+            if key not in clients:
+                clients[key] = get_client(job.remote_url)
+
+            if job.action == SyncActions.create:
+                _create(clients[key], job)
+            else:
+                _delete(clients[key], job)
+        except Exception as exc:
+            logger.warning("Sync job %s failed", job, exc_info=True)
+            status = (
+                SyncStatus.failed
+                if job.attempts >= settings.SYNC_MAX_ATTEMPTS
+                else SyncStatus.pending
+            )
+            next_attempt = timezone.now() + get_retry_delay(job.attempts)
+            _update(job, status=status, next_attempt=next_attempt, last_error=str(exc))
+
+            # release the claim of the remaining jobs
+            SyncJob.objects.filter(
+                pk__in=[other.pk for other in jobs[index + 1 :]]
+            ).update(
+                status=SyncStatus.pending,
+                attempts=F("attempts") - 1,
+                next_attempt=next_attempt,
+                modified=timezone.now(),
+            )
+            return
+
+        _update(job, status=SyncStatus.succeeded, last_error="")
+
+
+def _claim_jobs(batch_size: int) -> list:
+    """
+    Claim the jobs that are due, in order per relation.
+
+    A job is only claimed when no earlier job of the same relation is pending
+    or in progress, so the deletion of a relation waits for its creation.
+    """
+    now = timezone.now()
+    unfinished = [SyncStatus.pending, SyncStatus.in_progress]
+    earlier_unfinished = SyncJob.objects.filter(
+        relation_type=OuterRef("relation_type"),
+        relation_uuid=OuterRef("relation_uuid"),
+        status__in=unfinished,
+        pk__lt=OuterRef("pk"),
+    )
+
+    with transaction.atomic():
+        jobs = list(
+            SyncJob.objects.select_for_update(skip_locked=True)
+            .filter(status__in=unfinished, next_attempt__lte=now)
+            .exclude(Exists(earlier_unfinished))
+            .order_by("host", "pk")[:batch_size]
+        )
+        SyncJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=SyncStatus.in_progress,
+            attempts=F("attempts") + 1,
+            next_attempt=now + CLAIM_TIMEOUT,
+            modified=now,
+        )
+
+    for job in jobs:
+        job.status = SyncStatus.in_progress
+        job.attempts += 1
+    return jobs
+
+
+def process_sync_jobs(batch_size: int = 100) -> int:
+    """
+    Process the sync jobs that are due, grouped per remote host.
+
+    The jobs are claimed before they are processed, so multiple workers can
+    process jobs concurrently.
+
+    :return: the number of jobs processed.
+    """
+    jobs = _claim_jobs(batch_size)
+
+    jobs_per_host = defaultdict(list)
+    for job in jobs:
+        jobs_per_host[job.host].append(job)
+
+    for host_jobs in jobs_per_host.values():
+        _process_host(host_jobs)
+
+    return len(jobs)
@@ -1,15 +1,21 @@
 import logging
 
-from django.core.cache import caches
+from django.conf import settings
 from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 
-from vng_api_common.models import APICredential
-from zds_client import Client
-
 from zrc.api.utils import get_absolute_url
 from zrc.datamodel.models import ZaakContactMoment, ZaakInformatieObject
 from zrc.datamodel.models.core import ZaakVerzoek
+from zrc.utils.clients import get_client
+
+from .constants import SyncActions
+from .markers import (
+    zcms_marked_for_delete,
+    zios_marked_for_delete,
+    zvs_marked_for_delete,
+)
+from .outbox import cancel_pending_create, schedule_sync
 
 logger = logging.getLogger(__name__)
 
@@ -25,18 +31,10 @@ def sync_create_zio(relation: ZaakInformatieObject):
 
     # Define the remote resource with which we need to interact
     resource = "objectinformatieobject"
-    client = Client.from_url(relation.informatieobject)
-    client.auth = APICredential.get_auth(relation.informatieobject)
+    client = get_client(relation.informatieobject)
 
     try:
-        client.create(
-            resource,
-            {
-                "object": zaak_url,
-                "informatieobject": relation.informatieobject,
-                "objectType": "zaak",
-            },
-        )
+        client.create(resource, get_zio_remote_data(relation))
     except Exception as exc:
         logger.error(f"Could not create remote relation", exc_info=1)
         raise SyncError(f"Could not create remote relation") from exc
@@ -50,8 +48,7 @@ def sync_delete_zio(relation: ZaakInformatieObject):
 
     # Define the remote resource with which we need to interact
     resource = "objectinformatieobject"
-    client = Client.from_url(relation.informatieobject)
-    client.auth = APICredential.get_auth(relation.informatieobject)
+    client = get_client(relation.informatieobject)
 
     # Retrieve the url of the relation between the object and
     # the informatieobject
@@ -84,8 +81,7 @@ def sync_create_zaakcontactmoment(relation: ZaakContactMoment):
 
     # Define the remote resource with which we need to interact
     resource = "objectcontactmoment"
-    client = Client.from_url(relation.contactmoment)
-    client.auth = APICredential.get_auth(relation.contactmoment)
+    client = get_client(relation.contactmoment)
 
     try:
         response = client.create(
@@ -107,8 +103,7 @@ def sync_create_zaakcontactmoment(relation: ZaakContactMoment):
 
 def sync_delete_zaakcontactmoment(relation: ZaakContactMoment):
     resource = "objectcontactmoment"
-    client = Client.from_url(relation.contactmoment)
-    client.auth = APICredential.get_auth(relation.contactmoment)
+    client = get_client(relation.contactmoment)
 
     try:
         client.delete(resource, url=relation._objectcontactmoment)
@@ -125,8 +120,7 @@ def sync_create_zaakverzoek(relation: ZaakVerzoek):
 
     # Define the remote resource with which we need to interact
     resource = "objectverzoek"
-    client = Client.from_url(relation.verzoek)
-    client.auth = APICredential.get_auth(relation.verzoek)
+    client = get_client(relation.verzoek)
 
     try:
         response = client.create(
@@ -148,8 +142,7 @@ def sync_create_zaakverzoek(relation: ZaakVerzoek):
 
 def sync_delete_zaakverzoek(relation: ZaakVerzoek):
     resource = "objectverzoek"
-    client = Client.from_url(relation.verzoek)
-    client.auth = APICredential.get_auth(relation.verzoek)
+    client = get_client(relation.verzoek)
 
     try:
         client.delete(resource, url=relation._objectverzoek)
@@ -158,6 +151,24 @@ def sync_delete_zaakverzoek(relation: ZaakVerzoek):
         raise SyncError(f"Could not delete remote relation") from exc
 
 
+def get_zio_remote_data(relation: ZaakInformatieObject) -> dict:
+    return {
+        "object": get_absolute_url("zaak-detail", relation.zaak.uuid),
+        "informatieobject": relation.informatieobject,
+        "objectType": "zaak",
+    }
+
+
+def get_remote_relation_url(relation, field: str) -> str:
+    # the outbox worker may have stored the url after this instance was loaded
+    return (
+        type(relation)
+        .objects.filter(pk=relation.pk)
+        .values_list(field, flat=True)
+        .first()
+    )
+
+
 @receiver(
     [post_save, pre_delete],
     sender=ZaakInformatieObject,
@@ -167,25 +178,39 @@ def sync_informatieobject_relation(
     sender, instance: ZaakInformatieObject = None, **kwargs
 ):
     signal = kwargs["signal"]
+    if settings.SYNC_OUTBOX_ENABLED:
+        resource = "objectinformatieobject"
+        data = get_zio_remote_data(instance)
+        if signal is post_save and kwargs.get("created", False):
+            schedule_sync(
+                instance,
+                SyncActions.create,
+                resource,
+                instance.informatieobject,
+                data=data,
+            )
+        elif signal is pre_delete and not cancel_pending_create(instance):
+            query_params = {
+                "object": data["object"],
+                "informatieobject": data["informatieobject"],
+            }
+            schedule_sync(
+                instance,
+                SyncActions.delete,
+                resource,
+                instance.informatieobject,
+                query_params=query_params,
+            )
+        return
+
     if signal is post_save and kwargs.get("created", False):
         sync_create_zio(instance)
     elif signal is pre_delete:
         # Add the uuid of the ZaakInformatieObject to the list of ZIOs that are
         # marked for delete, causing them not to show up when performing
         # GET requests on the ZRC, allowing the validation in the DRC to pass
-        cache = caches["drc_sync"]
-        marked_zios = cache.get("zios_marked_for_delete")
-        if marked_zios:
-            cache.set("zios_marked_for_delete", marked_zios + [instance.uuid])
-        else:
-            cache.set("zios_marked_for_delete", [instance.uuid])
-
-        try:
+        with zios_marked_for_delete.mark(instance.uuid):
             sync_delete_zio(instance)
-        finally:
-            marked_zios = cache.get("zios_marked_for_delete")
-            marked_zios.remove(instance.uuid)
-            cache.set("zios_marked_for_delete", marked_zios)
 
 
 @receiver(
@@ -195,22 +220,38 @@ def sync_informatieobject_relation(
 )
 def sync_contactmoment_relation(sender, instance: ZaakContactMoment = None, **kwargs):
     signal = kwargs["signal"]
+    if settings.SYNC_OUTBOX_ENABLED:
+        resource = "objectcontactmoment"
+        if signal is post_save and kwargs.get("created", False):
+            data = {
+                "object": get_absolute_url("zaak-detail", instance.zaak.uuid),
+                "contactmoment": instance.contactmoment,
+                "objectType": "zaak",
+            }
+            schedule_sync(
+                instance,
+                SyncActions.create,
+                resource,
+                instance.contactmoment,
+                data=data,
+            )
+        elif signal is pre_delete and not cancel_pending_create(instance):
+            url = get_remote_relation_url(instance, "_objectcontactmoment")
+            if url:
+                schedule_sync(
+                    instance,
+                    SyncActions.delete,
+                    resource,
+                    instance.contactmoment,
+                    url=url,
+                )
+        return
+
     if signal is post_save and not instance._objectcontactmoment:
         sync_create_zaakcontactmoment(instance)
     elif signal is pre_delete and instance._objectcontactmoment:
-        cache = caches["kcc_sync"]
-        marked_zcms = cache.get("zcms_marked_for_delete")
-        if marked_zcms:
-            cache.set("zcms_marked_for_delete", marked_zcms + [instance.uuid])
-        else:
-            cache.set("zcms_marked_for_delete", [instance.uuid])
-
-        try:
+        with zcms_marked_for_delete.mark(instance.uuid):
             sync_delete_zaakcontactmoment(instance)
-        finally:
-            marked_zcms = cache.get("zcms_marked_for_delete")
-            marked_zcms.remove(instance.uuid)
-            cache.set("zcms_marked_for_delete", marked_zcms)
 
 
 @receiver(
@@ -220,19 +261,27 @@ def sync_contactmoment_relation(sender, instance: ZaakContactMoment = None, **kw
 )
 def sync_verzoek_relation(sender, instance: ZaakVerzoek = None, **kwargs):
     signal = kwargs["signal"]
+    if settings.SYNC_OUTBOX_ENABLED:
+        resource = "objectverzoek"
+        if signal is post_save and kwargs.get("created", False):
+            data = {
+                "object": get_absolute_url("zaak-detail", instance.zaak.uuid),
+                "verzoek": instance.verzoek,
+                "objectType": "zaak",
+            }
+            schedule_sync(
+                instance, SyncActions.create, resource, instance.verzoek, data=data
+            )
+        elif signal is pre_delete and not cancel_pending_create(instance):
+            url = get_remote_relation_url(instance, "_objectverzoek")
+            if url:
+                schedule_sync(
+                    instance, SyncActions.delete, resource, instance.verzoek, url=url
+                )
+        return
+
     if signal is post_save and not instance._objectverzoek:
         sync_create_zaakverzoek(instance)
     elif signal is pre_delete and instance._objectverzoek:
-        cache = caches["kcc_sync"]
-        marked_zvs = cache.get("zvs_marked_for_delete")
-        if marked_zvs:
-            cache.set("zvs_marked_for_delete", marked_zvs + [instance.uuid])
-        else:
-            cache.set("zvs_marked_for_delete", [instance.uuid])
-
-        try:
+        with zvs_marked_for_delete.mark(instance.uuid):
             sync_delete_zaakverzoek(instance)
-        finally:
-            marked_zvs = cache.get("zvs_marked_for_delete")
-            marked_zvs.remove(instance.uuid)
-            cache.set("zvs_marked_for_delete", marked_zvs)
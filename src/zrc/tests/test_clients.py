@@ -0,0 +1,127 @@
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from vng_api_common.models import APICredential
+
+from zrc.utils.clients import (
+    get_auth,
+    get_clients,
+    get_session,
+    invalidate_credentials,
+    retrieve_many,
+)
+
+ZTC_ROOT = "https://example.com/ztc/api/v1/"
+ZAAKTYPE = f"{ZTC_ROOT}zaaktypen/283ffaf5-8470-457b-8064-90e5728f413f"
+
+
+class SessionTests(TestCase):
+    def test_session_per_host(self):
+        session = get_session(ZAAKTYPE)
+
+        self.assertIs(get_session(f"{ZTC_ROOT}statustypen/1"), session)
+        self.assertIsNot(get_session("https://other.example.com/api/v1/"), session)
+
+
+@override_settings(OUTBOUND_CREDENTIALS_CACHE_TIMEOUT=60)
+class CredentialsCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        invalidate_credentials(sender=APICredential)
+        self.addCleanup(invalidate_credentials, sender=APICredential)
+
+        self.credential = APICredential.objects.create(
+            api_root=ZTC_ROOT, client_id="zrc", secret="secret", user_id="zrc"
+        )
+        APICredential.objects.create(
+            api_root="https://example.com/", client_id="other", secret="secret"
+        )
+
+    def test_credentials_loaded_once(self):
+        get_auth(ZAAKTYPE)
+
+        with self.assertNumQueries(0):
+            auth = get_auth(ZAAKTYPE)
+            other_auth = get_auth("https://example.com/drc/api/v1/")
+            no_auth = get_auth("https://example.nl/")
+
+        # the most specific api root is used
+        self.assertEqual(auth.client_id, "zrc")
+        self.assertEqual(other_auth.client_id, "other")
+        self.assertIsNone(no_auth)
+
+    def test_credentials_reloaded_when_changed(self):
+        get_auth(ZAAKTYPE)
+
+        self.credential.client_id = "changed"
+        self.credential.save()
+
+        self.assertEqual(get_auth(ZAAKTYPE).client_id, "changed")
+
+    def test_scopes_claim(self):
+        auth = get_auth(ZAAKTYPE, scopes=["zds.scopes.zaaktypes.lezen"])
+
+        self.assertEqual(auth.claims, {"scopes": ["zds.scopes.zaaktypes.lezen"]})
+
+
+class GetClientsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        invalidate_credentials(sender=APICredential)
+        self.addCleanup(invalidate_credentials, sender=APICredential)
+
+    def test_client_per_api_root_and_credentials(self):
+        APICredential.objects.create(
+            api_root=ZTC_ROOT, client_id="ztc", secret="secret"
+        )
+        APICredential.objects.create(
+            api_root="https://example.com/drc/api/v1/", client_id="drc", secret="secret"
+        )
+        zaaktype = f"{ZTC_ROOT}zaaktypen/5e0c5f0f-2d1b-4d4e-9b2a-b7a4f2b5c0c1"
+        document = (
+            "https://example.com/drc/api/v1/enkelvoudiginformatieobjecten/"
+            "0c5bd4b0-1e57-4c8d-8c0a-4bd8c3a0c4e2"
+        )
+
+        clients = get_clients([ZAAKTYPE, zaaktype, document])
+
+        self.assertIs(clients[ZAAKTYPE], clients[zaaktype])
+        self.assertIsNot(clients[ZAAKTYPE], clients[document])
+        self.assertEqual(clients[ZAAKTYPE].auth.client_id, "ztc")
+        self.assertEqual(clients[document].auth.client_id, "drc")
+
+
+@override_settings(REMOTE_RESOURCE_MAX_WORKERS=3)
+class RetrieveManyTests(TestCase):
+    urls = [f"{ZTC_ROOT}zaaktypen/{i}" for i in range(3)]
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.utils.clients.get_client")
+        self.mock_get_client = patcher.start()
+        self.remote_client = self.mock_get_client.return_value
+        self.addCleanup(patcher.stop)
+
+    def test_resources_retrieved_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def retrieve(resource, url):
+            barrier.wait()
+            return {"url": url}
+
+        self.remote_client.retrieve.side_effect = retrieve
+
+        zaaktypen = retrieve_many("zaaktype", self.urls)
+
+        self.assertEqual(zaaktypen, {url: {"url": url} for url in self.urls})
+        # one client per host
+        self.mock_get_client.assert_called_once_with(self.urls[0], None)
+
+    def test_no_resources(self):
+        self.assertEqual(retrieve_many("zaaktype", []), {})
+        self.mock_get_client.assert_not_called()
@@ -0,0 +1,103 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from psycopg2 import extensions, pool
+
+from zrc.db.backends.postgis.base import ConnectionPool, DatabaseWrapper
+from zrc.utils.checks import check_connection_pool
+
+
+def make_connection():
+    conn = MagicMock(closed=False)
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+
+@patch("psycopg2.connect", side_effect=lambda *args, **kwargs: make_connection())
+class ConnectionPoolTests(SimpleTestCase):
+    def test_connections_reused(self, mock_connect):
+        connection_pool = ConnectionPool(2, timeout=1)
+
+        conn = connection_pool.getconn()
+        connection_pool.putconn(conn)
+
+        self.assertIs(connection_pool.getconn(), conn)
+        self.assertEqual(mock_connect.call_count, 2)
+
+    def test_broken_connection_replaced(self, mock_connect):
+        connection_pool = ConnectionPool(1, timeout=1)
+
+        conn = connection_pool.getconn()
+        connection_pool.putconn(conn, close=True)
+
+        self.assertIsNot(connection_pool.getconn(), conn)
+        conn.close.assert_called_once_with()
+
+    def test_wait_for_free_connection(self, mock_connect):
+        connection_pool = ConnectionPool(1, timeout=5)
+        conn = connection_pool.getconn()
+
+        threading.Timer(0.1, connection_pool.putconn, args=(conn,)).start()
+
+        self.assertIs(connection_pool.getconn(), conn)
+
+    def test_pool_exhausted(self, mock_connect):
+        connection_pool = ConnectionPool(1, timeout=0.01)
+        connection_pool.getconn()
+
+        with self.assertRaises(pool.PoolError):
+            connection_pool.getconn()
+
+
+class HealthCheckTests(SimpleTestCase):
+    def get_wrapper(self, health_checks: bool) -> DatabaseWrapper:
+        settings_dict = {
+            **connection.settings_dict,
+            "CONN_HEALTH_CHECKS": health_checks,
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias="health-check")
+        wrapper.connection = make_connection()
+        wrapper.autocommit = True
+        return wrapper
+
+    def test_unusable_connection_closed_once_per_request(self):
+        wrapper = self.get_wrapper(health_checks=True)
+        wrapper.close_if_unusable_or_obsolete()
+
+        with patch.object(wrapper, "is_usable", return_value=False) as mock_usable:
+            with patch.object(wrapper, "close") as mock_close:
+                wrapper.close_if_health_check_failed()
+                wrapper.close_if_health_check_failed()
+
+        mock_usable.assert_called_once_with()
+        mock_close.assert_called_once_with()
+
+    def test_health_checks_disabled(self):
+        wrapper = self.get_wrapper(health_checks=False)
+        wrapper.close_if_unusable_or_obsolete()
+
+        with patch.object(wrapper, "is_usable") as mock_usable:
+            wrapper.close_if_health_check_failed()
+
+        mock_usable.assert_not_called()
+
+
+class ConnectionPoolCheckTests(SimpleTestCase):
+    def test_pool_with_persistent_connections(self):
+        databases = {"default": {"POOL_SIZE": 2, "CONN_MAX_AGE": 60}}
+
+        with override_settings(DATABASES=databases):
+            errors = check_connection_pool(None)
+
+        self.assertEqual([error.id for error in errors], ["utils.E002"])
+
+    def test_pool(self):
+        databases = {"default": {"POOL_SIZE": 2, "CONN_MAX_AGE": 0}}
+
+        with override_settings(DATABASES=databases):
+            errors = check_connection_pool(None)
+
+        self.assertEqual(errors, [])
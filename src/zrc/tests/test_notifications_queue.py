@@ -0,0 +1,193 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from django_capture_on_commit_callbacks import capture_on_commit_callbacks
+from freezegun import freeze_time
+from rest_framework import status
+from rest_framework.test import APITestCase
+from vng_api_common.constants import VertrouwelijkheidsAanduiding
+from vng_api_common.tests import JWTAuthMixin, get_operation_url
+from zds_client import ClientError
+
+from zrc.api.scopes import SCOPE_ZAKEN_ALLES_LEZEN, SCOPE_ZAKEN_CREATE
+from zrc.api.tests.mixins import NotificationsConfigMixin
+from zrc.sync.constants import SyncStatus
+from zrc.sync.models import QueuedNotification
+from zrc.sync.notifications import process_notifications, queue_notification
+from zrc.sync.outbox import CLAIM_TIMEOUT
+
+from .utils import ZAAK_WRITE_KWARGS
+
+ZAAKTYPE = (
+    "https://example.com/ztc/api/v1/zaaktypen/283ffaf5-8470-457b-8064-90e5728f413f"
+)
+ZAAK_1 = "https://zrc.nl/api/v1/zaken/1"
+ZAAK_2 = "https://zrc.nl/api/v1/zaken/2"
+
+
+def get_message(zaak: str, resource_url: str) -> dict:
+    return {
+        "kanaal": "zaken",
+        "hoofdObject": zaak,
+        "resource": "status",
+        "resourceUrl": resource_url,
+        "actie": "create",
+        "aanmaakdatum": "2012-01-14T00:00:00Z",
+        "kenmerken": {},
+    }
+
+
+@freeze_time("2012-01-14")
+@override_settings(
+    LINK_FETCHER="vng_api_common.mocks.link_fetcher_200",
+    NOTIFICATIONS_DISABLED=False,
+    NOTIFICATIONS_QUEUE_ENABLED=True,
+)
+class QueueNotificationTests(NotificationsConfigMixin, JWTAuthMixin, APITestCase):
+    scopes = [SCOPE_ZAKEN_CREATE, SCOPE_ZAKEN_ALLES_LEZEN]
+    zaaktype = ZAAKTYPE
+
+    @patch("vng_api_common.validators.fetcher")
+    @patch("vng_api_common.validators.obj_has_shape", return_value=True)
+    @patch("notifications_api_common.models.NotificationsConfig.get_client")
+    def test_notification_queued_instead_of_sent(self, mock_client, *mocks):
+        client = mock_client.return_value
+        data = {
+            "zaaktype": ZAAKTYPE,
+            "vertrouwelijkheidaanduiding": VertrouwelijkheidsAanduiding.openbaar,
+            "bronorganisatie": "517439943",
+            "verantwoordelijkeOrganisatie": "517439943",
+            "registratiedatum": "2012-01-13",
+            "startdatum": "2012-01-13",
+        }
+
+        with capture_on_commit_callbacks(execute=True):
+            response = self.client.post(
+                get_operation_url("zaak_create"), data, **ZAAK_WRITE_KWARGS
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        client.create.assert_not_called()
+        notification = QueuedNotification.objects.get()
+        self.assertEqual(notification.hoofd_object, response.data["url"])
+        self.assertEqual(notification.message["actie"], "create")
+        self.assertEqual(notification.message["aanmaakdatum"], "2012-01-14T00:00:00Z")
+
+        processed = process_notifications()
+
+        self.assertEqual(processed, 1)
+        client.create.assert_called_once_with("notificaties", notification.message)
+        self.assertFalse(QueuedNotification.objects.exists())
+
+
+@override_settings(NOTIFICATIONS_QUEUE_MAX_ATTEMPTS=2)
+class ProcessNotificationsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.sync.notifications.NotificationsConfig.get_client")
+        self.nrc_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def get_sent_resources(self) -> list:
+        return [
+            call.args[1]["resourceUrl"]
+            for call in self.nrc_client.create.call_args_list
+        ]
+
+    def test_sent_in_order_per_zaak(self):
+        queue_notification(get_message(ZAAK_1, "status-1"))
+        queue_notification(get_message(ZAAK_1, "status-2"))
+        queue_notification(get_message(ZAAK_2, "status-3"))
+
+        self.assertEqual(process_notifications(), 2)
+        self.assertEqual(self.get_sent_resources(), ["status-1", "status-3"])
+
+        self.assertEqual(process_notifications(), 1)
+        self.assertEqual(
+            self.get_sent_resources(), ["status-1", "status-3", "status-2"]
+        )
+        self.assertFalse(QueuedNotification.objects.exists())
+
+    def test_failed_notification_retried_with_backoff(self):
+        self.nrc_client.create.side_effect = Exception("unavailable")
+        first = queue_notification(get_message(ZAAK_1, "status-1"))
+        queue_notification(get_message(ZAAK_1, "status-2"))
+        other = queue_notification(get_message(ZAAK_2, "status-3"))
+
+        process_notifications()
+
+        # the remaining notifications are postponed, the later notification of
+        # the zaak waits for the failed one
+        self.assertEqual(self.get_sent_resources(), ["status-1"])
+        first.refresh_from_db()
+        self.assertEqual(first.status, SyncStatus.pending)
+        self.assertEqual(first.attempts, 1)
+        self.assertGreater(first.next_attempt, timezone.now())
+        other.refresh_from_db()
+        self.assertEqual(other.next_attempt, first.next_attempt)
+        self.assertEqual(process_notifications(), 0)
+
+        QueuedNotification.objects.update(next_attempt=timezone.now())
+        process_notifications()
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, SyncStatus.failed)
+
+        # a notification that failed permanently doesn't block the zaak
+        self.nrc_client.create.side_effect = None
+        QueuedNotification.objects.update(next_attempt=timezone.now())
+        process_notifications()
+
+        self.assertEqual(self.get_sent_resources()[-2:], ["status-2", "status-3"])
+        self.assertEqual(list(QueuedNotification.objects.all()), [first])
+
+    def test_rejected_notification_does_not_postpone_others(self):
+        self.nrc_client.create.side_effect = [ClientError({"status": 400}), None]
+        rejected = queue_notification(get_message(ZAAK_1, "status-1"))
+        queue_notification(get_message(ZAAK_2, "status-2"))
+
+        self.assertEqual(process_notifications(), 2)
+
+        self.assertEqual(self.get_sent_resources(), ["status-1", "status-2"])
+        self.assertEqual(list(QueuedNotification.objects.all()), [rejected])
+
+    def test_sent_outside_of_transaction(self):
+        atomic_blocks = len(connection.atomic_blocks)
+        during_call = {}
+
+        def create(resource, data):
+            during_call["atomic_blocks"] = len(connection.atomic_blocks)
+            during_call["status"] = QueuedNotification.objects.get().status
+
+        self.nrc_client.create.side_effect = create
+        queue_notification(get_message(ZAAK_1, "status-1"))
+
+        self.assertEqual(process_notifications(), 1)
+
+        self.assertEqual(during_call["atomic_blocks"], atomic_blocks)
+        self.assertEqual(during_call["status"], SyncStatus.in_progress)
+        self.assertFalse(QueuedNotification.objects.exists())
+
+    def test_waits_for_notification_in_progress(self):
+        claimed = queue_notification(get_message(ZAAK_1, "status-1"))
+        queue_notification(get_message(ZAAK_1, "status-2"))
+        # claimed by another worker
+        QueuedNotification.objects.filter(pk=claimed.pk).update(
+            status=SyncStatus.in_progress,
+            attempts=1,
+            next_attempt=timezone.now() + CLAIM_TIMEOUT,
+        )
+
+        self.assertEqual(process_notifications(), 0)
+
+        # the claim expired, e.g. because the worker died
+        QueuedNotification.objects.filter(pk=claimed.pk).update(
+            next_attempt=timezone.now()
+        )
+
+        self.assertEqual(process_notifications(), 1)
+        self.assertEqual(self.get_sent_resources(), ["status-1"])
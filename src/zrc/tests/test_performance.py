@@ -0,0 +1,77 @@
+import json
+from unittest.mock import patch
+
+from django.test import override_settings
+
+import requests_mock
+from rest_framework import status
+from rest_framework.test import APITestCase
+from vng_api_common.tests import JWTAuthMixin, reverse
+
+from zrc.datamodel.tests.factories import ZaakFactory
+
+from .utils import ZAAK_READ_KWARGS
+
+ZAAKTYPE = "https://example.com/ztc/api/v1/zaaktypen/1"
+
+
+@override_settings(
+    PERFORMANCE_LOG_SAMPLE_RATE=1.0, PERFORMANCE_LOG_SLOW_THRESHOLD=60000
+)
+class PerformanceLogTests(JWTAuthMixin, APITestCase):
+    heeft_alle_autorisaties = True
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.middleware.performance_logger")
+        self.mock_logger = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_logged_lines(self) -> list:
+        return [
+            json.loads(call.args[0]) for call in self.mock_logger.info.call_args_list
+        ]
+
+    @requests_mock.Mocker()
+    def test_request_metrics_logged(self, m):
+        m.get(ZAAKTYPE, json={"url": ZAAKTYPE})
+        ZaakFactory.create_batch(2, zaaktype=ZAAKTYPE)
+
+        response = self.client.get(
+            reverse("zaak-list"), {"expand": "zaaktype"}, **ZAAK_READ_KWARGS
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [line] = self.get_logged_lines()
+        self.assertEqual(line["view"], "ZaakViewSet")
+        self.assertEqual(line["action"], "list")
+        self.assertEqual(line["status"], 200)
+        self.assertFalse(line["slow"])
+        self.assertGreater(line["sql_queries"], 0)
+        self.assertEqual(line["outbound_calls"], 1)
+        self.assertEqual(line["outbound"]["example.com"]["calls"], 1)
+        self.assertEqual(line["expand_depth"], 1)
+        self.assertEqual(line["expand_nodes"], 2)
+        self.assertIn("render_ms", line)
+
+    @override_settings(PERFORMANCE_LOG_SAMPLE_RATE=0.0)
+    def test_fast_request_not_sampled(self):
+        response = self.client.get(reverse("zaak-list"), **ZAAK_READ_KWARGS)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.mock_logger.info.assert_not_called()
+
+    @override_settings(
+        PERFORMANCE_LOG_SAMPLE_RATE=0.0, PERFORMANCE_LOG_SLOW_THRESHOLD=0
+    )
+    def test_slow_request_logged(self):
+        self.client.get(reverse("zaak-list"), **ZAAK_READ_KWARGS)
+
+        [line] = self.get_logged_lines()
+        self.assertTrue(line["slow"])
+
+    def test_non_api_request_not_logged(self):
+        self.client.get("/")
+
+        self.mock_logger.info.assert_not_called()
@@ -0,0 +1,309 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+import requests_mock
+from vng_api_common.models import APICredential
+from zds_client import ClientError
+
+from zrc.utils.clients import invalidate_credentials
+from zrc.utils.resources import (
+    CACHE_ALIAS,
+    check_resources,
+    fetch_resource,
+    fetch_resources,
+    local_cache,
+    request_memo,
+)
+
+ZTC_ROOT = "https://example.com/ztc/api/v1"
+ZAAKTYPE = f"{ZTC_ROOT}/zaaktypen/283ffaf5-8470-457b-8064-90e5728f413f"
+EIO = (
+    "https://example.com/drc/api/v1/"
+    "enkelvoudiginformatieobjecten/215d8355-0ba8-40ed-9380-f2479440829c"
+)
+
+
+@override_settings(REMOTE_RESOURCE_CACHE_TTL={"zaaktype": 60})
+class RemoteResourceCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        local_cache.clear()
+        caches[CACHE_ALIAS].clear()
+        self.addCleanup(local_cache.clear)
+
+        patcher = patch("zrc.utils.clients.get_client")
+        self.remote_client = patcher.start().return_value
+        self.remote_client.auth = None
+        self.addCleanup(patcher.stop)
+
+        self.requests_mock = requests_mock.Mocker()
+        self.requests_mock.start()
+        self.addCleanup(self.requests_mock.stop)
+        self.requests_mock.get(
+            ZAAKTYPE,
+            json={"url": ZAAKTYPE, "omschrijving": "old"},
+            headers={"ETag": '"abc"'},
+        )
+
+    def test_cached_resource_retrieved_once(self):
+        for _ in range(3):
+            zaaktype = fetch_resource("zaaktype", ZAAKTYPE)
+
+        self.assertEqual(zaaktype["omschrijving"], "old")
+        self.assertEqual(self.requests_mock.call_count, 1)
+
+    def test_shared_cache_used_by_other_processes(self):
+        fetch_resource("zaaktype", ZAAKTYPE)
+        local_cache.clear()
+
+        zaaktype = fetch_resource("zaaktype", ZAAKTYPE)
+
+        self.assertEqual(zaaktype["omschrijving"], "old")
+        self.assertEqual(self.requests_mock.call_count, 1)
+
+    def test_resource_type_without_ttl_not_cached(self):
+        fetch_resource("enkelvoudiginformatieobject", EIO)
+        fetch_resource("enkelvoudiginformatieobject", EIO)
+
+        self.assertEqual(self.remote_client.retrieve.call_count, 2)
+
+    def test_returned_data_is_a_copy(self):
+        fetch_resource("zaaktype", ZAAKTYPE)["omschrijving"] = "changed"
+
+        zaaktype = fetch_resource("zaaktype", ZAAKTYPE)
+
+        self.assertEqual(zaaktype["omschrijving"], "old")
+
+    def test_first_revalidation_conditional(self):
+        fetch_resource("zaaktype", ZAAKTYPE)
+        self.assertNotIn("If-None-Match", self.requests_mock.last_request.headers)
+        self.assertEqual(
+            caches[CACHE_ALIAS].get(f"zaaktype:{ZAAKTYPE}")["etag"], '"abc"'
+        )
+
+        # expire the entry
+        local_cache.clear()
+        entry = caches[CACHE_ALIAS].get(f"zaaktype:{ZAAKTYPE}")
+        caches[CACHE_ALIAS].set(f"zaaktype:{ZAAKTYPE}", {**entry, "expires": 0})
+        self.requests_mock.get(ZAAKTYPE, status_code=304)
+
+        zaaktype = fetch_resource("zaaktype", ZAAKTYPE)
+
+        self.assertEqual(zaaktype["omschrijving"], "old")
+        self.assertEqual(
+            self.requests_mock.last_request.headers["If-None-Match"], '"abc"'
+        )
+
+    def test_resource_not_found(self):
+        self.requests_mock.get(ZAAKTYPE, status_code=404, json={"code": "not_found"})
+
+        with self.assertRaises(ClientError):
+            fetch_resource("zaaktype", ZAAKTYPE)
+
+        self.assertIsNone(caches[CACHE_ALIAS].get(f"zaaktype:{ZAAKTYPE}"))
+
+    def test_expired_resource_not_modified(self):
+        caches[CACHE_ALIAS].set(
+            f"zaaktype:{ZAAKTYPE}",
+            {"data": {"url": ZAAKTYPE}, "etag": '"abc"', "expires": 0},
+        )
+        self.requests_mock.get(ZAAKTYPE, status_code=304, headers={"ETag": '"abc"'})
+
+        zaaktype = fetch_resource("zaaktype", ZAAKTYPE)
+
+        self.assertEqual(zaaktype, {"url": ZAAKTYPE})
+        self.assertEqual(
+            self.requests_mock.last_request.headers["If-None-Match"], '"abc"'
+        )
+
+        # the revalidated entry is fresh again
+        fetch_resource("zaaktype", ZAAKTYPE)
+        self.assertEqual(self.requests_mock.call_count, 1)
+
+    def test_expired_resource_modified(self):
+        caches[CACHE_ALIAS].set(
+            f"zaaktype:{ZAAKTYPE}",
+            {"data": {"url": ZAAKTYPE}, "etag": '"abc"', "expires": 0},
+        )
+        self.requests_mock.get(
+            ZAAKTYPE,
+            json={"url": ZAAKTYPE, "omschrijving": "new"},
+            headers={"ETag": '"def"'},
+        )
+
+        zaaktype = fetch_resource("zaaktype", ZAAKTYPE)
+
+        self.assertEqual(zaaktype["omschrijving"], "new")
+        self.assertEqual(
+            caches[CACHE_ALIAS].get(f"zaaktype:{ZAAKTYPE}")["etag"], '"def"'
+        )
+
+    def test_revalidation_failure_retrieves_resource(self):
+        caches[CACHE_ALIAS].set(
+            f"zaaktype:{ZAAKTYPE}",
+            {"data": {"url": ZAAKTYPE}, "etag": '"abc"', "expires": 0},
+        )
+        self.requests_mock.get(
+            ZAAKTYPE,
+            [
+                {"status_code": 500},
+                {"json": {"url": ZAAKTYPE, "omschrijving": "old"}},
+            ],
+        )
+
+        zaaktype = fetch_resource("zaaktype", ZAAKTYPE)
+
+        self.assertEqual(zaaktype["omschrijving"], "old")
+        self.assertEqual(self.requests_mock.call_count, 2)
+        self.assertNotIn("If-None-Match", self.requests_mock.last_request.headers)
+
+
+class RequestMemoTests(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.utils.clients.get_client")
+        self.remote_client = patcher.start().return_value
+        self.remote_client.retrieve.return_value = {"url": EIO, "titel": "old"}
+        self.addCleanup(patcher.stop)
+
+    def test_resource_retrieved_once_per_request(self):
+        with request_memo() as memo:
+            for _ in range(3):
+                fetch_resource("enkelvoudiginformatieobject", EIO)
+
+        self.remote_client.retrieve.assert_called_once()
+        self.assertEqual(memo.misses, 1)
+        self.assertEqual(memo.hits, 2)
+
+    def test_memo_not_shared_between_requests(self):
+        with request_memo():
+            fetch_resource("enkelvoudiginformatieobject", EIO)
+        with request_memo():
+            fetch_resource("enkelvoudiginformatieobject", EIO)
+        fetch_resource("enkelvoudiginformatieobject", EIO)
+
+        self.assertEqual(self.remote_client.retrieve.call_count, 3)
+
+    def test_returned_data_is_a_copy(self):
+        with request_memo():
+            fetch_resource("enkelvoudiginformatieobject", EIO)["titel"] = "changed"
+            data = fetch_resource("enkelvoudiginformatieobject", EIO)
+
+        self.assertEqual(data["titel"], "old")
+
+
+@override_settings(REMOTE_RESOURCE_MAX_WORKERS=3)
+class CheckResourcesTests(TestCase):
+    urls = [
+        f"https://example.com/drc/api/v1/enkelvoudiginformatieobjecten/{i}"
+        for i in range(3)
+    ]
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.utils.clients.get_client")
+        self.mock_get_client = patcher.start()
+        self.remote_client = self.mock_get_client.return_value
+        self.addCleanup(patcher.stop)
+
+    def test_resources_retrieved_concurrently(self):
+        # every retrieval waits until all of them are in progress
+        barrier = threading.Barrier(3, timeout=5)
+
+        def retrieve(resource, url):
+            barrier.wait()
+            return {"url": url}
+
+        self.remote_client.retrieve.side_effect = retrieve
+        checked = []
+
+        check_resources("enkelvoudiginformatieobject", self.urls, checked.append)
+
+        self.assertCountEqual([io["url"] for io in checked], self.urls)
+        self.mock_get_client.assert_called_once_with(self.urls[0], None)
+
+    def test_first_violation_raised(self):
+        self.remote_client.retrieve.side_effect = lambda resource, url: {
+            "locked": url == self.urls[1]
+        }
+
+        def check(informatieobject):
+            if informatieobject["locked"]:
+                raise ValueError("locked")
+
+        with self.assertRaisesMessage(ValueError, "locked"):
+            check_resources("enkelvoudiginformatieobject", self.urls, check)
+
+    def test_client_per_api_root_and_credentials(self):
+        invalidate_credentials(sender=APICredential)
+        self.addCleanup(invalidate_credentials, sender=APICredential)
+        APICredential.objects.create(
+            api_root="https://example.com/drc/api/v1/", client_id="drc", secret="a"
+        )
+        APICredential.objects.create(
+            api_root="https://example.com/archief/api/v1/",
+            client_id="archief",
+            secret="b",
+        )
+        urls = [
+            f"https://example.com/{api}/api/v1/enkelvoudiginformatieobjecten/"
+            "215d8355-0ba8-40ed-9380-f2479440829c"
+            for api in ("drc", "archief")
+        ]
+        self.mock_get_client.side_effect = lambda url, scopes: MagicMock(
+            **{"retrieve.return_value": {"client": url}}
+        )
+        checked = []
+
+        check_resources("enkelvoudiginformatieobject", urls, checked.append)
+
+        self.assertEqual(self.mock_get_client.call_count, 2)
+        self.assertCountEqual(checked, [{"client": url} for url in urls])
+
+    def test_no_resources(self):
+        check_resources("enkelvoudiginformatieobject", [], lambda io: None)
+
+        self.mock_get_client.assert_not_called()
+
+
+@override_settings(REMOTE_RESOURCE_MAX_WORKERS=3)
+class FetchResourcesTests(TestCase):
+    urls = [f"https://example.com/brc/api/v1/besluiten/{i}" for i in range(3)]
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.utils.clients.get_client")
+        self.remote_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def test_resources_retrieved_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def retrieve(resource, url):
+            barrier.wait()
+            return {"url": url}
+
+        self.remote_client.retrieve.side_effect = retrieve
+
+        besluiten = fetch_resources("besluit", self.urls + self.urls[:1])
+
+        self.assertEqual(list(besluiten), self.urls)
+        self.assertEqual(besluiten[self.urls[0]], {"url": self.urls[0]})
+
+    def test_request_memo_used(self):
+        self.remote_client.retrieve.side_effect = lambda resource, url: {"url": url}
+
+        with request_memo() as memo:
+            fetch_resource("besluit", self.urls[0])
+            fetch_resources("besluit", self.urls)
+            fetch_resources("besluit", self.urls)
+
+        self.assertEqual(self.remote_client.retrieve.call_count, 3)
+        self.assertEqual(memo.hits, 4)
@@ -0,0 +1,112 @@
+import uuid
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from redis.exceptions import RedisError
+
+from zrc.sync.markers import MARKER_TIMEOUT, MarkedForDelete
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "drc_sync": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+class MarkedForDeleteTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.markers = MarkedForDelete("drc_sync", "zios_marked_for_delete")
+        self.addCleanup(caches["drc_sync"].clear)
+
+    def test_mark_for_duration_of_block(self):
+        uuid1, uuid2 = uuid.uuid4(), uuid.uuid4()
+
+        with self.markers.mark(uuid1):
+            with self.markers.mark(uuid2):
+                self.assertEqual(set(self.markers.members()), {str(uuid1), str(uuid2)})
+            self.assertEqual(self.markers.members(), [str(uuid1)])
+
+        self.assertEqual(self.markers.members(), [])
+
+    def test_marker_removed_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.markers.mark(uuid.uuid4()):
+                raise ValueError
+
+        self.assertEqual(self.markers.members(), [])
+
+    def test_marker_expires(self):
+        self.markers.add(uuid.uuid4())
+
+        with patch("zrc.sync.markers.time.time") as mock_time:
+            mock_time.return_value = 10**10 + MARKER_TIMEOUT
+            self.assertEqual(self.markers.members(), [])
+
+    def test_fallback_key_expires(self):
+        self.markers.add(uuid.uuid4())
+
+        with patch.object(caches["drc_sync"], "set") as mock_set:
+            self.markers.add(uuid.uuid4())
+
+        self.assertEqual(mock_set.call_args.kwargs["timeout"], MARKER_TIMEOUT)
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "drc_sync": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+@patch("zrc.sync.markers.time.time", return_value=1000.0)
+class RedisMarkedForDeleteTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        patcher = patch("zrc.sync.markers.get_redis_connection")
+        self.redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        pipeline = self.redis.pipeline.return_value
+        pipeline.__exit__.return_value = False
+        self.pipe = pipeline.__enter__.return_value
+
+        self.markers = MarkedForDelete("drc_sync", "zios_marked_for_delete")
+        self.key = caches["drc_sync"].make_key("zios_marked_for_delete:set")
+
+    def test_add_scored_by_expiry(self, mock_time):
+        marker = uuid.uuid4()
+
+        self.markers.add(marker)
+
+        self.pipe.zremrangebyscore.assert_called_once_with(self.key, "-inf", 1000.0)
+        self.pipe.zadd.assert_called_once_with(
+            self.key, {str(marker): 1000.0 + MARKER_TIMEOUT}
+        )
+        self.pipe.execute.assert_called_once_with()
+
+    def test_remove(self, mock_time):
+        marker = uuid.uuid4()
+
+        self.markers.remove(marker)
+
+        self.redis.zrem.assert_called_once_with(self.key, str(marker))
+
+    def test_members_not_expired(self, mock_time):
+        marker = uuid.uuid4()
+        self.redis.zrangebyscore.return_value = [str(marker).encode("utf-8")]
+
+        members = self.markers.members()
+
+        self.assertEqual(members, [str(marker)])
+        self.redis.zrangebyscore.assert_called_once_with(self.key, 1000.0, "+inf")
+
+    def test_redis_unavailable(self, mock_time):
+        self.pipe.execute.side_effect = RedisError
+        self.redis.zrangebyscore.side_effect = RedisError
+
+        # the errors are logged, not raised
+        self.markers.add(uuid.uuid4())
+        self.assertEqual(self.markers.members(), [])
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from zrc.datamodel.tests.factories import (
+    ZaakContactMomentFactory,
+    ZaakInformatieObjectFactory,
+)
+from zrc.sync.constants import SyncActions, SyncStatus
+from zrc.sync.models import SyncJob
+from zrc.sync.outbox import CLAIM_TIMEOUT, process_sync_jobs
+
+CONTACTMOMENT = "https://kcc.nl/api/v1/contactmomenten/1234"
+OBJECTCONTACTMOMENT = "https://kcc.nl/api/v1/objectcontactmomenten/5678"
+
+
+@override_settings(SYNC_OUTBOX_ENABLED=True, SYNC_MAX_ATTEMPTS=2)
+class SyncOutboxTests(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        patcher_client = patch("zrc.sync.outbox.get_client")
+        self.remote_client = patcher_client.start().return_value
+        self.addCleanup(patcher_client.stop)
+
+        patcher_sync = patch("zrc.sync.signals.sync_create_zio")
+        self.mocked_sync_create = patcher_sync.start()
+        self.addCleanup(patcher_sync.stop)
+
+    def test_create_queued_instead_of_synced(self):
+        zio = ZaakInformatieObjectFactory.create()
+
+        self.mocked_sync_create.assert_not_called()
+        job = SyncJob.objects.get()
+        self.assertEqual(job.action, SyncActions.create)
+        self.assertEqual(job.resource, "objectinformatieobject")
+        self.assertEqual(job.relation_uuid, zio.uuid)
+        self.assertEqual(job.payload["data"]["informatieobject"], zio.informatieobject)
+
+        processed = process_sync_jobs()
+
+        self.assertEqual(processed, 1)
+        self.remote_client.create.assert_called_once_with(
+            "objectinformatieobject", job.payload["data"]
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, SyncStatus.succeeded)
+
+    def test_delete_before_sync_cancels_create(self):
+        zio = ZaakInformatieObjectFactory.create()
+
+        zio.delete()
+
+        self.assertFalse(SyncJob.objects.exists())
+        self.assertEqual(process_sync_jobs(), 0)
+        self.remote_client.create.assert_not_called()
+        self.remote_client.delete.assert_not_called()
+
+    def test_remote_url_stored_and_deleted(self):
+        self.remote_client.create.return_value = {"url": OBJECTCONTACTMOMENT}
+        zcm = ZaakContactMomentFactory.create(contactmoment=CONTACTMOMENT)
+        process_sync_jobs()
+
+        zcm.refresh_from_db()
+        self.assertEqual(zcm._objectcontactmoment, OBJECTCONTACTMOMENT)
+
+        zcm.delete()
+        process_sync_jobs()
+
+        self.remote_client.delete.assert_called_once_with(
+            "objectcontactmoment", url=OBJECTCONTACTMOMENT
+        )
+
+    def test_failed_job_retried_with_backoff(self):
+        self.remote_client.create.side_effect = Exception("unavailable")
+        ZaakInformatieObjectFactory.create()
+
+        process_sync_jobs()
+
+        job = SyncJob.objects.get()
+        self.assertEqual(job.status, SyncStatus.pending)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.last_error, "unavailable")
+        self.assertGreater(job.next_attempt, timezone.now())
+
+        # not due yet
+        self.assertEqual(process_sync_jobs(), 0)
+
+        SyncJob.objects.update(next_attempt=timezone.now() - timedelta(seconds=1))
+        process_sync_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, SyncStatus.failed)
+        self.assertEqual(job.attempts, 2)
+
+    def test_remote_call_outside_of_transaction(self):
+        atomic_blocks = len(connection.atomic_blocks)
+        during_call = {}
+
+        def create(resource, data):
+            during_call["atomic_blocks"] = len(connection.atomic_blocks)
+            during_call["status"] = SyncJob.objects.get().status
+
+        self.remote_client.create.side_effect = create
+        ZaakInformatieObjectFactory.create()
+
+        process_sync_jobs()
+
+        self.assertEqual(during_call["atomic_blocks"], atomic_blocks)
+        self.assertEqual(during_call["status"], SyncStatus.in_progress)
+        self.assertEqual(SyncJob.objects.get().status, SyncStatus.succeeded)
+
+    def test_attempted_create_not_cancelled(self):
+        zio = ZaakInformatieObjectFactory.create()
+        # e.g. a timeout after the remote relation was created
+        SyncJob.objects.update(status=SyncStatus.failed, attempts=2)
+
+        zio.delete()
+
+        create, delete = SyncJob.objects.order_by("pk")
+        self.assertEqual(create.action, SyncActions.create)
+        self.assertEqual(delete.action, SyncActions.delete)
+
+    def test_delete_waits_for_create_in_progress(self):
+        zio = ZaakInformatieObjectFactory.create()
+        SyncJob.objects.update(
+            status=SyncStatus.in_progress, next_attempt=timezone.now() + CLAIM_TIMEOUT
+        )
+        zio.delete()
+
+        # the create job is claimed by another worker
+        self.assertEqual(process_sync_jobs(), 0)
+
+        # its claim expired, the worker died
+        SyncJob.objects.update(next_attempt=timezone.now() - timedelta(seconds=1))
+        self.remote_client.list.return_value = []
+
+        self.assertEqual(process_sync_jobs(), 1)
+        self.assertEqual(process_sync_jobs(), 1)
+
+        self.remote_client.create.assert_not_called()
+        self.assertEqual(
+            set(SyncJob.objects.values_list("status", flat=True)),
+            {SyncStatus.succeeded},
+        )
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.core.checks import Error, register
 from django.forms import ModelForm
 
@@ -40,3 +41,30 @@ def check_modelform_exclude(app_configs, **kwargs):
         )
 
     return errors
+
+
+@register()
+def check_connection_pool(app_configs, **kwargs):
+    """
+    Check that pooled connections are returned to the pool after every request.
+
+    A pooled connection that is kept open with ``CONN_MAX_AGE`` is never
+    returned to the pool, so the threads of a process exhaust the pool.
+    """
+    errors = []
+
+    for alias, settings_dict in settings.DATABASES.items():
+        if not settings_dict.get("POOL_SIZE"):
+            continue
+        if settings_dict.get("CONN_MAX_AGE", 0) == 0:
+            continue
+
+        errors.append(
+            Error(
+                f"Database '{alias}' uses a connection pool and CONN_MAX_AGE",
+                hint="Set CONN_MAX_AGE (DB_CONN_MAX_AGE) to 0 to use the pool",
+                id="utils.E002",
+            )
+        )
+
+    return errors
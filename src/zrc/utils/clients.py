@@ -0,0 +1,266 @@
+"""
+Outbound HTTP calls to other APIs.
+
+All calls share a pooled :class:`requests.Session` per API host, so the
+connections are kept alive between calls and between requests, and every call
+is limited by ``OUTBOUND_CONNECT_TIMEOUT`` and ``OUTBOUND_READ_TIMEOUT``.
+
+The credentials of :class:`vng_api_common.models.APICredential` are kept in
+memory. They are reloaded when they change in this process, and at least
+every ``OUTBOUND_CREDENTIALS_CACHE_TIMEOUT`` seconds to pick up the changes
+made by other processes.
+"""
+import contextvars
+import copy
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from vng_api_common.models import APICredential
+from zds_client import Client as BaseClient, ClientAuth, ClientError
+from zds_client.client import UUID_PATTERN
+from zds_client.schema import get_headers
+
+from . import performance
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_credentials = {"entries": None, "loaded": 0.0}
+_credentials_lock = threading.Lock()
+
+
+def get_timeout() -> tuple:
+    return (settings.OUTBOUND_CONNECT_TIMEOUT, settings.OUTBOUND_READ_TIMEOUT)
+
+
+def _get_root(url: str) -> str:
+    return urlunsplit(urlsplit(url)[:2] + ("", "", ""))
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Return the pooled session for the host of ``url``.
+    """
+    root = _get_root(url)
+    with _sessions_lock:
+        if root not in _sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=settings.OUTBOUND_POOL_SIZE
+            )
+            session.mount(root, adapter)
+            session.hooks["response"].append(performance.record_response)
+            _sessions[root] = session
+        return _sessions[root]
+
+
+def _get_credentials() -> List[APICredential]:
+    with _credentials_lock:
+        expired = (
+            time.time() - _credentials["loaded"]
+            > settings.OUTBOUND_CREDENTIALS_CACHE_TIMEOUT
+        )
+        if _credentials["entries"] is None or expired:
+            # the most specific api root is matched first
+            _credentials["entries"] = sorted(
+                APICredential.objects.all(),
+                key=lambda credential: len(credential.api_root),
+                reverse=True,
+            )
+            _credentials["loaded"] = time.time()
+        return _credentials["entries"]
+
+
+@receiver([post_save, post_delete], sender=APICredential)
+def invalidate_credentials(sender, **kwargs):
+    with _credentials_lock:
+        _credentials["entries"] = None
+
+
+def _match_credentials(
+    entries: List[APICredential], url: str
+) -> Optional[APICredential]:
+    for credentials in entries:
+        if url.startswith(credentials.api_root):
+            return credentials
+    return None
+
+
+def get_auth(url: str, **claims) -> Optional[ClientAuth]:
+    """
+    Return the auth for ``url``, like :meth:`APICredential.get_auth`.
+    """
+    credentials = _match_credentials(_get_credentials(), url)
+    if credentials is None:
+        return None
+    return ClientAuth(
+        client_id=credentials.client_id,
+        secret=credentials.secret,
+        user_id=credentials.user_id,
+        user_representation=credentials.user_representation,
+        **claims,
+    )
+
+
+class Client(BaseClient):
+    """
+    ZDS client using the pooled session of the host and the outbound timeouts.
+    """
+
+    def request(
+        self,
+        path: str,
+        operation: str,
+        method="GET",
+        expected_status=200,
+        request_kwargs: Optional[dict] = None,
+        **kwargs,
+    ):
+        url = urljoin(self.base_url, path)
+
+        if request_kwargs:
+            kwargs.update(request_kwargs)
+
+        headers = CaseInsensitiveDict(kwargs.pop("headers", {}))
+        headers.setdefault("Accept", "application/json")
+        headers.setdefault("Content-Type", "application/json")
+        for header, value in get_headers(self.schema, operation).items():
+            headers.setdefault(header, value)
+        if self.auth:
+            headers.update(self.auth.credentials())
+
+        kwargs["headers"] = headers
+        kwargs.setdefault("timeout", get_timeout())
+
+        pre_id = self.pre_request(method, url, **kwargs)
+
+        response = get_session(url).request(method, url, **kwargs)
+
+        try:
+            response_json = response.json()
+        except Exception:
+            response_json = None
+
+        self.post_response(pre_id, response_json)
+
+        self._log.add(
+            self.service,
+            url,
+            method,
+            dict(headers),
+            copy.deepcopy(kwargs.get("data", kwargs.get("json", None))),
+            response.status_code,
+            dict(response.headers),
+            response_json,
+            params=kwargs.get("params"),
+        )
+
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as exc:
+            if response.status_code >= 500:
+                raise
+            raise ClientError(response_json) from exc
+
+        assert response.status_code == expected_status, response_json
+        return response_json
+
+
+def get_client(url: str, scopes: Optional[List[str]] = None):
+    # dynamic so that it can be mocked in tests easily
+    client_class = import_string(settings.ZDS_CLIENT_CLASS)
+    client = client_class.from_url(url)
+    if scopes is None:
+        client.auth = get_auth(url)
+    else:
+        client.auth = get_auth(url, scopes=scopes)
+    return client
+
+
+def _get_api_root(url: str) -> str:
+    # the base url of ``Client.from_url``: the path before the collection
+    scheme, netloc, path = urlsplit(url)[:3]
+    base_path = re.split(UUID_PATTERN, path)[0].rstrip("/").rsplit("/", 1)[0]
+    return urlunsplit((scheme, netloc, f"{base_path}/", "", ""))
+
+
+def get_clients(
+    urls: Iterable[str], scopes: Optional[List[str]] = None
+) -> Dict[str, BaseClient]:
+    """
+    Return the client of each of ``urls``.
+
+    The urls of the same API root with the same credentials share a client, so
+    APIs on the same host with different credentials get their own client.
+    """
+    # the credentials may be loaded from the database, so not in worker threads
+    entries = _get_credentials()
+    shared = {}
+    clients = {}
+    for url in urls:
+        credentials = _match_credentials(entries, url)
+        key = (_get_api_root(url), credentials.pk if credentials else None)
+        if key not in shared:
+            shared[key] = get_client(url, scopes)
+        clients[url] = shared[key]
+    return clients
+
+
+def run_concurrently(func: Callable, urls: List[str]) -> list:
+    """
+    Call ``func`` for every url in worker threads and return the results in order.
+
+    At most ``REMOTE_RESOURCE_MAX_WORKERS`` calls are made at the same time.
+    The first exception cancels the remaining calls and is raised. The calls
+    run in a copy of the current context, so they are recorded in the metrics
+    of the request.
+    """
+    with ThreadPoolExecutor(
+        max_workers=settings.REMOTE_RESOURCE_MAX_WORKERS
+    ) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, func, url) for url in urls
+        ]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    return [future.result() for future in futures]
+
+
+def retrieve_many(
+    resource: str, urls: Iterable[str], scopes: Optional[List[str]] = None
+) -> Dict[str, dict]:
+    """
+    Retrieve the ``resource`` at each of ``urls`` concurrently.
+
+    Use :func:`zrc.utils.resources.fetch_resources` for resources that may be
+    cached.
+
+    :return: a mapping of url to the retrieved data.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+
+    clients = get_clients(urls, scopes)
+
+    def retrieve(url):
+        return clients[url].retrieve(resource, url=url)
+
+    return dict(zip(urls, run_concurrently(retrieve, urls)))
@@ -0,0 +1,126 @@
+"""
+Per-request performance metrics, logged by
+:class:`zrc.middleware.PerformanceMiddleware` to the ``performance`` handler.
+
+The metrics of the current request are kept in a context variable. Code that
+runs in worker threads records its metrics only if it runs in a copy of the
+request context, see :func:`zrc.utils.clients.run_concurrently`.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlparse
+
+from django.db import connections
+
+
+@dataclass
+class RequestMetrics:
+    view: str = ""
+    action: str = ""
+    sql_queries: int = 0
+    sql_time: float = 0.0
+    # calls and total time per remote host
+    outbound: dict = field(default_factory=lambda: defaultdict(lambda: [0, 0.0]))
+    expand_depth: int = 0
+    expand_nodes: int = 0
+    render_time: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def as_dict(self) -> dict:
+        return {
+            "view": self.view,
+            "action": self.action,
+            "sql_queries": self.sql_queries,
+            "sql_ms": round(self.sql_time * 1000, 1),
+            "outbound_calls": sum(calls for calls, _ in self.outbound.values()),
+            "outbound": {
+                host: {"calls": calls, "ms": round(duration * 1000, 1)}
+                for host, (calls, duration) in self.outbound.items()
+            },
+            "expand_depth": self.expand_depth,
+            "expand_nodes": self.expand_nodes,
+            "render_ms": round(self.render_time * 1000, 1),
+        }
+
+
+_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def get_metrics() -> Optional[RequestMetrics]:
+    return _metrics.get()
+
+
+class _QueryTimer:
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            with self.metrics.lock:
+                self.metrics.sql_queries += 1
+                self.metrics.sql_time += duration
+
+
+@contextmanager
+def collect_metrics():
+    """
+    Collect the metrics of the code in the block.
+    """
+    metrics = RequestMetrics()
+    token = _metrics.set(metrics)
+    timer = _QueryTimer(metrics)
+    wrapped = []
+    try:
+        for connection in connections.all():
+            connection.execute_wrappers.append(timer)
+            wrapped.append(connection)
+        yield metrics
+    finally:
+        for connection in wrapped:
+            connection.execute_wrappers.remove(timer)
+        _metrics.reset(token)
+
+
+def record_response(response, *args, **kwargs) -> None:
+    """
+    Record an outbound call, as response hook of a :class:`requests.Session`.
+    """
+    metrics = _metrics.get()
+    if metrics is None:
+        return
+
+    host = urlparse(response.url).netloc
+    with metrics.lock:
+        host_metrics = metrics.outbound[host]
+        host_metrics[0] += 1
+        host_metrics[1] += response.elapsed.total_seconds()
+
+
+def record_expansion(depth: int, nodes: int) -> None:
+    metrics = _metrics.get()
+    if metrics is None:
+        return
+
+    with metrics.lock:
+        metrics.expand_depth = max(metrics.expand_depth, depth)
+        metrics.expand_nodes += nodes
+
+
+def record_render(duration: float) -> None:
+    metrics = _metrics.get()
+    if metrics is None:
+        return
+
+    with metrics.lock:
+        metrics.render_time += duration
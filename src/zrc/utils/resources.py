@@ -0,0 +1,272 @@
+"""
+Retrieve resources of other APIs, with a shared cache for resources that hardly
+ever change, such as the resources of the Catalogi API.
+
+Cached resources are looked up in a small in-process LRU first and in the
+``remote_resources`` cache next, which is shared by all processes. Expired
+entries are revalidated against the remote API with their ETag, so unchanged
+resources don't have to be transferred again.
+
+The time-to-live per resource type is configured with
+``REMOTE_RESOURCE_CACHE_TTL``. Resource types that are not listed there are
+never cached.
+
+Within a request (see :class:`zrc.middleware.RemoteResourceMemoMiddleware`),
+every resource is retrieved at most once, whether it is cached or not, so the
+validators, serializers and models can all look up the same resource.
+"""
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+import requests
+from zds_client import ClientError
+
+from . import clients
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = "remote_resources"
+
+# expired entries are kept around this long, so they can be revalidated
+STALE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+class LRUCache:
+    """
+    Thread-safe in-process cache that evicts the least recently used entries.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.REMOTE_RESOURCE_CACHE_LRU_SIZE:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LRUCache()
+
+
+@dataclass
+class RequestMemo:
+    resources: dict = field(default_factory=dict)
+    hits: int = 0
+
+    @property
+    def misses(self) -> int:
+        return len(self.resources)
+
+
+_request_memo: ContextVar[Optional[RequestMemo]] = ContextVar(
+    "remote_resource_memo", default=None
+)
+
+
+@contextmanager
+def request_memo():
+    """
+    Retrieve every remote resource at most once within the block.
+    """
+    memo = RequestMemo()
+    token = _request_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _request_memo.reset(token)
+
+
+def _make_entry(data: dict, etag: Optional[str], ttl: int) -> dict:
+    return {"data": data, "etag": etag, "expires": time.time() + ttl}
+
+
+def _get(client, url: str, etag: Optional[str] = None) -> requests.Response:
+    headers = {"Accept": "application/json"}
+    if client.auth:
+        headers.update(client.auth.credentials())
+    if etag:
+        headers["If-None-Match"] = etag
+
+    return clients.get_session(url).get(
+        url, headers=headers, timeout=clients.get_timeout()
+    )
+
+
+def _retrieve(client, url: str, ttl: int) -> dict:
+    """
+    Retrieve the resource, with its ETag for the revalidation of the entry.
+
+    Raises the same exceptions as ``client.retrieve``.
+    """
+    response = _get(client, url)
+    if 400 <= response.status_code < 500:
+        try:
+            response_json = response.json()
+        except ValueError:
+            response_json = None
+        raise ClientError(response_json)
+    response.raise_for_status()
+
+    return _make_entry(response.json(), response.headers.get("ETag"), ttl)
+
+
+def _revalidate(client, url: str, entry: dict, ttl: int) -> Optional[dict]:
+    """
+    Revalidate an expired entry with a conditional request.
+
+    Returns ``None`` if the resource could not be revalidated and has to be
+    retrieved again.
+    """
+    try:
+        response = _get(client, url, etag=entry["etag"])
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        logger.warning("Could not revalidate cached resource %s: %s", url, exc)
+        return None
+
+    etag = response.headers.get("ETag", entry["etag"])
+    if response.status_code == 304:
+        return _make_entry(entry["data"], etag, ttl)
+    return _make_entry(response.json(), etag, ttl)
+
+
+def fetch_resource(resource: str, url: str, scopes: Optional[List[str]] = None):
+    """
+    Retrieve the ``resource`` at ``url``, from the cache if possible.
+    """
+    memo = _request_memo.get()
+    if memo is None:
+        return _fetch_resource(resource, url, scopes)
+
+    key = (resource, url)
+    if key in memo.resources:
+        memo.hits += 1
+    else:
+        memo.resources[key] = _fetch_resource(resource, url, scopes)
+
+    # callers are free to modify the returned data
+    return copy.deepcopy(memo.resources[key])
+
+
+def _fetch_resource(
+    resource: str, url: str, scopes: Optional[List[str]] = None, client=None
+):
+    ttl = settings.REMOTE_RESOURCE_CACHE_TTL.get(resource)
+    if not ttl:
+        client = client or clients.get_client(url, scopes)
+        return client.retrieve(resource, url=url)
+
+    key = f"{resource}:{url}"
+    entry = local_cache.get(key)
+    if entry is None or entry["expires"] <= time.time():
+        entry = caches[CACHE_ALIAS].get(key) or entry
+        if entry is not None and entry["expires"] > time.time():
+            local_cache.set(key, entry)
+
+    if entry is None or entry["expires"] <= time.time():
+        client = client or clients.get_client(url, scopes)
+        if entry is not None:
+            entry = _revalidate(client, url, entry, ttl)
+        if entry is None:
+            entry = _retrieve(client, url, ttl)
+
+        caches[CACHE_ALIAS].set(key, entry, timeout=ttl + STALE_TIMEOUT)
+        local_cache.set(key, entry)
+
+    # callers are free to modify the returned data
+    return copy.deepcopy(entry["data"])
+
+
+def fetch_resources(
+    resource: str, urls: Iterable[str], scopes: Optional[List[str]] = None
+) -> Dict[str, dict]:
+    """
+    Retrieve the ``resource`` at each of ``urls`` concurrently, from the cache if
+    possible.
+
+    :return: a mapping of url to the retrieved data.
+    """
+    urls = list(dict.fromkeys(urls))
+    memo = _request_memo.get()
+
+    found = {}
+    missing = []
+    for url in urls:
+        if memo is not None and (resource, url) in memo.resources:
+            memo.hits += 1
+            found[url] = memo.resources[(resource, url)]
+        else:
+            missing.append(url)
+
+    if missing:
+        url_clients = clients.get_clients(missing, scopes)
+
+        def fetch(url):
+            client = url_clients[url]
+            return _fetch_resource(resource, url, scopes, client=client)
+
+        for url, data in zip(missing, clients.run_concurrently(fetch, missing)):
+            found[url] = data
+            if memo is not None:
+                memo.resources[(resource, url)] = data
+
+    # callers are free to modify the returned data
+    return {url: copy.deepcopy(found[url]) for url in urls}
+
+
+def check_resources(
+    resource: str,
+    urls: Iterable[str],
+    check: Callable[[dict], None],
+    scopes: Optional[List[str]] = None,
+    retrieve: Optional[Callable] = None,
+) -> None:
+    """
+    Retrieve the resources at ``urls`` concurrently and ``check`` each of them.
+
+    One client is used per API root and credentials, and at most
+    ``REMOTE_RESOURCE_MAX_WORKERS`` resources are retrieved at the same time.
+    The first exception raised by ``check`` or by the retrieval cancels the
+    remaining checks and is raised.
+
+    :param retrieve: callable ``(client, url)`` retrieving a single resource,
+      ``client.retrieve(resource, url=url)`` by default.
+    """
+    if retrieve is None:
+
+        def retrieve(client, url):
+            return client.retrieve(resource, url=url)
+
+    urls = list(urls)
+    url_clients = clients.get_clients(urls, scopes)
+    if not url_clients:
+        return
+
+    def retrieve_and_check(url):
+        check(retrieve(url_clients[url], url))
+
+    clients.run_concurrently(retrieve_and_check, urls)